@@ -1,3 +1,4 @@
 from .memonto import Memonto
+from .pool import MemontoPool
 
-__all__ = ["Memonto"]
+__all__ = ["Memonto", "MemontoPool"]
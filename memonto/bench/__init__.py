@@ -0,0 +1,67 @@
+import time
+from typing import Callable, Iterable
+
+# name -> setup function that takes a graph size and returns the callable to time
+BENCHMARKS: dict[str, Callable[[int], Callable[[], object]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Register a benchmark setup function under a name.
+
+    :param name: The name the benchmark is reported under.
+
+    :return: The decorator registering the setup function.
+    """
+
+    def decorator(setup: Callable[[int], Callable[[], object]]) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def run_benchmarks(
+    sizes: Iterable[int] = (100, 1_000, 10_000),
+    repeat: int = 3,
+    names: Iterable[str] = None,
+) -> list[dict]:
+    """
+    Run the registered benchmarks at each size and report the best of several runs.
+
+    :param sizes: The graph sizes to run every benchmark at.
+    :param repeat: The number of timed runs per benchmark and size.
+    :param names[Optional]: Only run the benchmarks whose name starts with one of these.
+
+    :return: A list of results with the benchmark name, size and timings in seconds.
+    """
+    from memonto.bench import benchmarks  # noqa: F401 registers the benchmarks
+
+    results = []
+
+    for name, setup in BENCHMARKS.items():
+        if names and not any(name.startswith(n) for n in names):
+            continue
+
+        for size in sizes:
+            timings = []
+
+            for _ in range(repeat):
+                func = setup(size)
+
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "best": min(timings),
+                    "mean": sum(timings) / len(timings),
+                    "per_item": min(timings) / size,
+                    "ops_per_second": 1 / min(timings) if min(timings) else None,
+                }
+            )
+
+    return results
@@ -0,0 +1,29 @@
+import argparse
+import json
+
+from memonto.bench import run_benchmarks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m memonto.bench",
+        description="Run the memonto benchmarks and print the results as JSON.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    results = run_benchmarks(sizes=args.sizes, repeat=args.repeat, names=args.only)
+    output = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
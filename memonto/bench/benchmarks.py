@@ -0,0 +1,179 @@
+import atexit
+import httpx
+import shutil
+import tempfile
+from rdflib import Dataset, Graph, Literal, Namespace, RDF, RDFS, URIRef
+
+from memonto.bench import benchmark
+from memonto.bench.fakes import HashEmbedding, ScriptedLLM, sparql_endpoint
+from memonto.memonto import Memonto
+from memonto.stores.triple.jena import ApacheJena
+from memonto.stores.vector.chroma import Chroma
+from memonto.utils.rdf import (
+    find_updated_triples_ephemeral,
+    generate_triple_ids,
+    hydrate_graph_with_ids,
+    remove_triples,
+)
+
+BENCH = Namespace("http://memonto.bench/")
+
+
+def make_graph(size: int) -> Graph:
+    g = Graph()
+
+    for i in range(size):
+        g.add((BENCH[f"entity{i % 100}"], BENCH[f"p{i % 10}"], Literal(f"value {i}")))
+
+    return g
+
+
+def make_triple_dicts(g: Graph) -> list[dict]:
+    return [{"s": str(s), "p": str(p), "o": str(o)} for s, p, o in g]
+
+
+@benchmark("rdf.find_updated_triples_ephemeral")
+def bench_find_updated_triples_ephemeral(size: int):
+    original = make_triple_dicts(make_graph(size))
+    updated = [
+        t | {"o": f"{t['o']} updated"} if i % 10 == 0 else t
+        for i, t in enumerate(original)
+    ]
+
+    return lambda: find_updated_triples_ephemeral(updated, original)
+
+
+@benchmark("rdf.remove_triples")
+def bench_remove_triples(size: int):
+    g = make_graph(size)
+    removed = make_triple_dicts(g)[::10]
+
+    return lambda: remove_triples(g=g, triples=removed)
+
+
+BENCH_ID = "bench"
+
+
+def make_ontology() -> Graph:
+    g = Graph()
+    g.bind("bench", BENCH)
+    g.add((BENCH.Entity, RDF.type, RDFS.Class))
+
+    for i in range(10):
+        g.add((BENCH[f"p{i}"], RDF.type, RDF.Property))
+        g.add((BENCH[f"p{i}"], RDFS.domain, BENCH.Entity))
+
+    return g
+
+
+def make_triple_store(data: Graph = None) -> ApacheJena:
+    """
+    Build an ApacheJena store backed by an in-process SPARQL endpoint, preloaded with the data graph and its ids.
+    """
+    ds = Dataset()
+
+    if data is not None:
+        ids = generate_triple_ids(data, graph_id=BENCH_ID)
+        d_graph = ds.graph(URIRef(f"data-{BENCH_ID}"))
+        hydrated = hydrate_graph_with_ids(data + Graph(), ids=ids)
+        ds.addN((s, p, o, d_graph) for s, p, o in hydrated)
+
+    store = ApacheJena(connection_url="http://memonto.bench/dataset")
+    store.client = httpx.Client(transport=sparql_endpoint(ds))
+
+    return store
+
+
+def make_vector_store(data: Graph = None) -> Chroma:
+    """
+    Build a Chroma store in a temporary directory, preloaded with the data graph.
+    """
+    path = tempfile.mkdtemp(prefix="memonto-bench-")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+
+    store = Chroma(mode="local", path=path, embedding_function=HashEmbedding())
+
+    if data is not None:
+        store.save(
+            g=data,
+            ns={"bench": BENCH},
+            id=BENCH_ID,
+            ids=generate_triple_ids(data, graph_id=BENCH_ID),
+        )
+
+    return store
+
+
+def make_memonto(size: int) -> Memonto:
+    data = make_graph(size)
+
+    return Memonto(
+        id=BENCH_ID,
+        ontology=make_ontology(),
+        namespaces={"bench": BENCH},
+        llm=ScriptedLLM(),
+        triple_store=make_triple_store(data),
+        vector_store=make_vector_store(data),
+        log_file=None,
+    )
+
+
+@benchmark("memonto.retain")
+def bench_retain(size: int):
+    memonto = make_memonto(size)
+
+    return lambda: memonto.retain("entity1 has a new value")
+
+
+@benchmark("memonto.recall")
+def bench_recall(size: int):
+    memonto = make_memonto(size)
+
+    return lambda: memonto.recall("entity1 p1 value 1")
+
+
+@benchmark("memonto.retrieve")
+def bench_retrieve(size: int):
+    memonto = make_memonto(size)
+
+    return lambda: memonto.retrieve(uri=BENCH.entity1)
+
+
+@benchmark("rdf.hydrate_graph_with_ids")
+def bench_hydrate_graph_with_ids(size: int):
+    g = make_graph(size)
+    ids = generate_triple_ids(g, graph_id=BENCH_ID)
+
+    return lambda: hydrate_graph_with_ids(g, ids=ids)
+
+
+@benchmark("chroma.save")
+def bench_chroma_save(size: int):
+    g = make_graph(size)
+    ids = generate_triple_ids(g, graph_id=BENCH_ID)
+    store = make_vector_store()
+
+    return lambda: store.save(g=g, ns={"bench": BENCH}, id=BENCH_ID, ids=ids)
+
+
+@benchmark("jena.get_context")
+def bench_get_context(size: int):
+    g = make_graph(size)
+    store = make_triple_store(g)
+    ids = generate_triple_ids(g, graph_id=BENCH_ID)
+    matched = {id: {} for id in list(ids.values())[:3]}
+
+    return lambda: store.get_context(matched=matched, graph_id=BENCH_ID)
+
+
+@benchmark("llm.fit_to_context_window")
+def bench_fit_to_context_window(size: int):
+    llm = ScriptedLLM()
+    memory = make_graph(size).serialize(format="turtle")
+
+    return lambda: llm._fit_to_context_window(
+        prompt_name="summarize_memory",
+        encoding_model=llm._get_encoding_model(),
+        context="entity1",
+        memory=memory,
+    )
@@ -0,0 +1,148 @@
+import contextvars
+import hashlib
+import httpx
+import itertools
+import tiktoken
+from pydantic import PrivateAttr
+from rdflib import Dataset
+from urllib.parse import parse_qs
+
+from memonto.llms.base_llm import LLMModel
+from memonto.utils.llm import register_encoding
+
+_prompt_name = contextvars.ContextVar("prompt_name", default=None)
+
+# one token per byte so token counting works without downloading a tiktoken vocabulary
+BYTE_ENCODING = tiktoken.Encoding(
+    name="memonto-bench-bytes",
+    pat_str=r"[\s\S]",
+    mergeable_ranks={bytes([i]): i for i in range(256)},
+    special_tokens={},
+)
+register_encoding(BYTE_ENCODING)
+
+
+class ScriptedLLM(LLMModel):
+    """
+    Deterministic stand-in for an LLM provider. Prompts are rendered and fitted to the context window as usual, only the provider call is replaced by a canned response per prompt.
+    """
+
+    name: str = "scripted"
+    model: str = "scripted"
+    api_key: str = "offline"
+    context_windows: dict = {"scripted": 128_000}
+    temperature: float = 0.5
+    triples_per_message: int = 10
+    namespace: str = "http://memonto.bench/"
+    _messages: itertools.count = PrivateAttr(default_factory=itertools.count)
+
+    def _get_encoding_model(self) -> str:
+        return BYTE_ENCODING.name
+
+    def prompt(self, prompt_name: str, *args, **kwargs) -> str:
+        token = _prompt_name.set(prompt_name)
+
+        try:
+            return super().prompt(prompt_name, *args, **kwargs)
+        finally:
+            _prompt_name.reset(token)
+
+    async def aprompt(self, prompt_name: str, *args, **kwargs) -> str:
+        token = _prompt_name.set(prompt_name)
+
+        try:
+            return await super().aprompt(prompt_name, *args, **kwargs)
+        finally:
+            _prompt_name.reset(token)
+
+    def _commit_script(self) -> str:
+        message = next(self._messages)
+
+        return f"""
+from rdflib import Literal, URIRef
+for i in range({self.triples_per_message}):
+    data.add((
+        URIRef("{self.namespace}message{message}"),
+        URIRef("{self.namespace}p" + str(i)),
+        Literal("value " + str(i)),
+    ))
+"""
+
+    def _respond(self) -> str:
+        prompt_name = _prompt_name.get()
+
+        if prompt_name == "commit_to_memory":
+            return self._commit_script()
+        elif prompt_name == "update_memory":
+            return "{}"
+        elif prompt_name in ("expand_ontology", "commit_to_memory_error_handling"):
+            return ""
+
+        return "A summary of the memories."
+
+    def _generate(self, prompt: str, temperature: float) -> str:
+        return self._respond()
+
+    async def _agenerate(self, prompt: str, temperature: float) -> str:
+        return self._respond()
+
+
+class HashEmbedding:
+    """
+    Deterministic bag of words embedding for Chroma that needs no model download.
+    """
+
+    def __init__(self, dimensions: int = 64) -> None:
+        self.dimensions = dimensions
+
+    def __call__(self, input: list[str]) -> list[list[float]]:
+        embeddings = []
+
+        for document in input:
+            vector = [0.0] * self.dimensions
+
+            for word in document.lower().split():
+                digest = hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest()
+                vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+
+            embeddings.append(vector)
+
+        return embeddings
+
+
+def sparql_endpoint(ds: Dataset) -> httpx.MockTransport:
+    """
+    Serve the SPARQL query and update protocol from an rdflib dataset so ApacheJena runs without Fuseki.
+
+    :param ds: The dataset the endpoint reads and writes.
+
+    :return: A transport to pass to an httpx client.
+    """
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+
+        if request.method == "POST":
+            form = parse_qs(request.content.decode("utf-8"))
+            params |= {k: v[0] for k, v in form.items()}
+
+        if "update" in params:
+            ds.update(params["update"])
+            return httpx.Response(204)
+
+        result = ds.query(params["query"])
+
+        if result.type == "CONSTRUCT":
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/turtle"},
+                content=result.serialize(format="turtle"),
+            )
+
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "application/sparql-results+json"},
+            content=result.serialize(format="json"),
+        )
+
+    return httpx.MockTransport(handler)
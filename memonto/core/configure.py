@@ -4,14 +4,18 @@ from memonto.llms.anthropic import Anthropic
 from memonto.llms.openai import OpenAI
 from memonto.llms.base_llm import LLMModel
 from memonto.stores.triple.base_store import TripleStoreModel
+from memonto.stores.triple.embedded import Embedded
 from memonto.stores.triple.jena import ApacheJena
 from memonto.stores.vector.base_store import VectorStoreModel
 from memonto.stores.vector.chroma import Chroma
+from memonto.utils.cache import CacheModel, MemoryCache, SQLiteCache, TieredCache
 
 
 def configure_triple_store(store_provider: str, **config) -> TripleStoreModel:
     if store_provider == "apache_jena":
         return ApacheJena(**config)
+    elif store_provider == "embedded":
+        return Embedded(**config)
     else:
         raise ValueError(f"Store {store_provider} not found")
 
@@ -23,7 +27,28 @@ def configure_vector_store(store_provider: str, **config) -> VectorStoreModel:
         raise ValueError(f"Store {store_provider} not found")
 
 
+def configure_cache(cache_provider: str, **config) -> CacheModel:
+    if cache_provider == "memory":
+        return MemoryCache(**config)
+    elif cache_provider == "sqlite":
+        return SQLiteCache(**config)
+    elif cache_provider == "tiered":
+        return TieredCache(**config)
+    else:
+        raise ValueError(f"Cache {cache_provider} not found")
+
+
 def configure_model(model_provider: str, **config) -> LLMModel:
+    if "cache" in config:
+        cache_config = config["cache"]
+
+        config = config | {
+            "cache": configure_cache(
+                cache_provider=cache_config["provider"],
+                **cache_config.get("config", {}),
+            )
+        }
+
     if model_provider == "openai":
         return OpenAI(**config)
     elif model_provider == "anthropic":
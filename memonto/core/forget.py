@@ -25,3 +25,25 @@ def _forget(
             logger.warning(e)
         except Exception as e:
             logger.error(e)
+
+
+async def _aforget(
+    data: Graph,
+    id: str,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    ephemeral: bool,
+) -> None:
+    if ephemeral:
+        data.remove((None, None, None))
+    else:
+        try:
+            if vector_store:
+                await vector_store.adelete(id)
+
+            if triple_store:
+                await triple_store.adelete_all(id)
+        except ValueError as e:
+            logger.warning(e)
+        except Exception as e:
+            logger.error(e)
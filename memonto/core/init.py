@@ -1,5 +1,9 @@
 from memonto.utils.logger import setup_logger
 
 
-def init(debug: bool) -> None:
-    setup_logger(debug=debug)
+def init(
+    debug: bool,
+    log_file: str | None = None,
+    log_enqueue: bool = False,
+) -> None:
+    setup_logger(debug=debug, log_file=log_file, enqueue=log_enqueue)
@@ -1,31 +1,42 @@
+import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from rdflib import Graph, URIRef, Literal, BNode
+from typing import AsyncIterator, Iterator
 
 from memonto.llms.base_llm import LLMModel
 from memonto.stores.triple.base_store import TripleStoreModel
 from memonto.stores.vector.base_store import VectorStoreModel
+from memonto.utils.llm import count_tokens
 from memonto.utils.logger import logger
+from memonto.utils.metrics import record_timings
 from memonto.utils.namespaces import TRIPLE_PROP
 from memonto.utils.rdf import serialize_graph_without_ids
+from memonto.utils.steps import Steps, arun_steps, call, run_steps
+from memonto.utils.timing import timed
 
 
-def get_contextual_memory(
+def _get_contextual_memory(
     data: Graph,
     vector_store: VectorStoreModel,
     triple_store: TripleStoreModel,
     context: str,
     id: str,
     ephemeral: bool,
-):
+) -> Steps:
     memory = ""
 
     if ephemeral:
         memory = serialize_graph_without_ids(data)
     elif context:
         try:
-            matched = vector_store.search(message=context, id=id)
-            logger.debug(f"Matched Triples Raw\n{matched}\n")
+            matched = yield call(vector_store, "search", message=context, id=id)
+            logger.debug("Matched Triples Raw\n{}\n", matched)
 
-            memory = triple_store.get_context(
+            memory = yield call(
+                triple_store,
+                "get_context",
                 matched=matched,
                 graph_id=id,
                 depth=1,
@@ -33,12 +44,328 @@ def get_contextual_memory(
         except ValueError as e:
             logger.debug(f"Recall Exception\n{e}\n")
     else:
-        memory = triple_store.get_all(graph_id=id)
+        memory = yield call(triple_store, "get_all", graph_id=id)
 
     logger.debug(f"Contextual Memory\n{memory}\n")
     return memory
 
 
+def get_contextual_memory(*args, **kwargs) -> str:
+    return run_steps(_get_contextual_memory(*args, **kwargs))
+
+
+async def aget_contextual_memory(*args, **kwargs) -> str:
+    return await arun_steps(_get_contextual_memory(*args, **kwargs))
+
+
+class _MemoryChunker:
+    """
+    Group pages of memory into chunks that fit a token budget without splitting the triples of a subject. Once a chunk holds half the budget it closes on a subject picked by its hash, so an edit only changes the chunks around it and every other chunk keeps its cached summary.
+    """
+
+    def __init__(self, chunk_tokens: int, encoding_model: str, spread: int = 4):
+        self.chunk_tokens = chunk_tokens
+        self.encoding_model = encoding_model
+        self.spread = spread
+        self._pending = {}
+        self._chunk = []
+        self._tokens = 0
+
+    def feed(self, page: str) -> Iterator[str]:
+        g = Graph()
+
+        if page:
+            g.parse(data=page, format="turtle")
+
+        groups = {}
+        for triple in g:
+            groups.setdefault(triple[0], []).append(triple)
+
+        # a subject cut off at the end of a page is carried along until a page no longer continues it
+        for subject in set(self._pending) & set(groups):
+            groups[subject] = self._pending.pop(subject) + groups[subject]
+
+        pending, self._pending = self._pending, groups
+        yield from self._add(pending)
+
+    def close(self) -> Iterator[str]:
+        pending, self._pending = self._pending, {}
+        yield from self._add(pending)
+
+        if self._chunk:
+            yield self._flush()
+
+    def _add(self, groups: dict) -> Iterator[str]:
+        for subject in sorted(groups):
+            lines = sorted(
+                f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in groups[subject]
+            )
+            tokens = count_tokens("\n".join(lines), self.encoding_model)
+
+            if self._chunk and self._tokens + tokens > self.chunk_tokens:
+                yield self._flush()
+
+            self._chunk += lines
+            self._tokens += tokens
+
+            if self._tokens * 2 >= self.chunk_tokens and self._is_boundary(subject):
+                yield self._flush()
+
+    def _is_boundary(self, subject) -> bool:
+        digest = hashlib.sha256(subject.n3().encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "little") % self.spread == 0
+
+    def _flush(self) -> str:
+        chunk, self._chunk, self._tokens = self._chunk, [], 0
+        return "\n".join(chunk)
+
+
+def _chunk_tokens(llm: LLMModel, chunk_tokens: int = None) -> int:
+    return chunk_tokens or llm.get_context_window() // 4
+
+
+def _group_summaries(
+    summaries: list[str],
+    chunk_tokens: int,
+    encoding_model: str,
+) -> list[list[str]]:
+    groups = [[]]
+    tokens = 0
+
+    for summary in summaries:
+        summary_tokens = count_tokens(summary, encoding_model)
+
+        # every group combines at least two summaries so each level shrinks
+        if len(groups[-1]) > 1 and tokens + summary_tokens > chunk_tokens:
+            groups.append([])
+            tokens = 0
+
+        groups[-1].append(summary)
+        tokens += summary_tokens
+
+    return groups
+
+
+def _summarize_chunk(llm: LLMModel, chunk: str) -> Steps:
+    # chunk boundaries only move around edits so every other chunk keeps its summary
+    summary = llm.get_summary(chunk)
+
+    if summary is None:
+        summary = yield call(
+            llm,
+            "prompt",
+            prompt_name="summarize_memory",
+            context="",
+            memory=chunk,
+        )
+        llm.save_summary(chunk, summary)
+
+    return summary
+
+
+def _reduce_summaries(
+    llm: LLMModel,
+    summaries: list[str],
+    chunk_tokens: int,
+    encoding_model: str,
+) -> Steps:
+    logger.debug(f"Memory Chunks\n{len(summaries)}\n")
+
+    # combine level by level until the summaries fit in the final prompt
+    while len(summaries) > 1:
+        groups = _group_summaries(summaries, chunk_tokens, encoding_model)
+
+        if len(groups) == 1:
+            break
+
+        summaries = yield [
+            call(
+                llm,
+                "prompt",
+                prompt_name="summarize_memory_summaries",
+                summaries=_numbered(group),
+            )
+            for group in groups
+        ]
+
+    return summaries
+
+
+def _final_prompt(summaries: list[str]) -> dict:
+    if not summaries:
+        return {"prompt_name": "summarize_memory", "context": "", "memory": ""}
+
+    return {
+        "prompt_name": "summarize_memory_summaries",
+        "summaries": _numbered(summaries),
+    }
+
+
+def _map_memory(
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    id: str,
+    chunk_tokens: int,
+    page_size: int = 1000,
+    concurrency: int = 8,
+) -> list[str]:
+    chunker = _MemoryChunker(
+        chunk_tokens=chunk_tokens,
+        encoding_model=llm._get_encoding_model(),
+    )
+
+    def chunks() -> Iterator[str]:
+        for page in triple_store.get_all_pages(graph_id=id, page_size=page_size):
+            yield from chunker.feed(page)
+
+        yield from chunker.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # chunks are summarized while the next pages are still being fetched
+        futures = [
+            executor.submit(run_steps, _summarize_chunk(llm, chunk))
+            for chunk in chunks()
+        ]
+
+        return [future.result() for future in futures]
+
+
+async def _amap_memory(
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    id: str,
+    chunk_tokens: int,
+    page_size: int = 1000,
+    concurrency: int = 8,
+) -> list[str]:
+    chunker = _MemoryChunker(
+        chunk_tokens=chunk_tokens,
+        encoding_model=llm._get_encoding_model(),
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+
+    async def summarize(chunk: str) -> str:
+        async with semaphore:
+            return await arun_steps(_summarize_chunk(llm, chunk))
+
+    async for page in triple_store.aget_all_pages(graph_id=id, page_size=page_size):
+        tasks += [asyncio.create_task(summarize(c)) for c in chunker.feed(page)]
+
+    tasks += [asyncio.create_task(summarize(c)) for c in chunker.close()]
+
+    return list(await asyncio.gather(*tasks))
+
+
+def _map_reduce_summaries(
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    id: str,
+    chunk_tokens: int = None,
+    page_size: int = 1000,
+    concurrency: int = 8,
+) -> list[str]:
+    """
+    Summarize all memories of a graph without truncating them to the context window. Pages of the graph are grouped into chunks within a token budget, the chunks are summarized in parallel and the partial summaries are combined level by level until they fit in one final prompt.
+    """
+    chunk_tokens = _chunk_tokens(llm, chunk_tokens)
+    summaries = _map_memory(
+        llm=llm,
+        triple_store=triple_store,
+        id=id,
+        chunk_tokens=chunk_tokens,
+        page_size=page_size,
+        concurrency=concurrency,
+    )
+
+    return run_steps(
+        _reduce_summaries(llm, summaries, chunk_tokens, llm._get_encoding_model()),
+        concurrency=concurrency,
+    )
+
+
+async def _amap_reduce_summaries(
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    id: str,
+    chunk_tokens: int = None,
+    page_size: int = 1000,
+    concurrency: int = 8,
+) -> list[str]:
+    chunk_tokens = _chunk_tokens(llm, chunk_tokens)
+    summaries = await _amap_memory(
+        llm=llm,
+        triple_store=triple_store,
+        id=id,
+        chunk_tokens=chunk_tokens,
+        page_size=page_size,
+        concurrency=concurrency,
+    )
+
+    return await arun_steps(
+        _reduce_summaries(llm, summaries, chunk_tokens, llm._get_encoding_model()),
+        concurrency=concurrency,
+    )
+
+
+def _map_reduce_memory(llm: LLMModel, triple_store: TripleStoreModel, id: str) -> str:
+    summaries = _map_reduce_summaries(llm=llm, triple_store=triple_store, id=id)
+
+    if len(summaries) == 1:
+        return summaries[0]
+
+    return llm.prompt(**_final_prompt(summaries))
+
+
+async def _amap_reduce_memory(
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    id: str,
+) -> str:
+    summaries = await _amap_reduce_summaries(llm=llm, triple_store=triple_store, id=id)
+
+    if len(summaries) == 1:
+        return summaries[0]
+
+    return await llm.aprompt(**_final_prompt(summaries))
+
+
+def _use_map_reduce(summarization: str, context: str, ephemeral: bool) -> bool:
+    return summarization == "map_reduce" and not context and not ephemeral
+
+
+def _summarize_memory(
+    timings: dict[str, float],
+    data: Graph,
+    llm: LLMModel,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    context: str,
+    id: str,
+    ephemeral: bool,
+) -> Steps:
+    with timed(timings, "get_memory"):
+        memory = yield from _get_contextual_memory(
+            data=data,
+            vector_store=vector_store,
+            triple_store=triple_store,
+            context=context,
+            id=id,
+            ephemeral=ephemeral,
+        )
+
+    with timed(timings, "summarize_memory"):
+        return (
+            yield call(
+                llm,
+                "prompt",
+                prompt_name="summarize_memory",
+                context=context or "",
+                memory=memory,
+            )
+        )
+
+
 def _recall(
     data: Graph,
     llm: LLMModel,
@@ -47,7 +374,101 @@ def _recall(
     context: str,
     id: str,
     ephemeral: bool,
+    summarization: str = "single",
 ) -> str:
+    timings = {}
+
+    with timed(timings, "total"):
+        if _use_map_reduce(summarization, context, ephemeral):
+            # the whole graph is paged and summarized in chunks instead of being truncated
+            with timed(timings, "summarize_memory"):
+                summarized_memory = _map_reduce_memory(
+                    llm=llm,
+                    triple_store=triple_store,
+                    id=id,
+                )
+        else:
+            summarized_memory = run_steps(
+                _summarize_memory(
+                    timings=timings,
+                    data=data,
+                    llm=llm,
+                    vector_store=vector_store,
+                    triple_store=triple_store,
+                    context=context,
+                    id=id,
+                    ephemeral=ephemeral,
+                )
+            )
+
+    logger.debug(f"Summarized Memory\n{summarized_memory}\n")
+    record_timings("recall", timings)
+
+    return summarized_memory
+
+
+async def _arecall(
+    data: Graph,
+    llm: LLMModel,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    context: str,
+    id: str,
+    ephemeral: bool,
+    summarization: str = "single",
+) -> str:
+    timings = {}
+
+    with timed(timings, "total"):
+        if _use_map_reduce(summarization, context, ephemeral):
+            # the whole graph is paged and summarized in chunks instead of being truncated
+            with timed(timings, "summarize_memory"):
+                summarized_memory = await _amap_reduce_memory(
+                    llm=llm,
+                    triple_store=triple_store,
+                    id=id,
+                )
+        else:
+            summarized_memory = await arun_steps(
+                _summarize_memory(
+                    timings=timings,
+                    data=data,
+                    llm=llm,
+                    vector_store=vector_store,
+                    triple_store=triple_store,
+                    context=context,
+                    id=id,
+                    ephemeral=ephemeral,
+                )
+            )
+
+    logger.debug(f"Summarized Memory\n{summarized_memory}\n")
+    record_timings("recall", timings)
+
+    return summarized_memory
+
+
+def _recall_stream(
+    data: Graph,
+    llm: LLMModel,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    context: str,
+    id: str,
+    ephemeral: bool,
+    summarization: str = "single",
+) -> Iterator[str]:
+    if _use_map_reduce(summarization, context, ephemeral):
+        # only the final combination of the partial summaries is streamed
+        summaries = _map_reduce_summaries(llm=llm, triple_store=triple_store, id=id)
+
+        if len(summaries) == 1:
+            yield summaries[0]
+        else:
+            yield from llm.prompt_stream(**_final_prompt(summaries))
+
+        return
+
     memory = get_contextual_memory(
         data=data,
         vector_store=vector_store,
@@ -57,12 +478,249 @@ def _recall(
         ephemeral=ephemeral,
     )
 
-    summarized_memory = llm.prompt(
+    yield from llm.prompt_stream(
         prompt_name="summarize_memory",
         context=context or "",
         memory=memory,
     )
 
-    logger.debug(f"Summarized Memory\n{summarized_memory}\n")
 
-    return summarized_memory
+async def _arecall_stream(
+    data: Graph,
+    llm: LLMModel,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    context: str,
+    id: str,
+    ephemeral: bool,
+    summarization: str = "single",
+) -> AsyncIterator[str]:
+    if _use_map_reduce(summarization, context, ephemeral):
+        # only the final combination of the partial summaries is streamed
+        summaries = await _amap_reduce_summaries(
+            llm=llm, triple_store=triple_store, id=id
+        )
+
+        if len(summaries) == 1:
+            yield summaries[0]
+        else:
+            async for chunk in llm.aprompt_stream(**_final_prompt(summaries)):
+                yield chunk
+
+        return
+
+    memory = await aget_contextual_memory(
+        data=data,
+        vector_store=vector_store,
+        triple_store=triple_store,
+        context=context,
+        id=id,
+        ephemeral=ephemeral,
+    )
+
+    async for chunk in llm.aprompt_stream(
+        prompt_name="summarize_memory",
+        context=context or "",
+        memory=memory,
+    ):
+        yield chunk
+
+
+def _seed_terms(matched: dict[str, dict]) -> set[str] | None:
+    seeds = set()
+
+    for meta in matched.values():
+        if not meta or "triple" not in meta:
+            return None
+
+        triple = json.loads(meta["triple"])
+        seeds.update((triple["s"], triple["o"]))
+
+    return seeds
+
+
+def _split_memory(memory: str, matched: list[dict]) -> list[str | None]:
+    """
+    Split the neighbourhood fetched for the union of all matches into the neighbourhood of every context.
+    """
+    g = Graph()
+
+    if memory:
+        g.parse(data=memory, format="turtle")
+
+    memories = []
+
+    for m in matched:
+        seeds = _seed_terms(m)
+
+        if seeds is None:
+            memories.append(None)
+            continue
+
+        neighbourhood = Graph(namespace_manager=g.namespace_manager)
+
+        for s, p, o in g:
+            if str(s) in seeds or str(o) in seeds:
+                neighbourhood.add((s, p, o))
+
+        memories.append(
+            neighbourhood.serialize(format="turtle") if len(neighbourhood) else ""
+        )
+
+    return memories
+
+
+def _get_contextual_memories(
+    data: Graph,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    contexts: list[str],
+    id: str,
+    ephemeral: bool,
+) -> Steps:
+    if ephemeral:
+        return [serialize_graph_without_ids(data)] * len(contexts)
+
+    memories = [""] * len(contexts)
+    indexed = [i for i, context in enumerate(contexts) if context]
+
+    if len(indexed) < len(contexts):
+        memory = yield call(triple_store, "get_all", graph_id=id)
+
+        for i, context in enumerate(contexts):
+            if not context:
+                memories[i] = memory
+
+    if not indexed:
+        return memories
+
+    try:
+        matched = yield call(
+            vector_store,
+            "search_many",
+            messages=[contexts[i] for i in indexed],
+            id=id,
+        )
+        logger.debug("Matched Triples Raw\n{}\n", matched)
+
+        # every context gets its own share of the triple budget of the merged fetch
+        memory = yield call(
+            triple_store,
+            "get_context",
+            matched={k: v for m in matched for k, v in m.items()},
+            graph_id=id,
+            depth=1,
+            limit=triple_store.max_context_triples * len(indexed),
+        )
+        splits = _split_memory(memory, matched)
+
+        # matches without triple metadata can't be attributed so they get their own fetch
+        unattributed = [j for j, split in enumerate(splits) if split is None]
+        fetched = yield [
+            call(triple_store, "get_context", matched=matched[j], graph_id=id, depth=1)
+            for j in unattributed
+        ]
+
+        for j, split in zip(unattributed, fetched):
+            splits[j] = split
+
+        for i, split in zip(indexed, splits):
+            memories[i] = split
+    except ValueError as e:
+        logger.debug(f"Recall Exception\n{e}\n")
+
+    return memories
+
+
+def get_contextual_memories(*args, **kwargs) -> list[str]:
+    return run_steps(_get_contextual_memories(*args, **kwargs))
+
+
+async def aget_contextual_memories(*args, **kwargs) -> list[str]:
+    return await arun_steps(_get_contextual_memories(*args, **kwargs))
+
+
+def _parse_summaries(response: str, count: int) -> list[str] | None:
+    try:
+        summaries = json.loads(response)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(summaries, list) or len(summaries) != count:
+        return None
+
+    return [str(summary) for summary in summaries]
+
+
+def _merge_memories(memories: list[str]) -> str:
+    g = Graph()
+
+    for memory in dict.fromkeys(m for m in memories if m):
+        g.parse(data=memory, format="turtle")
+
+    return g.serialize(format="turtle") if len(g) else ""
+
+
+def _numbered(contexts: list[str]) -> str:
+    return "\n".join(f"{i + 1}. {context or ''}" for i, context in enumerate(contexts))
+
+
+def _summarize_memories(
+    data: Graph,
+    llm: LLMModel,
+    vector_store: VectorStoreModel,
+    triple_store: TripleStoreModel,
+    contexts: list[str],
+    id: str,
+    ephemeral: bool,
+    combined: bool = False,
+) -> Steps:
+    if not contexts:
+        return []
+
+    memories = yield from _get_contextual_memories(
+        data=data,
+        vector_store=vector_store,
+        triple_store=triple_store,
+        contexts=contexts,
+        id=id,
+        ephemeral=ephemeral,
+    )
+
+    if combined:
+        response = yield call(
+            llm,
+            "prompt",
+            prompt_name="summarize_memory_many",
+            contexts=_numbered(contexts),
+            memory=_merge_memories(memories),
+        )
+        summaries = _parse_summaries(response, len(contexts))
+
+        if summaries is not None:
+            return summaries
+
+        logger.warning(f"Recall Many Combined Summary Invalid\n{response}\n")
+
+    return (
+        yield [
+            call(
+                llm,
+                "prompt",
+                prompt_name="summarize_memory",
+                context=context or "",
+                memory=memory,
+            )
+            for context, memory in zip(contexts, memories)
+        ]
+    )
+
+
+def _recall_many(*args, concurrency: int = 8, **kwargs) -> list[str]:
+    return run_steps(_summarize_memories(*args, **kwargs), concurrency=concurrency)
+
+
+async def _arecall_many(*args, concurrency: int = 8, **kwargs) -> list[str]:
+    return await arun_steps(
+        _summarize_memories(*args, **kwargs), concurrency=concurrency
+    )
@@ -1,16 +1,64 @@
 import ast
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from rdflib import Graph, Namespace
 
 from memonto.llms.base_llm import LLMModel
 from memonto.stores.triple.base_store import TripleStoreModel
 from memonto.stores.vector.base_store import VectorStoreModel
+from memonto.utils.llm import count_tokens
 from memonto.utils.logger import logger
+from memonto.utils.metrics import increment, record_timings
 from memonto.utils.rdf import (
     _render,
     find_updated_triples,
     find_updated_triples_ephemeral,
-    hydrate_graph_with_ids,
+    generate_triple_ids,
+    remove_triples,
+    validate_triples,
 )
+from memonto.utils.steps import Steps, arun_steps, call, run_steps
+from memonto.utils.timing import timed
+
+EXTRACT_TRIPLES_TOOL = {
+    "name": "save_triples",
+    "description": "Save the RDF triples extracted from the user message.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "triples": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "subject": {
+                            "type": "string",
+                            "description": "Prefixed name of the subject entity.",
+                        },
+                        "predicate": {
+                            "type": "string",
+                            "description": "Prefixed name of an ontology property or rdf:type.",
+                        },
+                        "object": {
+                            "type": "string",
+                            "description": "Prefixed name of the object entity or class, or the literal value.",
+                        },
+                        "object_type": {
+                            "type": "string",
+                            "enum": ["uri", "literal"],
+                        },
+                        "datatype": {
+                            "type": "string",
+                            "description": "Optional prefixed XSD datatype of a literal object.",
+                        },
+                    },
+                    "required": ["subject", "predicate", "object", "object_type"],
+                },
+            }
+        },
+        "required": ["triples"],
+    },
+}
 
 
 def _run_script(
@@ -22,7 +70,7 @@ def _run_script(
     llm: LLMModel,
     max_retries: int = 1,
     initial_temperature: float = 0.2,
-) -> Graph:
+) -> Steps:
     attempt = 0
 
     while attempt < max_retries:
@@ -30,11 +78,14 @@ def _run_script(
             exec(script, exec_ctx)
         except Exception as e:
             logger.debug(f"Run Script (Attempt {attempt + 1}) Failed\n{e}\n")
+            increment("memonto_script_retries_total")
 
             temperature = initial_temperature * (2**attempt)
             temperature = min(temperature, 1.0)
 
-            script = llm.prompt(
+            script = yield call(
+                llm,
+                "prompt",
                 prompt_name="commit_to_memory_error_handling",
                 temperature=temperature,
                 error=str(e),
@@ -50,12 +101,32 @@ def _run_script(
     return data
 
 
-def expand_ontology(
+def _add_extracted_triples(
+    data: Graph,
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+    arguments: dict,
+) -> Graph:
+    logger.debug("Extracted Triples\n{}\n", arguments)
+
+    triples = validate_triples(
+        triples=arguments.get("triples", []),
+        ontology=ontology,
+        namespaces=namespaces,
+    )
+    data.addN((s, p, o, data) for s, p, o in triples)
+
+    return data
+
+
+def _expand_ontology(
     ontology: Graph,
     llm: LLMModel,
     message: str,
-) -> Graph:
-    script = llm.prompt(
+) -> Steps:
+    script = yield call(
+        llm,
+        "prompt",
         prompt_name="expand_ontology",
         temperature=0.3,
         ontology=ontology.serialize(format="turtle"),
@@ -67,12 +138,139 @@ def expand_ontology(
     # TODO: handle exceptions just like in run_script
     exec(script, {"ontology": ontology})
 
-    logger.debug(f"Ontology Graph\n{ontology.serialize(format='turtle')}\n")
+    logger.opt(lazy=True).debug(
+        "Ontology Graph\n{}\n", lambda: ontology.serialize(format="turtle")
+    )
+
+    return ontology
+
+
+def expand_ontology(
+    ontology: Graph,
+    llm: LLMModel,
+    message: str,
+) -> Graph:
+    return run_steps(_expand_ontology(ontology=ontology, llm=llm, message=message))
+
+
+async def aexpand_ontology(
+    ontology: Graph,
+    llm: LLMModel,
+    message: str,
+) -> Graph:
+    return await arun_steps(
+        _expand_ontology(ontology=ontology, llm=llm, message=message)
+    )
+
+
+def _chunk_messages(
+    messages: list[str],
+    chunk_tokens: int,
+    encoding_model: str,
+) -> list[str]:
+    chunks = [[]]
+    tokens = 0
+
+    for message in messages:
+        message_tokens = count_tokens(message, encoding_model)
+
+        if chunks[-1] and tokens + message_tokens > chunk_tokens:
+            chunks.append([])
+            tokens = 0
+
+        chunks[-1].append(message)
+        tokens += message_tokens
+
+    return ["\n".join(chunk) for chunk in chunks if chunk]
+
+
+def _expand_ontology_many(
+    ontology: Graph,
+    llm: LLMModel,
+    messages: list[str],
+) -> Steps:
+    # every chunk sees the ontology expanded by the chunks before it
+    chunks = _chunk_messages(
+        messages=messages,
+        chunk_tokens=llm.get_context_window() // 4,
+        encoding_model=llm._get_encoding_model(),
+    )
+
+    for chunk in chunks:
+        ontology = yield from _expand_ontology(
+            ontology=ontology, llm=llm, message=chunk
+        )
 
     return ontology
 
 
-def update_memory(
+def _list_ephemeral_memory(data: Graph) -> list[dict]:
+    data_list = []
+
+    for s, p, o in data:
+        data_list.append(
+            {
+                "s": str(s),
+                "p": str(p),
+                "o": str(o),
+            }
+        )
+
+    logger.debug("existing memories\n{}\n", data_list)
+
+    return data_list
+
+
+def _render_matches(matched: dict[str, dict]) -> str:
+    # match distances are search metadata, not memory, so they stay out of prompts
+    return str(
+        {
+            id: {k: v for k, v in meta.items() if k != "distance"}
+            for id, meta in matched.items()
+        }
+    )
+
+
+def _update_matched_memory(
+    matched: dict[str, dict],
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    str_ontology: str,
+    message: str,
+    id: str,
+) -> Steps:
+    logger.debug("existing memories\n{}\n", matched)
+
+    if not matched:
+        return {}
+
+    updates = yield call(
+        llm,
+        "prompt",
+        prompt_name="update_memory",
+        temperature=0.2,
+        ontology=str_ontology,
+        user_message=message,
+        existing_memory=_render_matches(matched),
+    )
+
+    updates = ast.literal_eval(updates)
+    logger.debug("updated memories\n{}\n", updates)
+
+    updated_memory = find_updated_triples(original=matched, updated=updates)
+    logger.debug("memories diff\n{}\n", updated_memory)
+
+    if updated_memory:
+        yield [
+            call(vector_store, "delete_by_ids", graph_id=id, ids=updated_memory.keys()),
+            call(triple_store, "delete_by_ids", graph_id=id, ids=updated_memory.keys()),
+        ]
+
+    return updated_memory
+
+
+def _update_memory(
     data: Graph,
     llm: LLMModel,
     triple_store: TripleStoreModel,
@@ -81,110 +279,126 @@ def update_memory(
     message: str,
     id: str,
     ephemeral: bool,
-) -> str:
+) -> Steps:
     if ephemeral:
-        data_list = []
-
-        for s, p, o in data:
-            data_list.append(
-                {
-                    "s": str(s),
-                    "p": str(p),
-                    "o": str(o),
-                }
-            )
+        data_list = _list_ephemeral_memory(data)
 
-        logger.debug(f"existing memories\n{data_list}\n")
-
-        updates = llm.prompt(
+        updates = yield call(
+            llm,
+            "prompt",
             prompt_name="update_memory",
             temperature=0.2,
             ontology=str_ontology,
             user_message=message,
             existing_memory=str(data_list),
         )
-        logger.debug(f"updated memories\n{updates}\n")
+
+        logger.debug("updated memories\n{}\n", updates)
 
         updates = ast.literal_eval(updates)
         updated_memory = find_updated_triples_ephemeral(updates, data_list)
-        logger.debug(f"memories diff\n{updated_memory}\n")
+        logger.debug("memories diff\n{}\n", updated_memory)
 
-        for s, p, o in data:
-            for t in updated_memory:
-                if str(s) == t["s"] and str(p) == t["p"] and str(o) == t["o"]:
-                    data.remove((s, p, o))
+        remove_triples(g=data, triples=updated_memory)
 
         return str(updated_memory)
     else:
-        matched = vector_store.search(message=message, id=id, k=3)
-        logger.debug(f"existing memories\n{matched}\n")
-
-        if not matched:
-            return ""
-
-        updates = llm.prompt(
-            prompt_name="update_memory",
-            temperature=0.2,
-            ontology=str_ontology,
-            user_message=message,
-            existing_memory=str(matched),
+        matched = yield call(vector_store, "search", message=message, id=id, k=3)
+        updated_memory = yield from _update_matched_memory(
+            matched=matched,
+            llm=llm,
+            triple_store=triple_store,
+            vector_store=vector_store,
+            str_ontology=str_ontology,
+            message=message,
+            id=id,
         )
 
-        updates = ast.literal_eval(updates)
-        logger.debug(f"updated memories\n{updates}\n")
+        return str(updated_memory) if updated_memory else ""
 
-        updated_memory = find_updated_triples(original=matched, updated=updates)
-        logger.debug(f"memories diff\n{updated_memory}\n")
 
-        if not updated_memory:
-            return ""
+def update_memory(*args, **kwargs) -> str:
+    return run_steps(_update_memory(*args, **kwargs))
 
-        vector_store.delete_by_ids(graph_id=id, ids=updated_memory.keys())
-        triple_store.delete_by_ids(graph_id=id, ids=updated_memory.keys())
 
-        return str(updated_memory)
+async def aupdate_memory(*args, **kwargs) -> str:
+    return await arun_steps(_update_memory(*args, **kwargs))
 
 
-def find_relevant_memories(
+def _find_relevant_memories(
     data: Graph,
     vector_store: VectorStoreModel,
     message: str,
     id: str,
     ephemeral: bool,
-) -> str:
+) -> Steps:
     relevant_memory = ""
 
     if ephemeral:
         relevant_memory = str(data.serialize(format="turtle"))
     else:
-        relevant_memory = str(vector_store.search(message=message, id=id, k=3))
+        relevant_memory = _render_matches(
+            (yield call(vector_store, "search", message=message, id=id, k=3))
+        )
 
     logger.debug(f"relevant_memory\n{relevant_memory}\n")
     return relevant_memory
 
 
-def save_memory(
-    ontology: Graph,
+def find_relevant_memories(*args, **kwargs) -> str:
+    return run_steps(_find_relevant_memories(*args, **kwargs))
+
+
+async def afind_relevant_memories(*args, **kwargs) -> str:
+    return await arun_steps(_find_relevant_memories(*args, **kwargs))
+
+
+def _commit_to_memory(
     namespaces: dict[str, Namespace],
     data: Graph,
     llm: LLMModel,
-    triple_store: TripleStoreModel,
     vector_store: VectorStoreModel,
     message: str,
     id: str,
     ephemeral: bool,
     str_ontology: str,
     updated_memory: str,
-) -> None:
-    relevant_memory = find_relevant_memories(
-        data=data,
-        vector_store=vector_store,
-        message=message,
-        id=id,
-        ephemeral=ephemeral,
-    )
+    relevant_memory: str = None,
+    ontology: Graph = None,
+    extraction: str = "script",
+) -> Steps:
+    if relevant_memory is None:
+        relevant_memory = yield from _find_relevant_memories(
+            data=data,
+            vector_store=vector_store,
+            message=message,
+            id=id,
+            ephemeral=ephemeral,
+        )
 
-    script = llm.prompt(
+    if extraction == "structured":
+        arguments = yield call(
+            llm,
+            "prompt_tool",
+            prompt_name="commit_to_memory_structured",
+            tool=EXTRACT_TRIPLES_TOOL,
+            temperature=0.2,
+            ontology=str_ontology,
+            user_message=message,
+            updated_memory=updated_memory,
+            relevant_memory=relevant_memory,
+        )
+
+        return _add_extracted_triples(
+            data=data,
+            ontology=ontology,
+            namespaces=namespaces,
+            arguments=arguments,
+        )
+
+    script = yield call(
+        llm,
+        "prompt",
         prompt_name="commit_to_memory",
         temperature=0.2,
         ontology=str_ontology,
@@ -195,7 +409,7 @@ def save_memory(
 
     logger.debug(f"Retain Script\n{script}\n")
 
-    data = _run_script(
+    data = yield from _run_script(
         script=script,
         exec_ctx={"data": data} | namespaces,
         message=message,
@@ -204,19 +418,119 @@ def save_memory(
         llm=llm,
     )
 
-    logger.debug(f"Data Graph\n{data.serialize(format='turtle')}\n")
+    logger.opt(lazy=True).debug(
+        "Data Graph\n{}\n", lambda: data.serialize(format="turtle")
+    )
 
     # debug
     # _render(g=data, ns=namespaces, format="image")
 
-    if not ephemeral:
-        hydrate_graph_with_ids(data)
-        triple_store.save(ontology=ontology, data=data, id=id)
+    return data
+
+
+def commit_to_memory(*args, **kwargs) -> Graph:
+    return run_steps(_commit_to_memory(*args, **kwargs))
+
+
+async def acommit_to_memory(*args, **kwargs) -> Graph:
+    return await arun_steps(_commit_to_memory(*args, **kwargs))
+
+
+def _persist_memory(
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+    data: Graph,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    id: str,
+) -> Steps:
+    ids = generate_triple_ids(data, graph_id=id)
+    yield call(triple_store, "save", ontology=ontology, data=data, id=id, ids=ids)
+
+    if vector_store:
+        yield call(vector_store, "save", g=data, ns=namespaces, id=id, ids=ids)
+
+    data.remove((None, None, None))
+
+
+def persist_memory(*args, **kwargs) -> None:
+    return run_steps(_persist_memory(*args, **kwargs))
+
+
+async def apersist_memory(*args, **kwargs) -> None:
+    return await arun_steps(_persist_memory(*args, **kwargs))
+
 
-        if vector_store:
-            vector_store.save(g=data, ns=namespaces, id=id)
+def _extract(
+    timings: dict[str, float],
+    namespaces: dict[str, Namespace],
+    data: Graph,
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    message: str,
+    id: str,
+    auto_update: bool,
+    ephemeral: bool,
+    str_ontology: str,
+    schema: Graph,
+    extraction: str,
+) -> Steps:
+    updated_memory = ""
+    relevant_memory = None
 
-        data.remove((None, None, None))
+    if ephemeral:
+        if auto_update:
+            with timed(timings, "update_memory"):
+                updated_memory = yield from _update_memory(
+                    data=data,
+                    llm=llm,
+                    vector_store=vector_store,
+                    triple_store=triple_store,
+                    str_ontology=str_ontology,
+                    message=message,
+                    id=id,
+                    ephemeral=ephemeral,
+                )
+    else:
+        # one search serves both the update and the relevant memory prompts
+        with timed(timings, "search_memory"):
+            matched = yield call(vector_store, "search", message=message, id=id, k=3)
+
+        if auto_update:
+            with timed(timings, "update_memory"):
+                updated = yield from _update_matched_memory(
+                    matched=matched,
+                    llm=llm,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    str_ontology=str_ontology,
+                    message=message,
+                    id=id,
+                )
+
+            updated_memory = str(updated) if updated else ""
+            matched = {k: v for k, v in matched.items() if k not in updated}
+
+        relevant_memory = _render_matches(matched)
+
+    with timed(timings, "commit_to_memory"):
+        return (
+            yield from _commit_to_memory(
+                namespaces=namespaces,
+                data=data,
+                llm=llm,
+                vector_store=vector_store,
+                message=message,
+                id=id,
+                ephemeral=ephemeral,
+                str_ontology=str_ontology,
+                updated_memory=updated_memory,
+                relevant_memory=relevant_memory,
+                ontology=schema,
+                extraction=extraction,
+            )
+        )
 
 
 def _retain(
@@ -231,39 +545,365 @@ def _retain(
     auto_expand: bool,
     auto_update: bool,
     ephemeral: bool,
-) -> None:
-    str_ontology = ontology.serialize(format="turtle")
-    updated_memory = ""
+    extraction: str = "script",
+) -> dict[str, float]:
+    timings = {}
+
+    def expand() -> Graph:
+        with timed(timings, "expand_ontology"):
+            return expand_ontology(ontology=ontology, llm=llm, message=message)
+
+    with timed(timings, "total"):
+        # expansion mutates the ontology so serialize it before the expansion starts
+        with timed(timings, "serialize_ontology"):
+            str_ontology = ontology.serialize(format="turtle")
+            schema = ontology + Graph() if auto_expand else ontology
+
+        # the expanded ontology is only needed to persist, so it runs alongside extraction
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            expanded = executor.submit(expand) if auto_expand else None
+
+            data = run_steps(
+                _extract(
+                    timings=timings,
+                    namespaces=namespaces,
+                    data=data,
+                    llm=llm,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    message=message,
+                    id=id,
+                    auto_update=auto_update,
+                    ephemeral=ephemeral,
+                    str_ontology=str_ontology,
+                    schema=schema,
+                    extraction=extraction,
+                )
+            )
 
-    if auto_expand:
-        ontology = expand_ontology(
-            ontology=ontology,
-            llm=llm,
-            message=message,
+            if expanded:
+                ontology = expanded.result()
+
+        if not ephemeral:
+            with timed(timings, "persist_memory"):
+                persist_memory(
+                    ontology=ontology,
+                    namespaces=namespaces,
+                    data=data,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    id=id,
+                )
+
+    logger.debug("Retain Timings\n{}\n", timings)
+    record_timings("retain", timings)
+
+    return timings
+
+
+async def _aretain(
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+    data: Graph,
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    message: str,
+    id: str,
+    auto_expand: bool,
+    auto_update: bool,
+    ephemeral: bool,
+    extraction: str = "script",
+) -> dict[str, float]:
+    timings = {}
+
+    async def expand() -> Graph:
+        with timed(timings, "expand_ontology"):
+            return await aexpand_ontology(ontology=ontology, llm=llm, message=message)
+
+    with timed(timings, "total"):
+        # expansion mutates the ontology so serialize it before the expansion starts
+        with timed(timings, "serialize_ontology"):
+            str_ontology = ontology.serialize(format="turtle")
+            schema = ontology + Graph() if auto_expand else ontology
+
+        extract = arun_steps(
+            _extract(
+                timings=timings,
+                namespaces=namespaces,
+                data=data,
+                llm=llm,
+                triple_store=triple_store,
+                vector_store=vector_store,
+                message=message,
+                id=id,
+                auto_update=auto_update,
+                ephemeral=ephemeral,
+                str_ontology=str_ontology,
+                schema=schema,
+                extraction=extraction,
+            )
         )
 
-    if auto_update:
-        updated_memory = update_memory(
-            data=data,
+        # the expanded ontology is only needed to persist, so it runs alongside extraction
+        if auto_expand:
+            ontology, data = await asyncio.gather(expand(), extract)
+        else:
+            data = await extract
+
+        if not ephemeral:
+            with timed(timings, "persist_memory"):
+                await apersist_memory(
+                    ontology=ontology,
+                    namespaces=namespaces,
+                    data=data,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    id=id,
+                )
+
+    logger.debug("Retain Timings\n{}\n", timings)
+    record_timings("retain", timings)
+
+    return timings
+
+
+def _extract_message(
+    namespaces: dict[str, Namespace],
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    message: str,
+    id: str,
+    auto_update: bool,
+    str_ontology: str,
+    ontology: Graph,
+    extraction: str,
+) -> Steps:
+    # every message extracts into its own graph and the batch is merged afterwards
+    return (
+        yield from _extract(
+            timings={},
+            namespaces=namespaces,
+            data=Graph(),
             llm=llm,
-            vector_store=vector_store,
             triple_store=triple_store,
-            str_ontology=str_ontology,
+            vector_store=vector_store,
             message=message,
             id=id,
-            ephemeral=ephemeral,
+            auto_update=auto_update,
+            ephemeral=False,
+            str_ontology=str_ontology,
+            schema=ontology,
+            extraction=extraction,
         )
+    )
 
-    save_memory(
-        ontology=ontology,
-        namespaces=namespaces,
-        data=data,
-        llm=llm,
-        triple_store=triple_store,
-        vector_store=vector_store,
-        message=message,
-        id=id,
-        ephemeral=ephemeral,
-        str_ontology=str_ontology,
-        updated_memory=updated_memory,
+
+def _merge_batch(results: list) -> Graph:
+    batch = Graph()
+
+    for result in results:
+        if not isinstance(result, Exception):
+            batch += result
+
+    return batch
+
+
+def _collect_failures(results: list) -> dict[int, Exception]:
+    failures = {}
+
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.warning(f"Retain Many (Message {i}) Failed\n{result}\n")
+            failures[i] = result
+
+    return failures
+
+
+def _retain_many(
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+    data: Graph,
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    messages: list[str],
+    id: str,
+    auto_expand: bool,
+    auto_update: bool,
+    ephemeral: bool,
+    concurrency: int = 8,
+    extraction: str = "script",
+) -> dict[int, Exception]:
+    results = []
+
+    # ephemeral memory is a single shared graph so messages are applied one by one
+    if ephemeral:
+        for message in messages:
+            try:
+                results.append(
+                    _retain(
+                        ontology=ontology,
+                        namespaces=namespaces,
+                        data=data,
+                        llm=llm,
+                        triple_store=triple_store,
+                        vector_store=vector_store,
+                        message=message,
+                        id=id,
+                        auto_expand=auto_expand,
+                        auto_update=auto_update,
+                        ephemeral=ephemeral,
+                        extraction=extraction,
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+
+        return _collect_failures(results)
+
+    str_ontology = ontology.serialize(format="turtle")
+
+    if auto_expand:
+        try:
+            ontology = run_steps(
+                _expand_ontology_many(ontology=ontology, llm=llm, messages=messages)
+            )
+        except Exception as e:
+            # the messages are still extracted against the ontology as it stands
+            logger.warning(f"Retain Many (Expand Ontology) Failed\n{e}\n")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(
+                run_steps,
+                _extract_message(
+                    namespaces=namespaces,
+                    llm=llm,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    message=message,
+                    id=id,
+                    auto_update=auto_update,
+                    str_ontology=str_ontology,
+                    ontology=ontology,
+                    extraction=extraction,
+                ),
+            )
+            for message in messages
+        ]
+
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+
+    batch = _merge_batch(results)
+
+    # nothing is written when every message failed or extracted no triples
+    if len(batch):
+        persist_memory(
+            ontology=ontology,
+            namespaces=namespaces,
+            data=batch,
+            triple_store=triple_store,
+            vector_store=vector_store,
+            id=id,
+        )
+
+    return _collect_failures(results)
+
+
+async def _aretain_many(
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+    data: Graph,
+    llm: LLMModel,
+    triple_store: TripleStoreModel,
+    vector_store: VectorStoreModel,
+    messages: list[str],
+    id: str,
+    auto_expand: bool,
+    auto_update: bool,
+    ephemeral: bool,
+    concurrency: int = 8,
+    extraction: str = "script",
+) -> dict[int, Exception]:
+    results = []
+
+    # ephemeral memory is a single shared graph so messages are applied one by one
+    if ephemeral:
+        for message in messages:
+            try:
+                results.append(
+                    await _aretain(
+                        ontology=ontology,
+                        namespaces=namespaces,
+                        data=data,
+                        llm=llm,
+                        triple_store=triple_store,
+                        vector_store=vector_store,
+                        message=message,
+                        id=id,
+                        auto_expand=auto_expand,
+                        auto_update=auto_update,
+                        ephemeral=ephemeral,
+                        extraction=extraction,
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+
+        return _collect_failures(results)
+
+    str_ontology = ontology.serialize(format="turtle")
+
+    if auto_expand:
+        try:
+            ontology = await arun_steps(
+                _expand_ontology_many(ontology=ontology, llm=llm, messages=messages)
+            )
+        except Exception as e:
+            # the messages are still extracted against the ontology as it stands
+            logger.warning(f"Retain Many (Expand Ontology) Failed\n{e}\n")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract(message: str) -> Graph:
+        async with semaphore:
+            return await arun_steps(
+                _extract_message(
+                    namespaces=namespaces,
+                    llm=llm,
+                    triple_store=triple_store,
+                    vector_store=vector_store,
+                    message=message,
+                    id=id,
+                    auto_update=auto_update,
+                    str_ontology=str_ontology,
+                    ontology=ontology,
+                    extraction=extraction,
+                )
+            )
+
+    results = await asyncio.gather(
+        *(extract(message) for message in messages),
+        return_exceptions=True,
     )
+
+    batch = _merge_batch(results)
+
+    # nothing is written when every message failed or extracted no triples
+    if len(batch):
+        await apersist_memory(
+            ontology=ontology,
+            namespaces=namespaces,
+            data=batch,
+            triple_store=triple_store,
+            vector_store=vector_store,
+            id=id,
+        )
+
+    return _collect_failures(results)
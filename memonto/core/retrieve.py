@@ -34,3 +34,20 @@ def _retrieve(
         return triple_store.query(query=query)
     else:
         return triple_store.get(ontology=ontology, uri=uri, id=id)
+
+
+async def _aretrieve(
+    ontology: Graph,
+    data: Graph,
+    triple_store: TripleStoreModel,
+    id: str,
+    uri: URIRef,
+    query: str,
+    ephemeral: bool,
+) -> list:
+    if ephemeral:
+        return get_triples_with_uri(g=data, uri=uri)
+    elif query:
+        return await triple_store.aquery(query=query)
+    else:
+        return await triple_store.aget(ontology=ontology, uri=uri, id=id)
@@ -1,8 +1,11 @@
-from anthropic import Anthropic as AnthropicClient, HUMAN_PROMPT, AI_PROMPT
+from anthropic import (
+    Anthropic as AnthropicClient,
+    AsyncAnthropic as AsyncAnthropicClient,
+)
 from pydantic import model_validator
+from typing import AsyncIterator, Iterator
 
 from memonto.llms.base_llm import LLMModel
-from memonto.utils.llm import load_prompt
 
 
 class Anthropic(LLMModel):
@@ -16,33 +19,103 @@ class Anthropic(LLMModel):
     }
     temperature: float = 0.5
     client: AnthropicClient = None
+    async_client: AsyncAnthropicClient = None
 
     @model_validator(mode="after")
     def initialize_model(self) -> "Anthropic":
         self.client = AnthropicClient(api_key=self.api_key)
+        self.async_client = AsyncAnthropicClient(api_key=self.api_key)
         return self
 
-    def prompt(
-        self,
-        prompt_name: str,
-        temperature: float = None,
-        debug: bool = False,
-        **kwargs,
-    ) -> str:
-        prompt_template = self._fit_to_context_window(
-            prompt_name=prompt_name,
-            **kwargs,
-        )
+    def _track_usage(self, response) -> None:
+        if getattr(response, "usage", None) is not None:
+            self._record_usage(
+                prompt_tokens=response.usage.input_tokens,
+                completion_tokens=response.usage.output_tokens,
+            )
 
+    def _generate(self, prompt: str, temperature: float) -> str:
         response = self.client.messages.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt_template}],
+            messages=[{"role": "user", "content": prompt}],
             max_tokens=4096,
-            temperature=temperature or self.temperature,
+            temperature=temperature,
         )
 
-        if debug:
-            print("\nPROMPT:\n", prompt_template)
-            print("RESPONSE:\n", response)
+        self._track_usage(response)
+        return response.content[0].text
+
+    async def _agenerate(self, prompt: str, temperature: float) -> str:
+        response = await self.async_client.messages.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=4096,
+            temperature=temperature,
+        )
 
+        self._track_usage(response)
         return response.content[0].text
+
+    def _tool_request(self, prompt: str, temperature: float, tool: dict) -> dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 4096,
+            "temperature": temperature,
+            "tools": [
+                {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "input_schema": tool["parameters"],
+                }
+            ],
+            "tool_choice": {"type": "tool", "name": tool["name"]},
+        }
+
+    def _tool_input(self, response) -> dict:
+        for block in response.content:
+            if block.type == "tool_use":
+                return block.input
+
+        raise ValueError("Anthropic response did not contain a tool call")
+
+    def _generate_tool(self, prompt: str, temperature: float, tool: dict) -> dict:
+        response = self.client.messages.create(
+            **self._tool_request(prompt=prompt, temperature=temperature, tool=tool)
+        )
+
+        self._track_usage(response)
+        return self._tool_input(response)
+
+    async def _agenerate_tool(
+        self,
+        prompt: str,
+        temperature: float,
+        tool: dict,
+    ) -> dict:
+        response = await self.async_client.messages.create(
+            **self._tool_request(prompt=prompt, temperature=temperature, tool=tool)
+        )
+
+        self._track_usage(response)
+        return self._tool_input(response)
+
+    def _stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        with self.client.messages.stream(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=4096,
+            temperature=temperature,
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
+    async def _astream(self, prompt: str, temperature: float) -> AsyncIterator[str]:
+        async with self.async_client.messages.stream(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=4096,
+            temperature=temperature,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
@@ -1,8 +1,18 @@
-import tiktoken
+import hashlib
+import json
+import threading
 from abc import ABC, abstractmethod
-from pydantic import BaseModel, ConfigDict
+from collections import OrderedDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from typing import AsyncIterator, Iterator, Optional
 
-from memonto.utils.llm import load_prompt
+from memonto.utils.cache import CacheModel
+from memonto.utils.llm import (
+    count_prompt_tokens,
+    get_encoding,
+    load_prompt,
+)
+from memonto.utils.metrics import increment, measure, observe
 
 
 class LLMModel(BaseModel, ABC):
@@ -12,14 +22,18 @@ class LLMModel(BaseModel, ABC):
     context_windows: dict = ...
     temperature: float = ...
     client: object = None
+    async_client: object = None
+    cache: Optional[CacheModel] = None
+    summary_cache_size: int = 1024
     model_config = ConfigDict(arbitrary_types_allowed=True)
+    _summaries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _summaries_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
-    @abstractmethod
     def prompt(
         self,
         prompt_name: str,
-        temperature: float,
-        debug: bool,
+        temperature: float = None,
+        debug: bool = False,
         **kwargs,
     ) -> str:
         """
@@ -30,11 +44,441 @@ class LLMModel(BaseModel, ABC):
         :param debug: Whether to output debug logs.
         :param kwargs: Additional keyword arguments to pass to the model.
 
+        :return: The model's response as a string.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            **kwargs,
+        )
+
+        if response is None:
+            with measure("memonto_llm_request", provider=self.name, prompt=prompt_name):
+                response = self._generate(prompt=prompt, temperature=temperature)
+
+            self._save_response(prompt_name, prompt, cache_key, response)
+
+        if debug:
+            print("\nPROMPT:\n", prompt)
+            print("RESPONSE:\n", response)
+
+        return response
+
+    async def aprompt(
+        self,
+        prompt_name: str,
+        temperature: float = None,
+        debug: bool = False,
+        **kwargs,
+    ) -> str:
+        """
+        Generate a response from the model based on the given prompt without blocking the event loop.
+
+        :param prompt_name: The name of the prompt to use.
+        :param temperature: The temperature to use when generating the response.
+        :param debug: Whether to output debug logs.
+        :param kwargs: Additional keyword arguments to pass to the model.
+
+        :return: The model's response as a string.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            **kwargs,
+        )
+
+        if response is None:
+            with measure("memonto_llm_request", provider=self.name, prompt=prompt_name):
+                response = await self._agenerate(prompt=prompt, temperature=temperature)
+
+            self._save_response(prompt_name, prompt, cache_key, response)
+
+        if debug:
+            print("\nPROMPT:\n", prompt)
+            print("RESPONSE:\n", response)
+
+        return response
+
+    def prompt_stream(
+        self,
+        prompt_name: str,
+        temperature: float = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Generate a response from the model based on the given prompt and yield it as it is produced.
+
+        :param prompt_name: The name of the prompt to use.
+        :param temperature: The temperature to use when generating the response.
+        :param kwargs: Additional keyword arguments to pass to the model.
+
+        :return: An iterator over chunks of the model's response.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            **kwargs,
+        )
+
+        if response is not None:
+            yield response
+            return
+
+        chunks = []
+
+        for chunk in self._stream(prompt=prompt, temperature=temperature):
+            chunks.append(chunk)
+            yield chunk
+
+        self._save_response(prompt_name, prompt, cache_key, "".join(chunks))
+
+    async def aprompt_stream(
+        self,
+        prompt_name: str,
+        temperature: float = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response from the model based on the given prompt and yield it as it is produced without blocking the event loop.
+
+        :param prompt_name: The name of the prompt to use.
+        :param temperature: The temperature to use when generating the response.
+        :param kwargs: Additional keyword arguments to pass to the model.
+
+        :return: An async iterator over chunks of the model's response.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            **kwargs,
+        )
+
+        if response is not None:
+            yield response
+            return
+
+        chunks = []
+
+        async for chunk in self._astream(prompt=prompt, temperature=temperature):
+            chunks.append(chunk)
+            yield chunk
+
+        self._save_response(prompt_name, prompt, cache_key, "".join(chunks))
+
+    def prompt_tool(
+        self,
+        prompt_name: str,
+        tool: dict,
+        temperature: float = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Generate a structured response from the model by forcing it to call a tool.
+
+        :param prompt_name: The name of the prompt to use.
+        :param tool: The tool definition with a name, a description and a JSON schema under parameters.
+        :param temperature: The temperature to use when generating the response.
+        :param kwargs: Additional keyword arguments to pass to the model.
+
+        :return: The arguments the model called the tool with.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            cache_name=f"{prompt_name}:{tool['name']}",
+            **kwargs,
+        )
+
+        if response is not None:
+            return json.loads(response)
+
+        with measure("memonto_llm_request", provider=self.name, prompt=prompt_name):
+            arguments = self._generate_tool(
+                prompt=prompt,
+                temperature=temperature,
+                tool=tool,
+            )
+
+        self._save_response(prompt_name, prompt, cache_key, json.dumps(arguments))
+
+        return arguments
+
+    async def aprompt_tool(
+        self,
+        prompt_name: str,
+        tool: dict,
+        temperature: float = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Generate a structured response from the model by forcing it to call a tool without blocking the event loop.
+
+        :param prompt_name: The name of the prompt to use.
+        :param tool: The tool definition with a name, a description and a JSON schema under parameters.
+        :param temperature: The temperature to use when generating the response.
+        :param kwargs: Additional keyword arguments to pass to the model.
+
+        :return: The arguments the model called the tool with.
+        """
+        prompt, temperature, cache_key, response = self._prepare_prompt(
+            prompt_name=prompt_name,
+            temperature=temperature,
+            cache_name=f"{prompt_name}:{tool['name']}",
+            **kwargs,
+        )
+
+        if response is not None:
+            return json.loads(response)
+
+        with measure("memonto_llm_request", provider=self.name, prompt=prompt_name):
+            arguments = await self._agenerate_tool(
+                prompt=prompt,
+                temperature=temperature,
+                tool=tool,
+            )
+
+        self._save_response(prompt_name, prompt, cache_key, json.dumps(arguments))
+
+        return arguments
+
+    def _prepare_prompt(
+        self,
+        prompt_name: str,
+        temperature: float = None,
+        cache_name: str = None,
+        **kwargs,
+    ) -> tuple[str, float, str, Optional[str]]:
+        """
+        Render and fit a prompt to the context window and look up its cached response.
+
+        :param prompt_name: The name of the prompt to use.
+        :param temperature: The requested temperature, the model's default is used if it is not set.
+        :param cache_name: The name the response is cached under, defaults to the prompt name.
+        :param kwargs: Additional keyword arguments to pass to the prompt template.
+
+        :return: The fitted prompt, the temperature, the cache key and the cached response or None.
+        """
+        prompt = self._fit_to_context_window(
+            prompt_name=prompt_name,
+            encoding_model=self._get_encoding_model(),
+            **kwargs,
+        )
+
+        temperature = temperature or self.temperature
+        cache_key = self._get_cache_key(cache_name or prompt_name, prompt, temperature)
+        response = self.cache.get(cache_key) if self.cache else None
+
+        if response is not None:
+            increment(
+                "memonto_llm_cache_hits_total", provider=self.name, prompt=prompt_name
+            )
+
+        return prompt, temperature, cache_key, response
+
+    def _save_response(
+        self,
+        prompt_name: str,
+        prompt: str,
+        cache_key: str,
+        response: str,
+    ) -> None:
+        self._record_payload(prompt_name, prompt, response)
+
+        if self.cache:
+            self.cache.set(cache_key, response)
+
+    def _record_payload(
+        self, prompt_name: str, prompt: str, response: str = None
+    ) -> None:
+        observe(
+            "memonto_llm_prompt_chars",
+            len(prompt),
+            provider=self.name,
+            prompt=prompt_name,
+        )
+
+        if response is not None:
+            observe(
+                "memonto_llm_response_chars",
+                len(response),
+                provider=self.name,
+                prompt=prompt_name,
+            )
+
+    def _record_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Record the token usage reported by the provider for a request.
+
+        :param prompt_tokens: The number of tokens in the prompt.
+        :param completion_tokens: The number of tokens in the completion.
+
+        :return: None
+        """
+        increment(
+            "memonto_llm_tokens_total",
+            prompt_tokens or 0,
+            provider=self.name,
+            model=self.model,
+            kind="prompt",
+        )
+        increment(
+            "memonto_llm_tokens_total",
+            completion_tokens or 0,
+            provider=self.name,
+            model=self.model,
+            kind="completion",
+        )
+
+    @abstractmethod
+    def _generate(self, prompt: str, temperature: float) -> str:
+        """
+        Send a fully rendered prompt to the provider.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+
         :return: The model's response as a string.
         """
         pass
 
-    def _get_context_window(self, default: int = 32_000) -> int:
+    @abstractmethod
+    async def _agenerate(self, prompt: str, temperature: float) -> str:
+        """
+        Send a fully rendered prompt to the provider through its async client.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+
+        :return: The model's response as a string.
+        """
+        pass
+
+    def _stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        """
+        Stream a fully rendered prompt from the provider. Providers without streaming support yield the whole response at once.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+
+        :return: An iterator over chunks of the model's response.
+        """
+        yield self._generate(prompt=prompt, temperature=temperature)
+
+    async def _astream(self, prompt: str, temperature: float) -> AsyncIterator[str]:
+        """
+        Stream a fully rendered prompt from the provider through its async client. Providers without streaming support yield the whole response at once.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+
+        :return: An async iterator over chunks of the model's response.
+        """
+        yield await self._agenerate(prompt=prompt, temperature=temperature)
+
+    def _tool_prompt(self, prompt: str, tool: dict) -> str:
+        schema = json.dumps(tool["parameters"])
+        return f"{prompt}\n\nRespond only with a JSON object matching this JSON schema and nothing else:\n{schema}"
+
+    def _generate_tool(self, prompt: str, temperature: float, tool: dict) -> dict:
+        """
+        Force the provider to call a tool with a fully rendered prompt. Providers without tool calling are asked for the arguments as plain JSON.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+        :param tool: The tool definition.
+
+        :return: The arguments of the tool call.
+        """
+        response = self._generate(
+            prompt=self._tool_prompt(prompt=prompt, tool=tool),
+            temperature=temperature,
+        )
+
+        return json.loads(response)
+
+    async def _agenerate_tool(
+        self,
+        prompt: str,
+        temperature: float,
+        tool: dict,
+    ) -> dict:
+        """
+        Force the provider to call a tool with a fully rendered prompt through its async client. Providers without tool calling are asked for the arguments as plain JSON.
+
+        :param prompt: The rendered prompt.
+        :param temperature: The temperature to use when generating the response.
+        :param tool: The tool definition.
+
+        :return: The arguments of the tool call.
+        """
+        response = await self._agenerate(
+            prompt=self._tool_prompt(prompt=prompt, tool=tool),
+            temperature=temperature,
+        )
+
+        return json.loads(response)
+
+    def _get_summary_key(self, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.name}:{self.model}:{text_hash}"
+
+    def get_summary(self, text: str) -> Optional[str]:
+        """
+        Return the summary this model made of a text before, e.g. of an unchanged chunk of memory.
+
+        :param text: The summarized text.
+
+        :return: The summary or None if the text was not summarized yet.
+        """
+        key = self._get_summary_key(text)
+
+        with self._summaries_lock:
+            summary = self._summaries.get(key)
+
+            if summary is not None:
+                self._summaries.move_to_end(key)
+
+        return summary
+
+    def save_summary(self, text: str, summary: str) -> None:
+        """
+        Keep the summary of a text, evicting the least recently used summaries above summary_cache_size.
+
+        :param text: The summarized text.
+        :param summary: The summary of the text.
+
+        :return: None
+        """
+        if self.summary_cache_size <= 0:
+            return
+
+        key = self._get_summary_key(text)
+
+        with self._summaries_lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+
+            while len(self._summaries) > self.summary_cache_size:
+                self._summaries.popitem(last=False)
+
+    def _get_cache_key(self, prompt_name: str, prompt: str, temperature: float) -> str:
+        """
+        Return the response cache key for a rendered prompt.
+
+        :return: The cache key.
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{self.name}:{self.model}:{prompt_name}:{temperature}:{prompt_hash}"
+
+    def _get_encoding_model(self) -> str:
+        """
+        Return the tiktoken model or encoding name used to count prompt tokens.
+
+        :return: The encoding model name.
+        """
+        return "cl100k_base"
+
+    def get_context_window(self, default: int = 32_000) -> int:
         """
         Return the context window size for the model if it doesn't exist then a default value is used.
 
@@ -62,33 +506,38 @@ class LLMModel(BaseModel, ABC):
         :return: The fully fitted prompt as a string.
         """
         prompt_template = load_prompt(prompt_name)
-        prompt_str = prompt_template.template
-
-        try:
-            encoding = tiktoken.encoding_for_model(encoding_model)
-        except Exception:
-            encoding = tiktoken.get_encoding(encoding_model)
 
-        max_tokens = self._get_context_window()
+        max_tokens = self.get_context_window()
         buffer = 0.2
 
-        prompt_tokens = encoding.encode(prompt_str)
-        remaining_tokens = max_tokens * (1 - buffer) - len(prompt_tokens)
+        remaining_tokens = int(max_tokens * (1 - buffer)) - count_prompt_tokens(
+            prompt_name, encoding_model
+        )
 
+        # a token always spans at least one byte so prompts within the byte budget never need encoding
+        if sum(len(v.encode("utf-8")) for v in kwargs.values()) <= remaining_tokens:
+            return prompt_template.substitute(**kwargs)
+
+        encoding = get_encoding(encoding_model)
         truncated_kwargs = {}
 
         for key, value in kwargs.items():
-            value_tokens = encoding.encode(value)
+            if remaining_tokens <= 0:
+                truncated_kwargs[key] = ""
+                continue
+
+            tokens = encoding.encode(value)
 
-            if len(value_tokens) > remaining_tokens:
-                truncated_value = encoding.decode(value_tokens[:remaining_tokens])
-                truncated_kwargs[key] = truncated_value
+            if len(tokens) > remaining_tokens:
+                truncated_kwargs[key] = encoding.decode(tokens[:remaining_tokens])
                 remaining_tokens = 0
+                increment(
+                    "memonto_llm_prompt_truncations_total",
+                    provider=self.name,
+                    prompt=prompt_name,
+                )
             else:
                 truncated_kwargs[key] = value
-                remaining_tokens -= len(value_tokens)
-
-            if remaining_tokens <= 0:
-                break
+                remaining_tokens -= len(tokens)
 
         return prompt_template.substitute(**truncated_kwargs)
@@ -1,9 +1,9 @@
-import tiktoken
-from openai import OpenAI as OpenAIClient
+import json
+from openai import AsyncOpenAI as AsyncOpenAIClient, OpenAI as OpenAIClient
 from pydantic import model_validator
+from typing import AsyncIterator, Iterator
 
 from memonto.llms.base_llm import LLMModel
-from memonto.utils.llm import load_prompt
 
 
 class OpenAI(LLMModel):
@@ -17,33 +17,94 @@ class OpenAI(LLMModel):
     }
     temperature: float = 0.5
     client: OpenAIClient = None
+    async_client: AsyncOpenAIClient = None
 
     @model_validator(mode="after")
     def initialize_model(self) -> "OpenAI":
         self.client = OpenAIClient(api_key=self.api_key)
+        self.async_client = AsyncOpenAIClient(api_key=self.api_key)
         return self
 
-    def prompt(
-        self,
-        prompt_name: str,
-        temperature: float = None,
-        debug: bool = False,
-        **kwargs,
-    ) -> str:
-        prompt_template = self._fit_to_context_window(
-            prompt_name=prompt_name,
-            encoding_model=self.model,
-            **kwargs,
-        )
+    def _get_encoding_model(self) -> str:
+        return self.model
+
+    def _track_usage(self, response) -> None:
+        if getattr(response, "usage", None) is not None:
+            self._record_usage(
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens,
+            )
 
+    def _generate(self, prompt: str, temperature: float) -> str:
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt_template}],
-            temperature=temperature or self.temperature,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
         )
 
-        if debug:
-            print("\nPROMPT:\n", prompt_template)
-            print("RESPONSE:\n", response)
+        self._track_usage(response)
+        return response.choices[0].message.content
+
+    async def _agenerate(self, prompt: str, temperature: float) -> str:
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+        )
 
+        self._track_usage(response)
         return response.choices[0].message.content
+
+    def _tool_request(self, prompt: str, temperature: float, tool: dict) -> dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "tools": [{"type": "function", "function": tool}],
+            "tool_choice": {"type": "function", "function": {"name": tool["name"]}},
+        }
+
+    def _generate_tool(self, prompt: str, temperature: float, tool: dict) -> dict:
+        response = self.client.chat.completions.create(
+            **self._tool_request(prompt=prompt, temperature=temperature, tool=tool)
+        )
+
+        self._track_usage(response)
+        return json.loads(response.choices[0].message.tool_calls[0].function.arguments)
+
+    async def _agenerate_tool(
+        self,
+        prompt: str,
+        temperature: float,
+        tool: dict,
+    ) -> dict:
+        response = await self.async_client.chat.completions.create(
+            **self._tool_request(prompt=prompt, temperature=temperature, tool=tool)
+        )
+
+        self._track_usage(response)
+        return json.loads(response.choices[0].message.tool_calls[0].function.arguments)
+
+    def _stream(self, prompt: str, temperature: float) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True,
+        )
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _astream(self, prompt: str, temperature: float) -> AsyncIterator[str]:
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True,
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
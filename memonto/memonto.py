@@ -1,19 +1,26 @@
-import asyncio
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from rdflib import Graph, Namespace, URIRef
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 
 from memonto.core.configure import _configure
 from memonto.core.init import init
-from memonto.core.forget import _forget
-from memonto.core.retrieve import _retrieve
-from memonto.core.recall import _recall
+from memonto.core.forget import _aforget, _forget
+from memonto.core.retrieve import _aretrieve, _retrieve
+from memonto.core.recall import (
+    _arecall,
+    _arecall_many,
+    _arecall_stream,
+    _recall,
+    _recall_many,
+    _recall_stream,
+)
 from memonto.core.remember import _remember
-from memonto.core.retain import _retain
+from memonto.core.retain import _aretain, _aretain_many, _retain, _retain_many
 from memonto.llms.base_llm import LLMModel
 from memonto.stores.triple.base_store import TripleStoreModel
 from memonto.stores.vector.base_store import VectorStoreModel
 from memonto.utils.decorators import require_config
+from memonto.utils.ontology import Ontology
 
 
 class Memonto(BaseModel):
@@ -27,12 +34,21 @@ class Memonto(BaseModel):
     auto_expand: Optional[bool] = False
     auto_update: Optional[bool] = False
     ephemeral: Optional[bool] = False
+    extraction: Optional[str] = "script"
+    summarization: Optional[str] = "single"
     debug: Optional[bool] = False
+    log_file: Optional[str] = None
+    log_enqueue: Optional[bool] = False
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @model_validator(mode="after")
     def init(self) -> "Memonto":
-        init(debug=self.debug)
+        init(
+            debug=self.debug,
+            log_file=self.log_file,
+            log_enqueue=self.log_enqueue,
+        )
+        self.ontology = Ontology.from_graph(self.ontology)
         return self
 
     def configure(self, config: dict) -> None:
@@ -46,13 +62,13 @@ class Memonto(BaseModel):
         self.triple_store, self.vector_store, self.llm = _configure(config=config)
 
     @require_config("llm", "triple_store")
-    def retain(self, message: str) -> None:
+    def retain(self, message: str) -> dict[str, float]:
         """
         Analyze a text for relevant information that maps onto an RDF ontology then add them to the memory store.
 
         :param message: The user message that is broken down into a graph then committed to memory.
 
-        :return: None
+        :return: The duration in seconds of every retain stage that ran.
         """
         return _retain(
             ontology=self.ontology,
@@ -66,12 +82,12 @@ class Memonto(BaseModel):
             auto_expand=self.auto_expand,
             auto_update=self.auto_update,
             ephemeral=self.ephemeral,
+            extraction=self.extraction,
         )
 
     @require_config("llm", "triple_store")
-    async def aretain(self, message: str) -> None:
-        return await asyncio.to_thread(
-            _retain,
+    async def aretain(self, message: str) -> dict[str, float]:
+        return await _aretain(
             ontology=self.ontology,
             namespaces=self.namespaces,
             data=self.data,
@@ -81,13 +97,67 @@ class Memonto(BaseModel):
             message=message,
             id=self.id,
             auto_expand=self.auto_expand,
+            auto_update=self.auto_update,
+            ephemeral=self.ephemeral,
+            extraction=self.extraction,
+        )
+
+    @require_config("llm", "triple_store")
+    def retain_many(
+        self,
+        messages: list[str],
+        concurrency: int = 8,
+    ) -> dict[int, Exception]:
+        """
+        Retain a batch of messages. Extraction runs concurrently and the resulting graphs are merged then written to the memory stores once. In ephemeral mode messages are retained one at a time.
+
+        :param messages: The user messages that are broken down into a graph then committed to memory.
+        :param concurrency[Optional]: The maximum number of messages extracted at the same time.
+
+        :return: A dictionary of the index of every message that failed to its exception.
+        """
+        return _retain_many(
+            ontology=self.ontology,
+            namespaces=self.namespaces,
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            messages=messages,
+            id=self.id,
+            auto_expand=self.auto_expand,
+            auto_update=self.auto_update,
+            ephemeral=self.ephemeral,
+            concurrency=concurrency,
+            extraction=self.extraction,
+        )
+
+    @require_config("llm", "triple_store")
+    async def aretain_many(
+        self,
+        messages: list[str],
+        concurrency: int = 8,
+    ) -> dict[int, Exception]:
+        return await _aretain_many(
+            ontology=self.ontology,
+            namespaces=self.namespaces,
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            messages=messages,
+            id=self.id,
+            auto_expand=self.auto_expand,
+            auto_update=self.auto_update,
             ephemeral=self.ephemeral,
+            concurrency=concurrency,
+            extraction=self.extraction,
         )
 
     @require_config("llm", "triple_store", "vector_store")
     def recall(self, context: str = None) -> str:
         """
-        Return a text summary of either all or only relevant memories currently in the memory store. In ephemeral mode, a summary of all memories will be returned.
+        Return a text summary of either all or only relevant memories currently in the memory store. In ephemeral mode, a summary of all memories will be returned. With summarization set to map_reduce, a summary of all memories is built from chunks of the graph rather than truncating it to the context window.
 
         :param context[Optional]: Context to query the memory store for relevant memories only.
 
@@ -101,12 +171,92 @@ class Memonto(BaseModel):
             context=context,
             id=self.id,
             ephemeral=self.ephemeral,
+            summarization=self.summarization,
         )
 
     @require_config("llm", "triple_store", "vector_store")
     async def arecall(self, context: str = None) -> str:
-        return await asyncio.to_thread(
-            _recall,
+        return await _arecall(
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            context=context,
+            id=self.id,
+            ephemeral=self.ephemeral,
+            summarization=self.summarization,
+        )
+
+    @require_config("llm", "triple_store", "vector_store")
+    def recall_many(
+        self,
+        contexts: list[str],
+        combined: bool = False,
+        concurrency: int = 8,
+    ) -> list[str]:
+        """
+        Return a text summary of the relevant memories for each of several contexts. The contexts are searched in one vector query and their memories are fetched from the triple store at once.
+
+        :param contexts: The contexts to query the memory store for relevant memories.
+        :param combined[Optional]: Whether to summarize every context in a single LLM call.
+        :param concurrency[Optional]: The maximum number of summaries generated at the same time.
+
+        :return: A text summary of the memory for each context, in the same order.
+        """
+        return _recall_many(
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            contexts=contexts,
+            id=self.id,
+            ephemeral=self.ephemeral,
+            combined=combined,
+            concurrency=concurrency,
+        )
+
+    @require_config("llm", "triple_store", "vector_store")
+    async def arecall_many(
+        self,
+        contexts: list[str],
+        combined: bool = False,
+        concurrency: int = 8,
+    ) -> list[str]:
+        return await _arecall_many(
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            contexts=contexts,
+            id=self.id,
+            ephemeral=self.ephemeral,
+            combined=combined,
+            concurrency=concurrency,
+        )
+
+    @require_config("llm", "triple_store", "vector_store")
+    def recall_stream(self, context: str = None) -> Iterator[str]:
+        """
+        Stream a text summary of either all or only relevant memories as the LLM generates it. In ephemeral mode, a summary of all memories will be returned. With summarization set to map_reduce, the chunks are summarized first and only the final combined summary is streamed.
+
+        :param context[Optional]: Context to query the memory store for relevant memories only.
+
+        :return: An iterator over chunks of the text summary of the memory.
+        """
+        return _recall_stream(
+            data=self.data,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            context=context,
+            id=self.id,
+            ephemeral=self.ephemeral,
+            summarization=self.summarization,
+        )
+
+    @require_config("llm", "triple_store", "vector_store")
+    def arecall_stream(self, context: str = None) -> AsyncIterator[str]:
+        return _arecall_stream(
             data=self.data,
             llm=self.llm,
             triple_store=self.triple_store,
@@ -114,6 +264,7 @@ class Memonto(BaseModel):
             context=context,
             id=self.id,
             ephemeral=self.ephemeral,
+            summarization=self.summarization,
         )
 
     @require_config("triple_store")
@@ -138,8 +289,7 @@ class Memonto(BaseModel):
 
     @require_config("triple_store")
     async def aretrieve(self, uri: URIRef = None, query: str = None) -> list:
-        return await asyncio.to_thread(
-            _retrieve,
+        return await _aretrieve(
             ontology=self.ontology,
             data=self.data,
             triple_store=self.triple_store,
@@ -162,8 +312,7 @@ class Memonto(BaseModel):
         )
 
     async def aforget(self) -> None:
-        await asyncio.to_thread(
-            _forget,
+        await _aforget(
             data=self.data,
             id=self.id,
             triple_store=self.triple_store,
@@ -179,8 +328,9 @@ class Memonto(BaseModel):
 
         :return: None.
         """
-        self.ontology, self.data = _remember(
+        ontology, self.data = _remember(
             namespaces=self.namespaces,
             triple_store=self.triple_store,
             id=self.id,
         )
+        self.ontology = Ontology.from_graph(ontology)
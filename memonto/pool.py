@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from rdflib import Graph, Namespace
+from typing import Optional
+
+from memonto.core.configure import _configure
+from memonto.llms.base_llm import LLMModel
+from memonto.memonto import Memonto
+from memonto.stores.triple.base_store import TripleStoreModel
+from memonto.stores.vector.base_store import VectorStoreModel
+from memonto.utils.logger import logger
+from memonto.utils.ontology import Ontology
+
+
+class MemontoPool(BaseModel):
+    ontology: Graph = ...
+    namespaces: dict[str, Namespace] = ...
+    config: dict = Field(default_factory=dict)
+    options: dict = Field(default_factory=dict)
+    max_tenants: int = 1024
+    llm: Optional[LLMModel] = None
+    triple_store: Optional[TripleStoreModel] = None
+    vector_store: Optional[VectorStoreModel] = None
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    _tenants: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @model_validator(mode="after")
+    def init(self) -> "MemontoPool":
+        if self.max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1.")
+
+        self.ontology = Ontology.from_graph(self.ontology)
+
+        if self.config:
+            self.configure(self.config)
+
+        return self
+
+    def configure(self, config: dict) -> None:
+        """
+        Configure the LLM model and the data stores that every tenant shares.
+
+        :param config: A dictionary containing the configuration for the LLM model and the data stores.
+
+        :return: None
+        """
+        self.triple_store, self.vector_store, self.llm = _configure(config=config)
+
+        with self._lock:
+            for memonto in self._tenants.values():
+                memonto.triple_store = self.triple_store
+                memonto.vector_store = self.vector_store
+                memonto.llm = self.llm
+
+    def _create(self, id: str) -> Memonto:
+        ontology = self.ontology
+        if self.options.get("auto_expand"):
+            # expansion mutates the ontology so every tenant needs its own copy
+            ontology = self.ontology + Graph()
+
+            # a re-admitted tenant picks up the ontology it expanded before it was evicted
+            if self.triple_store is not None and not self.options.get("ephemeral"):
+                try:
+                    ontology += self.triple_store.load_ontology(
+                        namespaces=self.namespaces, id=id
+                    )
+                except Exception as e:
+                    # a store hiccup must not lock the tenant out, it starts from the base ontology
+                    logger.error(f"Load Ontology ({id}) Failed\n{e}\n")
+
+        return Memonto(
+            id=id,
+            ontology=ontology,
+            namespaces=self.namespaces,
+            llm=self.llm,
+            triple_store=self.triple_store,
+            vector_store=self.vector_store,
+            **self.options,
+        )
+
+    def _release(self, ids: list[str]) -> None:
+        for store in (self.triple_store, self.vector_store):
+            if store is None:
+                continue
+
+            for id in ids:
+                store.release(id=id)
+
+    def get(self, id: str) -> Memonto:
+        """
+        Return the Memonto instance of a tenant. Instances share the pool's LLM client and store connections, and the least recently used instance is dropped once max_tenants is reached.
+
+        :param id: The id of the tenant's memory.
+
+        :return: The tenant's Memonto instance.
+        """
+        with self._lock:
+            memonto = self._tenants.get(id)
+
+            if memonto is not None:
+                self._tenants.move_to_end(id)
+                return memonto
+
+        # creating may load from the triple store so it runs outside the lock
+        memonto = self._create(id)
+        evicted = []
+
+        with self._lock:
+            if id in self._tenants:
+                self._tenants.move_to_end(id)
+                return self._tenants[id]
+
+            self._tenants[id] = memonto
+
+            while len(self._tenants) > self.max_tenants:
+                evicted.append(self._tenants.popitem(last=False)[0])
+
+        self._release(evicted)
+
+        return memonto
+
+    def __getitem__(self, id: str) -> Memonto:
+        return self.get(id)
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def evict(self, id: str) -> None:
+        """
+        Drop the cached Memonto instance of a tenant and the state the stores keep for it. Its memories stay in the data stores.
+
+        :param id: The id of the tenant's memory.
+
+        :return: None
+        """
+        with self._lock:
+            memonto = self._tenants.pop(id, None)
+
+        if memonto is not None:
+            self._release([id])
+
+    def close(self) -> None:
+        """
+        Drop every tenant and close the shared triple store if it holds local resources.
+
+        :return: None
+        """
+        with self._lock:
+            ids = list(self._tenants)
+            self._tenants.clear()
+
+        self._release(ids)
+
+        if self.triple_store is not None and hasattr(self.triple_store, "close"):
+            self.triple_store.close()
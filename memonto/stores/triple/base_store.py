@@ -1,9 +1,13 @@
+import asyncio
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, ConfigDict
+from rdflib import Graph
+from typing import AsyncIterator, Iterator
 
 
 class TripleStoreModel(BaseModel, ABC):
     name: str = ...
+    max_context_triples: int = 1000
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @abstractmethod
@@ -38,9 +42,96 @@ class TripleStoreModel(BaseModel, ABC):
         """
         pass
 
+    def get_all_pages(
+        self,
+        graph_id: str = None,
+        page_size: int = 1000,
+    ) -> Iterator[str]:
+        """
+        Get all memory data from the datastore one page at a time, ordered by subject. Stores that can page natively override this, the default splits the result of get_all.
+
+        :param graph_id: The id of the graph to get all memory data from.
+        :param page_size: The maximum number of triples per page.
+
+        :return: An iterator over string representations of each page of memory data.
+        """
+        g = Graph()
+        memory = self.get_all(graph_id=graph_id)
+
+        if memory:
+            g.parse(data=memory, format="turtle")
+
+        triples = sorted(g)
+
+        for i in range(0, len(triples), page_size):
+            page = Graph(namespace_manager=g.namespace_manager)
+
+            for triple in triples[i : i + page_size]:
+                page.add(triple)
+
+            yield page.serialize(format="turtle")
+
+    def load_ontology(self, namespaces: dict, id: str = None) -> Graph:
+        """
+        Load the stored ontology of a memory without its data. Stores that keep the ontology in its own graph override this, the default loads both and drops the data.
+
+        :param namespaces: The namespaces to bind to the ontology.
+        :param id: The id of the memory.
+
+        :return: The stored ontology.
+        """
+        ontology, _ = self.load(namespaces=namespaces, id=id)
+        return ontology
+
+    def release(self, id: str = None) -> None:
+        """
+        Drop the client-side state the store keeps for a memory, e.g. when its Memonto instance is evicted. The stored memories are left untouched.
+
+        :param id: The id of the memory.
+
+        :return: None
+        """
+        pass
+
     @abstractmethod
     def query(self):
         """
         Perform a raw query against the datastore for memory data.
         """
         pass
+
+    # Stores without a native async client fall back to running the sync call in a worker thread.
+    async def asave(self, *args, **kwargs):
+        return await asyncio.to_thread(self.save, *args, **kwargs)
+
+    async def aload(self, *args, **kwargs):
+        return await asyncio.to_thread(self.load, *args, **kwargs)
+
+    async def aget(self, *args, **kwargs):
+        return await asyncio.to_thread(self.get, *args, **kwargs)
+
+    async def aget_all(self, *args, **kwargs):
+        return await asyncio.to_thread(self.get_all, *args, **kwargs)
+
+    async def aget_all_pages(self, *args, **kwargs) -> AsyncIterator[str]:
+        pages = await asyncio.to_thread(
+            lambda: list(self.get_all_pages(*args, **kwargs))
+        )
+
+        for page in pages:
+            yield page
+
+    async def aget_context(self, *args, **kwargs):
+        return await asyncio.to_thread(self.get_context, *args, **kwargs)
+
+    async def adelete_all(self, *args, **kwargs):
+        return await asyncio.to_thread(self.delete_all, *args, **kwargs)
+
+    async def adelete_by_ids(self, *args, **kwargs):
+        return await asyncio.to_thread(self.delete_by_ids, *args, **kwargs)
+
+    async def aload_ontology(self, *args, **kwargs):
+        return await asyncio.to_thread(self.load_ontology, *args, **kwargs)
+
+    async def aquery(self, *args, **kwargs):
+        return await asyncio.to_thread(self.query, *args, **kwargs)
@@ -0,0 +1,381 @@
+import json
+import os
+import sqlite3
+import threading
+from pydantic import PrivateAttr, model_validator
+from rdflib import Dataset, Graph, Literal, Namespace, RDF, URIRef, XSD
+from rdflib.plugin import PluginException
+from rdflib.term import Node
+from rdflib.util import from_n3
+from SPARQLWrapper import GET, JSON
+from typing import Iterator, Tuple
+
+from memonto.stores.triple.base_store import TripleStoreModel
+from memonto.utils.logger import logger
+from memonto.utils.namespaces import TRIPLE_PROP
+from memonto.utils.rdf import hydrate_graph_with_ids
+
+GRAPH_PREFIX = "urn:memonto:"
+ID_PROPS = {RDF.subject, RDF.predicate, RDF.object, TRIPLE_PROP.uuid}
+IDENTITY_SCHEMES = ("reification", "side-table")
+
+
+class Embedded(TripleStoreModel):
+    name: str = "embedded"
+    path: str = None
+    store: str = "Oxigraph"
+    identity: str = "reification"
+    dataset: Dataset = None
+    _ids: sqlite3.Connection = PrivateAttr(default=None)
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+
+    @model_validator(mode="after")
+    def init(self) -> "Embedded":
+        if self.identity not in IDENTITY_SCHEMES:
+            raise ValueError(
+                f"Invalid identity {self.identity}. Must be one of {IDENTITY_SCHEMES}."
+            )
+
+        if self.identity == "side-table":
+            self._open_ids()
+
+        if self.dataset is not None:
+            return self
+
+        if not self.path:
+            self.dataset = Dataset()
+            return self
+
+        try:
+            self.dataset = Dataset(store=self.store)
+        except PluginException:
+            raise ValueError(
+                f"rdflib store plugin {self.store} not found. Install it to use the embedded store with a path (e.g. pip install memonto[embedded])."
+            )
+
+        self.dataset.open(self.path, create=not os.path.exists(self.path))
+        return self
+
+    def close(self) -> None:
+        """
+        Close the underlying rdflib store and release the on-disk files.
+        """
+        with self._lock:
+            self.dataset.close()
+
+            if self._ids is not None:
+                self._ids.close()
+
+    def _open_ids(self) -> None:
+        path = f"{self.path}.ids.db" if self.path else ":memory:"
+
+        self._ids = sqlite3.connect(path, check_same_thread=False)
+        self._ids.execute(
+            """
+            CREATE TABLE IF NOT EXISTS triple_ids (
+                graph_id TEXT NOT NULL,
+                id TEXT NOT NULL,
+                s TEXT NOT NULL,
+                p TEXT NOT NULL,
+                o TEXT NOT NULL,
+                PRIMARY KEY (graph_id, id)
+            )
+            """
+        )
+        self._ids.commit()
+
+    def _save_ids(self, data: Graph, ids: dict[tuple, str], graph_id: str) -> None:
+        if self.identity == "reification":
+            hydrate_graph_with_ids(data, ids=ids)
+            return
+
+        self._ids.executemany(
+            "INSERT OR REPLACE INTO triple_ids VALUES (?, ?, ?, ?, ?)",
+            [
+                (graph_id or "", t_id, s.n3(), p.n3(), o.n3())
+                for (s, p, o), t_id in ids.items()
+            ],
+        )
+        self._ids.commit()
+
+    def _lookup_ids(self, data: Graph, ids: list[str], graph_id: str) -> dict:
+        triples = {}
+
+        if self.identity == "reification":
+            for id in ids:
+                for triple_node in data.subjects(TRIPLE_PROP.uuid, Literal(id)):
+                    triples[id] = (
+                        data.value(triple_node, RDF.subject),
+                        data.value(triple_node, RDF.predicate),
+                        data.value(triple_node, RDF.object),
+                    )
+
+            return triples
+
+        ids = list(ids)
+        rows = self._ids.execute(
+            f"SELECT id, s, p, o FROM triple_ids WHERE graph_id = ? AND id IN ({','.join('?' * len(ids))})",
+            [graph_id or "", *ids],
+        )
+
+        for id, s, p, o in rows:
+            triples[id] = (from_n3(s), from_n3(p), from_n3(o))
+
+        return triples
+
+    def _graph(self, kind: str, id: str = None) -> Graph:
+        name = f"{kind}-{id}" if id else kind
+        return self.dataset.graph(URIRef(f"{GRAPH_PREFIX}{name}"))
+
+    def _normalize(self, node: Node) -> Node:
+        # some stores hand back plain literals typed as xsd:string
+        if isinstance(node, Literal) and node.datatype == XSD.string:
+            return Literal(str(node), lang=node.language)
+
+        return node
+
+    def _copy(self, source, g: Graph = None) -> Graph:
+        g = Graph() if g is None else g
+
+        for s, p, o in source:
+            g.add((self._normalize(s), p, self._normalize(o)))
+
+        return g
+
+    def _serialize(self, g: Graph) -> str:
+        if not len(g):
+            return ""
+
+        return g.serialize(format="turtle")
+
+    def save(
+        self,
+        ontology: Graph,
+        data: Graph,
+        id: str = None,
+        ids: dict[tuple, str] = None,
+    ) -> None:
+        with self._lock:
+            o_graph = self._graph("ontology", id)
+            d_graph = self._graph("data", id)
+
+            if ids:
+                data = data + Graph()
+                self._save_ids(data=data, ids=ids, graph_id=id)
+
+            self.dataset.addN(
+                [(s, p, o, o_graph) for s, p, o in ontology]
+                + [(s, p, o, d_graph) for s, p, o in data]
+            )
+
+    def load(
+        self,
+        namespaces: dict[str, Namespace],
+        id: str = None,
+    ) -> Tuple[Graph, Graph]:
+        with self._lock:
+            ontology = self._copy(self._graph("ontology", id))
+            data = self._copy(self._graph("data", id))
+
+        for g in (ontology, data):
+            for p, n in namespaces.items():
+                g.bind(p, n)
+
+        logger.opt(lazy=True).debug(
+            "Loaded Ontology Graph\n{}\n", lambda: ontology.serialize(format="turtle")
+        )
+        logger.opt(lazy=True).debug(
+            "Loaded Data Graph\n{}\n", lambda: data.serialize(format="turtle")
+        )
+
+        return ontology, data
+
+    def get(
+        self,
+        ontology: Graph,
+        id: str,
+        uri: URIRef,
+    ) -> list:
+        return self.query(
+            query=f"""
+            SELECT ?s ?p ?o WHERE {{
+                GRAPH <{self._graph("data", id).identifier}> {{
+                    ?s ?p ?o .
+                    FILTER (?o = <{str(uri)}> || ?s = <{str(uri)}> || ?p = <{str(uri)}>)
+                }}
+            }}
+            """
+        )
+
+    def _memory_triples(self, graph_id: str = None) -> list:
+        with self._lock:
+            data = self._graph("data", graph_id)
+            triple_nodes = (
+                set(data.subjects(TRIPLE_PROP.uuid, None))
+                if self.identity == "reification"
+                else set()
+            )
+
+            return [t for t in data if t[0] not in triple_nodes]
+
+    def get_all(self, graph_id: str = None) -> str:
+        return self._serialize(self._copy(self._memory_triples(graph_id)))
+
+    def get_all_pages(
+        self,
+        graph_id: str = None,
+        page_size: int = 1000,
+    ) -> Iterator[str]:
+        triples = sorted(self._copy(self._memory_triples(graph_id)))
+
+        for i in range(0, len(triples), page_size):
+            yield self._serialize(self._copy(triples[i : i + page_size]))
+
+    def _find_seeds(
+        self,
+        data: Graph,
+        matched: dict[str, dict],
+        graph_id: str,
+    ) -> set[Node]:
+        seeds = set()
+        triples = self._lookup_ids(data=data, ids=matched.keys(), graph_id=graph_id)
+
+        for s, _, o in triples.values():
+            seeds.update((s, o))
+
+        return seeds
+
+    def _neighbours(self, data: Graph, node: Node):
+        for p, o in data.predicate_objects(node):
+            if p not in ID_PROPS:
+                yield node, p, o
+
+        for s, p in data.subject_predicates(node):
+            if p not in ID_PROPS:
+                yield s, p, node
+
+    def get_context(
+        self,
+        matched: dict[str, dict],
+        graph_id: str,
+        depth: int = 1,
+        limit: int = None,
+    ) -> str:
+        if not matched:
+            return ""
+
+        limit = limit or self.max_context_triples
+        g = Graph()
+
+        with self._lock:
+            data = self._graph("data", graph_id)
+            nodes = self._find_seeds(data=data, matched=matched, graph_id=graph_id)
+            frontier = nodes
+
+            for _ in range(depth - 1):
+                reached = set()
+
+                for node in frontier:
+                    for s, _, o in self._neighbours(data=data, node=node):
+                        reached.update((s, o))
+
+                frontier = reached - nodes
+                nodes = nodes | frontier
+
+            for node in nodes:
+                for t in self._neighbours(data=data, node=node):
+                    if len(g) >= limit:
+                        break
+
+                    g.add(tuple(self._normalize(n) for n in t))
+
+        result = self._serialize(g)
+        logger.opt(lazy=True).debug("Adjacent Triples\n{}\n", lambda: result)
+
+        return result
+
+    def delete_all(self, graph_id: str = None) -> None:
+        with self._lock:
+            self.dataset.remove_graph(self._graph("ontology", graph_id))
+            self.dataset.remove_graph(self._graph("data", graph_id))
+
+            if self._ids is not None:
+                self._ids.execute(
+                    "DELETE FROM triple_ids WHERE graph_id = ?", (graph_id or "",)
+                )
+                self._ids.commit()
+
+    def delete_by_ids(self, ids: list[str], graph_id: str = None) -> None:
+        with self._lock:
+            data = self._graph("data", graph_id)
+            ids = list(ids)
+            triples = self._lookup_ids(data=data, ids=ids, graph_id=graph_id)
+
+            for triple in triples.values():
+                data.remove(triple)
+
+            if self.identity == "reification":
+                for id in ids:
+                    for triple_node in list(
+                        data.subjects(TRIPLE_PROP.uuid, Literal(id))
+                    ):
+                        data.remove((triple_node, None, None))
+            else:
+                self._ids.executemany(
+                    "DELETE FROM triple_ids WHERE graph_id = ? AND id = ?",
+                    [(graph_id or "", id) for id in ids],
+                )
+                self._ids.commit()
+
+    def migrate_identity(self, graph_id: str = None) -> None:
+        """
+        Convert the triple ids of an existing graph to the configured identity scheme.
+
+        :param graph_id: The id of the graph to migrate.
+
+        :return: None
+        """
+        with self._lock:
+            data = self._graph("data", graph_id)
+
+            if self.identity == "side-table":
+                ids = {}
+
+                for triple_node, id in list(data.subject_objects(TRIPLE_PROP.uuid)):
+                    triple = (
+                        data.value(triple_node, RDF.subject),
+                        data.value(triple_node, RDF.predicate),
+                        data.value(triple_node, RDF.object),
+                    )
+                    ids[triple] = str(id)
+                    data.remove((triple_node, None, None))
+
+                self._save_ids(data=data, ids=ids, graph_id=graph_id)
+            else:
+                if self._ids is None:
+                    self._open_ids()
+
+                rows = self._ids.execute(
+                    "SELECT id, s, p, o FROM triple_ids WHERE graph_id = ?",
+                    (graph_id or "",),
+                )
+                ids = {(from_n3(s), from_n3(p), from_n3(o)): id for id, s, p, o in rows}
+
+                hydrate_graph_with_ids(data, ids=ids)
+                self._ids.execute(
+                    "DELETE FROM triple_ids WHERE graph_id = ?", (graph_id or "",)
+                )
+                self._ids.commit()
+
+    def query(self, query: str, method: str = GET, format: str = JSON) -> list | str:
+        logger.opt(lazy=True).debug("SPARQL Query\n{}\n", lambda: query)
+
+        with self._lock:
+            result = self.dataset.query(query)
+
+            if format == JSON:
+                return json.loads(result.serialize(format="json"))["results"][
+                    "bindings"
+                ]
+            else:
+                return result.serialize(format=format).decode("utf-8")
@@ -1,13 +1,28 @@
-import json
+import gzip
+import httpx
+import threading
+from collections import OrderedDict
+from pydantic import PrivateAttr, model_validator
 from rdflib import Graph, Literal, Namespace, URIRef
-from SPARQLWrapper import SPARQLWrapper, GET, POST, TURTLE, JSON
-from SPARQLWrapper.SPARQLExceptions import SPARQLWrapperException
-from typing import Tuple
+from SPARQLWrapper import GET, POST, TURTLE, JSON
+from typing import AsyncIterator, Iterator, Tuple
+from urllib.parse import urlencode
 
 from memonto.stores.triple.base_store import TripleStoreModel
+from memonto.utils.http import get_async_http_client, get_http_client
 from memonto.utils.logger import logger
-from memonto.utils.namespaces import TRIPLE_PROP
-from memonto.utils.rdf import format_node
+from memonto.utils.metrics import measure, observe
+from memonto.utils.namespaces import TRIPLE_NODE, TRIPLE_PROP
+from memonto.utils.ontology import Ontology
+from memonto.utils.rdf import hydrate_graph_with_ids
+
+NTRIPLES = "nt"
+ACCEPT_HEADERS = {
+    TURTLE: "text/turtle",
+    NTRIPLES: "application/n-triples",
+    JSON: "application/sparql-results+json",
+}
+IDENTITY_SCHEMES = ("reification", "rdf-star")
 
 
 class ApacheJena(TripleStoreModel):
@@ -15,6 +30,96 @@ class ApacheJena(TripleStoreModel):
     connection_url: str = ...
     username: str = None
     password: str = None
+    pool_size: int = 10
+    timeout: float = 30.0
+    compression: bool = False
+    identity: str = "reification"
+    synced_cache_size: int = 128
+    client: httpx.Client = None
+    async_client: httpx.AsyncClient = None
+    _synced: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _synced_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @model_validator(mode="after")
+    def init(self) -> "ApacheJena":
+        if self.identity not in IDENTITY_SCHEMES:
+            raise ValueError(
+                f"Invalid identity {self.identity}. Must be one of {IDENTITY_SCHEMES}."
+            )
+
+        self.client = get_http_client(
+            base_url=self.connection_url,
+            pool_size=self.pool_size,
+        )
+        return self
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self.async_client is not None:
+            return self.async_client
+
+        return get_async_http_client(
+            base_url=self.connection_url,
+            pool_size=self.pool_size,
+        )
+
+    def _build_request(
+        self,
+        url: str,
+        method: Literal,
+        query: str,
+        format: str,
+    ) -> dict:
+        operation = "update" if url.endswith("/update") else "query"
+        headers = {
+            "Accept": ACCEPT_HEADERS.get(format, "*/*"),
+            "Accept-Encoding": "gzip" if self.compression else "identity",
+        }
+        request = {
+            "method": method,
+            "url": url,
+            "headers": headers,
+            "timeout": self.timeout,
+        }
+
+        if self.username and self.password:
+            request["auth"] = (self.username, self.password)
+
+        if method == GET:
+            request["params"] = {operation: query}
+        else:
+            body = urlencode({operation: query}).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+            if self.compression:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+
+            request["content"] = body
+
+        return request
+
+    def _parse_response(self, response: httpx.Response, format: str):
+        content_type = response.headers.get("Content-Type", "")
+
+        if "html" in content_type:
+            return response.text
+        elif format == JSON:
+            return response.json()
+        else:
+            return response.content
+
+    def _record_payload(
+        self,
+        operation: str,
+        query: str,
+        response: httpx.Response,
+    ) -> None:
+        observe("memonto_sparql_request_chars", len(query), operation=operation)
+        observe(
+            "memonto_sparql_response_bytes",
+            len(response.content),
+            operation=operation,
+        )
 
     def _query(
         self,
@@ -22,30 +127,62 @@ class ApacheJena(TripleStoreModel):
         method: Literal,
         query: str,
         format: str = TURTLE,
-    ) -> SPARQLWrapper:
-        sparql = SPARQLWrapper(url)
-        sparql.setQuery(query)
-        sparql.setMethod(method)
-        sparql.setReturnFormat(format)
+    ) -> str | bytes | dict:
+        logger.debug(f"SPARQL Query\n{query}\n")
 
-        if self.username and self.password:
-            sparql.setCredentials(self.username, self.password)
+        operation = "update" if url.endswith("/update") else "query"
+
+        try:
+            with measure("memonto_sparql_request", operation=operation):
+                response = self.client.request(
+                    **self._build_request(
+                        url=url,
+                        method=method,
+                        query=query,
+                        format=format,
+                    )
+                )
+                response.raise_for_status()
 
+            self._record_payload(operation, query, response)
+
+            res = self._parse_response(response=response, format=format)
+            logger.debug("SPARQL Query Result\n{}\n", res)
+            return res
+        except httpx.HTTPError as e:
+            logger.error(f"SPARQL Query Error\n{e}\n")
+        except Exception as e:
+            logger.error(f"Generic Query Error\n{e}\n")
+
+    async def _aquery(
+        self,
+        url: str,
+        method: Literal,
+        query: str,
+        format: str = TURTLE,
+    ) -> str | bytes | dict:
         logger.debug(f"SPARQL Query\n{query}\n")
 
+        operation = "update" if url.endswith("/update") else "query"
+
         try:
-            response = sparql.query()
-            content_type = response.info()["Content-Type"]
-
-            if "html" in content_type:
-                res = response.response.read().decode("utf-8")
-                logger.debug(f"SPARQL Query Result\n{res}\n")
-                return res
-            else:
-                res = response.convert()
-                logger.debug(f"SPARQL Query Result\n{res}\n")
-                return res
-        except SPARQLWrapperException as e:
+            with measure("memonto_sparql_request", operation=operation):
+                response = await self._get_async_client().request(
+                    **self._build_request(
+                        url=url,
+                        method=method,
+                        query=query,
+                        format=format,
+                    )
+                )
+                response.raise_for_status()
+
+            self._record_payload(operation, query, response)
+
+            res = self._parse_response(response=response, format=format)
+            logger.debug("SPARQL Query Result\n{}\n", res)
+            return res
+        except httpx.HTTPError as e:
             logger.error(f"SPARQL Query Error\n{e}\n")
         except Exception as e:
             logger.error(f"Generic Query Error\n{e}\n")
@@ -54,40 +191,32 @@ class ApacheJena(TripleStoreModel):
         gt = g.serialize(format="turtle")
         return [line for line in gt.splitlines() if line.startswith("@prefix")]
 
-    def _hydrate_triples(
-        self,
-        matched: list,
-        graph_id: str = None,
-    ) -> Graph:
-        matched_ids = matched.keys()
-        triple_ids = " ".join(f'("{id}")' for id in matched_ids)
-        g_id = f"data-{graph_id}" if graph_id else "data"
+    def _get_prefix_block(self, g: Graph) -> str:
+        if isinstance(g, Ontology):
+            return g.prefix_block()
 
-        query = f"""
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+        prefixes = self._get_prefixes(g)
+        return "\n".join(prefixes).replace("@prefix", "PREFIX").replace(" .", "")
 
-        CONSTRUCT {{
-            ?s ?p ?o .
-        }}
-        WHERE {{
-            GRAPH <{g_id}> {{
-                VALUES (?uuid) {{ {triple_ids} }}
-                ?triple_node <{TRIPLE_PROP.uuid}> ?uuid .
-                ?triple_node rdf:subject ?s ;
-                            rdf:predicate ?p ;
-                            rdf:object ?o .
-            }}
-        }}
-        """
+    def _graph_name(self, kind: str, graph_id: str = None) -> str:
+        return f"{kind}-{graph_id}" if graph_id else kind
 
-        result = self._query(
-            url=f"{self.connection_url}/sparql",
-            method=GET,
-            query=query,
-        )
+    def _quoted_triple(self, s, p, o) -> str:
+        return f"<< {s.n3()} {p.n3()} {o.n3()} >>"
 
-        g = Graph()
-        g.parse(data=result, format="turtle")
+    def _load_query(self, id: str) -> str:
+        return f"CONSTRUCT {{ ?s ?p ?o }} WHERE {{ GRAPH <{id}> {{ ?s ?p ?o }} }}"
+
+    def _load_graph(
+        self,
+        g: Graph,
+        namespaces: dict[str, Namespace],
+        response: bytes,
+    ) -> Graph:
+        g.parse(data=response, format="turtle")
+
+        for p, n in namespaces.items():
+            g.bind(p, n)
 
         return g
 
@@ -97,52 +226,163 @@ class ApacheJena(TripleStoreModel):
         namespaces: dict[str, Namespace],
         id: str,
     ) -> Graph:
-        query = f"CONSTRUCT {{ ?s ?p ?o }} WHERE {{ GRAPH <{id}> {{ ?s ?p ?o }} }}"
-
         response = self._query(
             url=f"{self.connection_url}/sparql",
             method=POST,
-            query=query,
+            query=self._load_query(id=id),
         )
 
-        g.parse(data=response, format="turtle")
+        return self._load_graph(g=g, namespaces=namespaces, response=response)
 
-        for p, n in namespaces.items():
-            g.bind(p, n)
+    async def _aload(
+        self,
+        g: Graph,
+        namespaces: dict[str, Namespace],
+        id: str,
+    ) -> Graph:
+        response = await self._aquery(
+            url=f"{self.connection_url}/sparql",
+            method=POST,
+            query=self._load_query(id=id),
+        )
 
-        return g
+        return self._load_graph(g=g, namespaces=namespaces, response=response)
+
+    def _ids_block(self, ids: dict[tuple, str], id: str = None) -> str:
+        if not ids or self.identity != "rdf-star":
+            return ""
+
+        i_triples = "\n".join(
+            f"{self._quoted_triple(s, p, o)} <{TRIPLE_PROP.uuid}> {Literal(t_id).n3()} ."
+            for (s, p, o), t_id in ids.items()
+        )
+
+        return f"GRAPH <{self._graph_name('ids', id)}> {{{i_triples}}}"
+
+    def _ontology_state(self, ontology: Graph) -> tuple | None:
+        if isinstance(ontology, Ontology):
+            return (id(ontology), ontology.version, len(ontology))
+
+        return None
+
+    def _ontology_delta(self, ontology: Graph, id: str = None) -> Graph:
+        graph_name = self._graph_name("ontology", id)
+        state = self._ontology_state(ontology)
+
+        with self._synced_lock:
+            synced_state, synced = self._synced.get(graph_name, (None, set()))
+
+            if graph_name in self._synced:
+                self._synced.move_to_end(graph_name)
+
+        if state is not None and state == synced_state:
+            return Graph()
+
+        delta = Graph()
+        for triple in ontology:
+            if triple not in synced:
+                delta.add(triple)
+
+        return delta
+
+    def _mark_synced(self, ontology: Graph, delta: Graph, id: str = None) -> None:
+        graph_name = self._graph_name("ontology", id)
+
+        with self._synced_lock:
+            _, synced = self._synced.get(graph_name, (None, set()))
+            self._synced[graph_name] = (
+                self._ontology_state(ontology),
+                synced | set(delta),
+            )
+            self._synced.move_to_end(graph_name)
+
+            # a graph that falls out of the cache is sent in full on its next save
+            while len(self._synced) > self.synced_cache_size:
+                self._synced.popitem(last=False)
+
+    def _forget_synced(self, graph_id: str = None) -> None:
+        with self._synced_lock:
+            self._synced.pop(self._graph_name("ontology", graph_id), None)
+
+    def release(self, id: str = None) -> None:
+        self._forget_synced(graph_id=id)
+
+    def _save_query(
+        self,
+        ontology: Graph,
+        data: Graph,
+        id: str = None,
+        ids: dict[tuple, str] = None,
+    ) -> str:
+        d_triples = data.serialize(format="nt")
+        updates = []
+
+        if len(ontology):
+            o_triples = ontology.serialize(format="nt")
+            updates.append(
+                f"""INSERT DATA {{
+            GRAPH <{self._graph_name("ontology", id)}> {{{o_triples}}}
+        }}"""
+            )
+
+        if ids and self.identity == "reification":
+            d_triples += hydrate_graph_with_ids(Graph(), ids=ids).serialize(format="nt")
+
+        if d_triples.strip() or ids:
+            updates.append(
+                f"""INSERT DATA {{
+            GRAPH <{self._graph_name("data", id)}> {{{d_triples}}}
+            {self._ids_block(ids=ids, id=id)}
+        }}"""
+            )
+
+        return " ;\n".join(updates)
 
     def save(
         self,
         ontology: Graph,
         data: Graph,
         id: str = None,
+        ids: dict[tuple, str] = None,
     ) -> None:
-        o_triples = ontology.serialize(format="nt")
-        d_triples = data.serialize(format="nt")
-        prefixes = self._get_prefixes(ontology)
-        prefix_block = (
-            "\n".join(prefixes).replace("@prefix", "PREFIX").replace(" .", "")
-        )
+        delta = self._ontology_delta(ontology=ontology, id=id)
+        query = self._save_query(ontology=delta, data=data, id=id, ids=ids)
 
-        if id:
-            query = f"""{prefix_block} 
-            INSERT DATA {{ 
-                GRAPH <ontology-{id}> {{{o_triples}}} 
-                GRAPH <data-{id}> {{{d_triples}}} 
-            }}"""
-        else:
-            query = f"""{prefix_block} 
-            INSERT DATA {{ 
-                GRAPH <ontology> {{{o_triples}}} 
-                GRAPH <data> {{{d_triples}}} 
-            }}"""
+        if query:
+            result = self._query(
+                url=f"{self.connection_url}/update",
+                method=POST,
+                query=query,
+            )
 
-        self._query(
-            url=f"{self.connection_url}/update",
-            method=POST,
-            query=query,
-        )
+            # a failed update leaves the delta unsynced so the next save resends it
+            if result is None:
+                return
+
+        self._mark_synced(ontology=ontology, delta=delta, id=id)
+
+    async def asave(
+        self,
+        ontology: Graph,
+        data: Graph,
+        id: str = None,
+        ids: dict[tuple, str] = None,
+    ) -> None:
+        delta = self._ontology_delta(ontology=ontology, id=id)
+        query = self._save_query(ontology=delta, data=data, id=id, ids=ids)
+
+        if query:
+            result = await self._aquery(
+                url=f"{self.connection_url}/update",
+                method=POST,
+                query=query,
+            )
+
+            # a failed update leaves the delta unsynced so the next save resends it
+            if result is None:
+                return
+
+        self._mark_synced(ontology=ontology, delta=delta, id=id)
 
     def load(
         self,
@@ -152,37 +392,54 @@ class ApacheJena(TripleStoreModel):
         ontology_id = f"ontology-{id}" if id else "ontology"
         data_id = f"data-{id}" if id else "data"
 
-        ontology = Graph()
-        data = Graph()
+        ontology = self._load(g=Graph(), namespaces=namespaces, id=ontology_id)
+        data = self._load(g=Graph(), namespaces=namespaces, id=data_id)
+        self._mark_synced(ontology=ontology, delta=ontology, id=id)
 
-        ontology = self._load(
-            g=ontology,
-            namespaces=namespaces,
-            id=ontology_id,
+        logger.opt(lazy=True).debug(
+            "Loaded Ontology Graph\n{}\n", lambda: ontology.serialize(format="turtle")
         )
-        data = self._load(
-            g=data,
-            namespaces=namespaces,
-            id=data_id,
+        logger.opt(lazy=True).debug(
+            "Loaded Data Graph\n{}\n", lambda: data.serialize(format="turtle")
         )
 
-        logger.debug(f"Loaded Ontology Graph\n{ontology.serialize(format='turtle')}\n")
-        logger.debug(f"Loaded Data Graph\n{data.serialize(format='turtle')}\n")
-
         return ontology, data
 
-    def get(
+    def load_ontology(self, namespaces: dict[str, Namespace], id: str = None) -> Graph:
+        ontology = self._load(
+            g=Graph(),
+            namespaces=namespaces,
+            id=self._graph_name("ontology", id),
+        )
+        self._mark_synced(ontology=ontology, delta=ontology, id=id)
+
+        return ontology
+
+    async def aload(
         self,
-        ontology: Graph,
-        id: str,
-        uri: URIRef,
-    ) -> list:
-        prefixes = self._get_prefixes(ontology)
-        prefix_block = (
-            "\n".join(prefixes).replace("@prefix", "PREFIX").replace(" .", "")
+        namespaces: dict[str, Namespace],
+        id: str = None,
+    ) -> Tuple[Graph, Graph]:
+        ontology_id = f"ontology-{id}" if id else "ontology"
+        data_id = f"data-{id}" if id else "data"
+
+        ontology = await self._aload(g=Graph(), namespaces=namespaces, id=ontology_id)
+        data = await self._aload(g=Graph(), namespaces=namespaces, id=data_id)
+        self._mark_synced(ontology=ontology, delta=ontology, id=id)
+
+        logger.opt(lazy=True).debug(
+            "Loaded Ontology Graph\n{}\n", lambda: ontology.serialize(format="turtle")
         )
+        logger.opt(lazy=True).debug(
+            "Loaded Data Graph\n{}\n", lambda: data.serialize(format="turtle")
+        )
+
+        return ontology, data
 
-        query = f"""{prefix_block}
+    def _get_query(self, ontology: Graph, id: str, uri: URIRef) -> str:
+        prefix_block = self._get_prefix_block(ontology)
+
+        return f"""{prefix_block}
         SELECT ?s ?p ?o WHERE {{
             GRAPH <data-{id}> {{
                 ?s ?p ?o .
@@ -191,19 +448,43 @@ class ApacheJena(TripleStoreModel):
         }}
         """
 
+    def get(
+        self,
+        ontology: Graph,
+        id: str,
+        uri: URIRef,
+    ) -> list:
         result = self._query(
             url=f"{self.connection_url}/sparql",
             method=GET,
-            query=query,
+            query=self._get_query(ontology=ontology, id=id, uri=uri),
             format=JSON,
         )
 
         return result["results"]["bindings"]
 
-    def get_all(self, graph_id: str = None) -> str:
-        g_id = f"data-{graph_id}" if graph_id else "data"
+    async def aget(
+        self,
+        ontology: Graph,
+        id: str,
+        uri: URIRef,
+    ) -> list:
+        result = await self._aquery(
+            url=f"{self.connection_url}/sparql",
+            method=GET,
+            query=self._get_query(ontology=ontology, id=id, uri=uri),
+            format=JSON,
+        )
+
+        return result["results"]["bindings"]
+
+    def _get_all_query(self, graph_id: str = None) -> str:
+        g_id = self._graph_name("data", graph_id)
+
+        if self.identity == "rdf-star":
+            return f"CONSTRUCT {{ ?s ?p ?o }} WHERE {{ GRAPH <{g_id}> {{ ?s ?p ?o }} }}"
 
-        query = f"""
+        return f"""
         CONSTRUCT {{
             ?s ?p ?o .
         }} WHERE {{
@@ -214,12 +495,45 @@ class ApacheJena(TripleStoreModel):
         }}
         """
 
-        result = self._query(
-            url=f"{self.connection_url}/sparql",
-            method=GET,
-            query=query,
+    def _get_all_page_query(
+        self,
+        graph_id: str = None,
+        limit: int = 1000,
+        offset: int = 0,
+    ) -> str:
+        g_id = self._graph_name("data", graph_id)
+        id_filter = (
+            ""
+            if self.identity == "rdf-star"
+            else f"FILTER NOT EXISTS {{ ?s <{TRIPLE_PROP.uuid}> ?uuid }}"
         )
 
+        # a stable order is what makes LIMIT and OFFSET walk the graph without gaps or repeats
+        return f"""
+        CONSTRUCT {{
+            ?s ?p ?o .
+        }} WHERE {{
+            {{
+                SELECT ?s ?p ?o WHERE {{
+                    GRAPH <{g_id}> {{
+                        ?s ?p ?o .
+                        {id_filter}
+                    }}
+                }}
+                ORDER BY ?s ?p ?o
+                LIMIT {limit}
+                OFFSET {offset}
+            }}
+        }}
+        """
+
+    def _page_size(self, page: str) -> int:
+        # N-Triples holds one triple per line, so a page is counted without parsing it
+        return sum(
+            1 for line in page.splitlines() if line.strip() and not line.startswith("#")
+        )
+
+    def _to_str(self, result: str | bytes) -> str:
         if isinstance(result, bytes):
             result = result.decode("utf-8")
 
@@ -228,101 +542,245 @@ class ApacheJena(TripleStoreModel):
 
         return str(result)
 
-    def get_context(
-        self, matched: dict[str, dict], graph_id: str, depth: int = 1
-    ) -> str:
-        g_id = f"data-{graph_id}" if graph_id else "data"
-        nodes_set = set()
+    def get_all(self, graph_id: str = None) -> str:
+        result = self._query(
+            url=f"{self.connection_url}/sparql",
+            method=GET,
+            query=self._get_all_query(graph_id=graph_id),
+        )
 
-        matched_graph = self._hydrate_triples(
-            matched=matched,
-            graph_id=graph_id,
+        return self._to_str(result)
+
+    async def aget_all(self, graph_id: str = None) -> str:
+        result = await self._aquery(
+            url=f"{self.connection_url}/sparql",
+            method=GET,
+            query=self._get_all_query(graph_id=graph_id),
         )
-        logger.debug(f"Matched Triples\n{matched_graph.serialize(format='turtle')}\n")
 
-        for s, p, o in matched_graph:
-            nodes_set.add(format_node(s))
-            nodes_set.add(format_node(o))
+        return self._to_str(result)
 
-        explored_nodes = set(nodes_set)
-        new_nodes_set = nodes_set.copy()
+    def get_all_pages(
+        self,
+        graph_id: str = None,
+        page_size: int = 1000,
+    ) -> Iterator[str]:
+        offset = 0
+
+        while True:
+            page = self._to_str(
+                self._query(
+                    url=f"{self.connection_url}/sparql",
+                    method=GET,
+                    query=self._get_all_page_query(
+                        graph_id=graph_id,
+                        limit=page_size,
+                        offset=offset,
+                    ),
+                    format=NTRIPLES,
+                )
+            )
+            size = self._page_size(page)
+
+            if size:
+                yield page
+
+            if size < page_size:
+                return
+
+            offset += page_size
+
+    async def aget_all_pages(
+        self,
+        graph_id: str = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[str]:
+        offset = 0
+
+        while True:
+            page = self._to_str(
+                await self._aquery(
+                    url=f"{self.connection_url}/sparql",
+                    method=GET,
+                    query=self._get_all_page_query(
+                        graph_id=graph_id,
+                        limit=page_size,
+                        offset=offset,
+                    ),
+                    format=NTRIPLES,
+                )
+            )
+            size = self._page_size(page)
+
+            if size:
+                yield page
+
+            if size < page_size:
+                return
+
+            offset += page_size
+
+    def _get_context_query(
+        self,
+        matched: dict[str, dict],
+        graph_id: str,
+        depth: int,
+        limit: int,
+    ) -> str:
+        g_id = self._graph_name("data", graph_id)
+        triple_ids = " ".join(f'"{id}"' for id in matched.keys())
+        id_props = f"rdf:subject|rdf:predicate|rdf:object|<{TRIPLE_PROP.uuid}>"
 
-        query = None
+        # walk any data edge in either direction, never through the triple id nodes
+        hop = f"(!({id_props})|^!({id_props}))?"
 
-        for _ in range(depth):
-            if not new_nodes_set:
-                break
+        if depth > 1:
+            reach = (
+                f"GRAPH <{g_id}> {{ ?seed {'/'.join([hop] * (depth - 1))} ?node . }}"
+            )
+        else:
+            reach = "BIND(?seed AS ?node)"
 
-            node_list = ", ".join(new_nodes_set)
+        if self.identity == "rdf-star":
+            seeds = f"""GRAPH <{self._graph_name("ids", graph_id)}> {{
+                {{ << ?seed ?sp ?so >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+                UNION
+                {{ << ?ss ?sp ?seed >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+            }}"""
+            id_filter = ""
+        else:
+            seeds = f"""GRAPH <{g_id}> {{
+                {{ ?triple_node <{TRIPLE_PROP.uuid}> ?uuid ; rdf:subject ?seed . }}
+                UNION
+                {{ ?triple_node <{TRIPLE_PROP.uuid}> ?uuid ; rdf:object ?seed . }}
+            }}"""
+            id_filter = f"FILTER (?p NOT IN (rdf:subject, rdf:predicate, rdf:object, <{TRIPLE_PROP.uuid}>))"
 
-            query = f"""
-            CONSTRUCT {{
-                ?s ?p ?o .
-            }}
-            WHERE {{
-                GRAPH <{g_id}> {{
-                    ?s ?p ?o .
-                    FILTER (
-                        (?s IN ({node_list}) || ?o IN ({node_list})) &&
-                        NOT EXISTS {{ ?s <{TRIPLE_PROP.uuid}> ?uuid }}
-                    )
+        return f"""
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+        CONSTRUCT {{
+            ?s ?p ?o .
+        }}
+        WHERE {{
+            {{
+                SELECT DISTINCT ?s ?p ?o WHERE {{
+                    {{
+                        SELECT DISTINCT ?node WHERE {{
+                            VALUES ?uuid {{ {triple_ids} }}
+                            {seeds}
+                            {reach}
+                        }}
+                    }}
+                    GRAPH <{g_id}> {{
+                        {{ ?node ?p ?o . BIND(?node AS ?s) }}
+                        UNION
+                        {{ ?s ?p ?node . BIND(?node AS ?o) }}
+                        {id_filter}
+                    }}
                 }}
+                LIMIT {limit}
             }}
-            """
-
-            logger.debug(f"Find adjacent triples SPARQL query\n{query}\n")
+        }}
+        """
 
-            try:
-                result_triples = self.query(query=query, format="turtle")
-            except Exception as e:
-                raise ValueError(f"SPARQL Query Error: {e}")
+    def get_context(
+        self,
+        matched: dict[str, dict],
+        graph_id: str,
+        depth: int = 1,
+        limit: int = None,
+    ) -> str:
+        if not matched:
+            return ""
 
-            if result_triples is None:
-                raise ValueError("SPARQL query returned no results")
+        query = self._get_context_query(
+            matched=matched,
+            graph_id=graph_id,
+            depth=depth,
+            limit=limit or self.max_context_triples,
+        )
 
-            graph = Graph()
-            graph.parse(data=result_triples, format="turtle")
+        try:
+            result = self.query(query=query, format="turtle")
+        except Exception as e:
+            raise ValueError(f"SPARQL Query Error: {e}")
 
-            temp_new_nodes_set = set()
-            for s, p, o in graph:
-                formatted_subject = format_node(s)
-                formatted_object = format_node(o)
+        logger.debug(f"Adjacent Triples\n{result}\n")
 
-                if formatted_subject not in explored_nodes:
-                    temp_new_nodes_set.add(formatted_subject)
-                    explored_nodes.add(formatted_subject)
+        return result
 
-                if formatted_object not in explored_nodes:
-                    temp_new_nodes_set.add(formatted_object)
-                    explored_nodes.add(formatted_object)
+    async def aget_context(
+        self,
+        matched: dict[str, dict],
+        graph_id: str,
+        depth: int = 1,
+        limit: int = None,
+    ) -> str:
+        if not matched:
+            return ""
 
-            new_nodes_set = temp_new_nodes_set
+        query = self._get_context_query(
+            matched=matched,
+            graph_id=graph_id,
+            depth=depth,
+            limit=limit or self.max_context_triples,
+        )
 
-        if query is None:
-            return ""
+        try:
+            result = await self.aquery(query=query, format="turtle")
+        except Exception as e:
+            raise ValueError(f"SPARQL Query Error: {e}")
 
-        result = self.query(query=query, format="turtle")
         logger.debug(f"Adjacent Triples\n{result}\n")
 
         return result
 
-    def delete_all(self, graph_id: str = None) -> None:
-        d_id = f"data-{graph_id}" if graph_id else "data"
-        o_id = f"ontology-{graph_id}" if graph_id else "ontology"
-
+    def _delete_all_query(self, graph_id: str = None) -> str:
+        d_id = self._graph_name("data", graph_id)
+        o_id = self._graph_name("ontology", graph_id)
         query = f"""DROP GRAPH <{o_id}> ; DROP GRAPH <{d_id}> ;"""
 
+        if self.identity == "rdf-star":
+            query += f""" DROP SILENT GRAPH <{self._graph_name("ids", graph_id)}> ;"""
+
+        return query
+
+    def delete_all(self, graph_id: str = None) -> None:
         self._query(
             url=f"{self.connection_url}/update",
             method=POST,
-            query=query,
+            query=self._delete_all_query(graph_id=graph_id),
         )
+        self._forget_synced(graph_id=graph_id)
 
-    def delete_by_ids(self, ids: list[str], graph_id: str = None) -> None:
-        g_id = f"data-{graph_id}" if graph_id else "data"
+    async def adelete_all(self, graph_id: str = None) -> None:
+        await self._aquery(
+            url=f"{self.connection_url}/update",
+            method=POST,
+            query=self._delete_all_query(graph_id=graph_id),
+        )
+        self._forget_synced(graph_id=graph_id)
+
+    def _delete_by_ids_query(self, ids: list[str], graph_id: str = None) -> str:
+        g_id = self._graph_name("data", graph_id)
         t_ids = " ".join(f'"{id}"' for id in ids)
 
-        query = f"""
+        if self.identity == "rdf-star":
+            i_id = self._graph_name("ids", graph_id)
+
+            return f"""
+            DELETE {{
+                GRAPH <{g_id}> {{ ?s ?p ?o . }}
+                GRAPH <{i_id}> {{ << ?s ?p ?o >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+            }}
+            WHERE {{
+                VALUES ?uuid {{ {t_ids} }}
+                GRAPH <{i_id}> {{ << ?s ?p ?o >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+            }}
+            """
+
+        return f"""
         PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
 
         DELETE {{
@@ -346,12 +804,77 @@ class ApacheJena(TripleStoreModel):
         }}
         """
 
+    def delete_by_ids(self, ids: list[str], graph_id: str = None) -> None:
         self._query(
             url=f"{self.connection_url}/update",
             method=POST,
-            query=query,
+            query=self._delete_by_ids_query(ids=ids, graph_id=graph_id),
+        )
+
+    async def adelete_by_ids(self, ids: list[str], graph_id: str = None) -> None:
+        await self._aquery(
+            url=f"{self.connection_url}/update",
+            method=POST,
+            query=self._delete_by_ids_query(ids=ids, graph_id=graph_id),
+        )
+
+    def _migrate_identity_query(self, graph_id: str = None) -> str:
+        g_id = self._graph_name("data", graph_id)
+        i_id = self._graph_name("ids", graph_id)
+        reified = f"""?triple_node <{TRIPLE_PROP.uuid}> ?uuid ;
+                            rdf:subject ?s ;
+                            rdf:predicate ?p ;
+                            rdf:object ?o ."""
+        quoted = f"<< ?s ?p ?o >> <{TRIPLE_PROP.uuid}> ?uuid ."
+
+        if self.identity == "rdf-star":
+            delete, insert, where = (
+                f"GRAPH <{g_id}> {{ {reified} }}",
+                f"GRAPH <{i_id}> {{ {quoted} }}",
+                "",
+            )
+        else:
+            delete, insert, where = (
+                f"GRAPH <{i_id}> {{ {quoted} }}",
+                f"GRAPH <{g_id}> {{ {reified} }}",
+                f"BIND(IRI(CONCAT(STR(<{TRIPLE_NODE}>), STR(?uuid))) AS ?triple_node)",
+            )
+
+        return f"""
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+        DELETE {{ {delete} }}
+        INSERT {{ {insert} }}
+        WHERE {{ {delete} {where} }}
+        """
+
+    def migrate_identity(self, graph_id: str = None) -> None:
+        """
+        Convert the triple ids of an existing graph to the configured identity scheme.
+
+        :param graph_id: The id of the graph to migrate.
+
+        :return: None
+        """
+        self._query(
+            url=f"{self.connection_url}/update",
+            method=POST,
+            query=self._migrate_identity_query(graph_id=graph_id),
         )
 
+    async def amigrate_identity(self, graph_id: str = None) -> None:
+        await self._aquery(
+            url=f"{self.connection_url}/update",
+            method=POST,
+            query=self._migrate_identity_query(graph_id=graph_id),
+        )
+
+    def _query_result(self, result: str | bytes | dict, format: str) -> list | str:
+        if format == JSON:
+            return result["results"]["bindings"]
+        else:
+            return result.decode("utf-8")
+
     def query(self, query: str, method: str = GET, format: str = JSON) -> list:
         result = self._query(
             url=f"{self.connection_url}/sparql",
@@ -360,7 +883,14 @@ class ApacheJena(TripleStoreModel):
             format=format,
         )
 
-        if format == JSON:
-            return result["results"]["bindings"]
-        else:
-            return result.decode("utf-8")
+        return self._query_result(result=result, format=format)
+
+    async def aquery(self, query: str, method: str = GET, format: str = JSON) -> list:
+        result = await self._aquery(
+            url=f"{self.connection_url}/sparql",
+            method=method,
+            query=query,
+            format=format,
+        )
+
+        return self._query_result(result=result, format=format)
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, ConfigDict
 
@@ -19,3 +20,43 @@ class VectorStoreModel(BaseModel, ABC):
         Perform a get query against the datastore for memory data.
         """
         pass
+
+    def search_many(
+        self,
+        messages: list[str],
+        id: str = None,
+        k: int = 3,
+        **kwargs,
+    ) -> list[dict[str, dict]]:
+        """
+        Search the datastore for several messages. Stores that support batched queries override this to search in one request.
+        """
+        return [
+            self.search(message=message, id=id, k=k, **kwargs) for message in messages
+        ]
+
+    def release(self, id: str = None) -> None:
+        """
+        Drop the client-side state the store keeps for a memory, e.g. when its Memonto instance is evicted. The stored memories are left untouched.
+
+        :param id: The id of the memory.
+
+        :return: None
+        """
+        pass
+
+    # Stores without a native async client fall back to running the sync call in a worker thread.
+    async def asave(self, *args, **kwargs):
+        return await asyncio.to_thread(self.save, *args, **kwargs)
+
+    async def asearch(self, *args, **kwargs):
+        return await asyncio.to_thread(self.search, *args, **kwargs)
+
+    async def asearch_many(self, *args, **kwargs):
+        return await asyncio.to_thread(self.search_many, *args, **kwargs)
+
+    async def adelete(self, *args, **kwargs):
+        return await asyncio.to_thread(self.delete, *args, **kwargs)
+
+    async def adelete_by_ids(self, *args, **kwargs):
+        return await asyncio.to_thread(self.delete_by_ids, *args, **kwargs)
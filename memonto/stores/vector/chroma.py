@@ -1,14 +1,26 @@
 import chromadb
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from chromadb.config import Settings
-from pydantic import model_validator
-from rdflib import Graph, RDF, Namespace
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from pydantic import Field, PrivateAttr, model_validator
+from rdflib import Graph, Namespace
 from typing import Literal
 
 from memonto.stores.vector.base_store import VectorStoreModel
 from memonto.utils.logger import logger
-from memonto.utils.rdf import is_bnode_uuid, is_rdf_schema, to_human_readable
-from memonto.utils.namespaces import TRIPLE_PROP
+from memonto.utils.metrics import measure, observe
+from memonto.utils.rdf import index_triple_ids, is_rdf_schema, to_human_readable
+
+
+HNSW_SETTINGS = {
+    "space": "hnsw:space",
+    "ef_construction": "hnsw:construction_ef",
+    "ef_search": "hnsw:search_ef",
+    "M": "hnsw:M",
+}
 
 
 class Chroma(VectorStoreModel):
@@ -22,9 +34,25 @@ class Chroma(VectorStoreModel):
     path: str = None
     host: str = None
     port: int = None
+    embedding_function: object = None
+    embedding_batch_size: int = 256
+    embedding_workers: int = 1
+    query_cache_size: int = 1024
+    hnsw: dict = Field(default_factory=dict)
+    max_distance: float = None
+    _collections: dict = PrivateAttr(default_factory=dict)
+    _queries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     @model_validator(mode="after")
     def init(self) -> "Chroma":
+        unknown = set(self.hnsw) - set(HNSW_SETTINGS)
+
+        if unknown:
+            raise ValueError(
+                f"Invalid hnsw settings {sorted(unknown)}. Must be any of {list(HNSW_SETTINGS)}."
+            )
+
         if self.mode == "local":
             self.client = chromadb.PersistentClient(
                 path=self.path,
@@ -50,56 +78,229 @@ class Chroma(VectorStoreModel):
 
         return self
 
-    def save(self, g: Graph, ns: dict[str, Namespace], id: str = None) -> None:
-        collection = self.client.get_or_create_collection(id or "default")
+    def _collection_metadata(self) -> dict | None:
+        # HNSW settings only take effect when a collection is created
+        metadata = {HNSW_SETTINGS[k]: v for k, v in self.hnsw.items()}
+        return metadata or None
+
+    def _collection_kwargs(self) -> dict:
+        if self.embedding_function is None:
+            return {}
+
+        return {"embedding_function": self.embedding_function}
+
+    def _embedder(self):
+        if self.embedding_function is None:
+            with self._lock:
+                if self.embedding_function is None:
+                    self.embedding_function = DefaultEmbeddingFunction()
+
+        return self.embedding_function
+
+    def _embed_documents(self, documents: list[str]) -> list:
+        embed = self._embedder()
+        size = max(self.embedding_batch_size, 1)
+        batches = [documents[i : i + size] for i in range(0, len(documents), size)]
+
+        if self.embedding_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.embedding_workers) as executor:
+                embedded = list(executor.map(embed, batches))
+        else:
+            embedded = [embed(batch) for batch in batches]
+
+        return [embedding for batch in embedded for embedding in batch]
+
+    def _embed_queries(self, messages: list[str]) -> list:
+        embeddings = {}
+
+        with self._lock:
+            for message in messages:
+                if message in self._queries:
+                    self._queries.move_to_end(message)
+                    embeddings[message] = self._queries[message]
+
+        missing = list(dict.fromkeys(m for m in messages if m not in embeddings))
+
+        if missing:
+            embeddings |= dict(zip(missing, self._embedder()(missing)))
+
+            if self.query_cache_size > 0:
+                with self._lock:
+                    for message in missing:
+                        self._queries[message] = embeddings[message]
+
+                    while len(self._queries) > self.query_cache_size:
+                        self._queries.popitem(last=False)
+
+        return [embeddings[message] for message in messages]
+
+    def _get_collection(self, id: str = None, create: bool = False):
+        name = id or "default"
+        collection = self._collections.get(name)
+
+        if collection is not None:
+            return collection
+
+        with self._lock:
+            collection = self._collections.get(name)
+
+            if collection is None:
+                if create:
+                    collection = self.client.get_or_create_collection(
+                        name,
+                        metadata=self._collection_metadata(),
+                        **self._collection_kwargs(),
+                    )
+                else:
+                    collection = self.client.get_collection(
+                        name, **self._collection_kwargs()
+                    )
 
+                self._collections[name] = collection
+
+        return collection
+
+    def _forget_collection(self, id: str = None) -> None:
+        with self._lock:
+            self._collections.pop(id or "default", None)
+
+    def release(self, id: str = None) -> None:
+        self._forget_collection(id)
+
+    def _build_documents(
+        self,
+        g: Graph,
+        ns: dict[str, Namespace],
+        ids: dict[tuple, str],
+    ) -> tuple[list[str], list[dict], list[str]]:
         documents = []
         metadatas = []
-        ids = []
+        doc_ids = []
 
-        for s, p, o in g:
-            if is_rdf_schema(p) or is_bnode_uuid(s, g):
+        for (s, p, o), id in ids.items():
+            if is_rdf_schema(p):
                 continue
 
             _s = to_human_readable(str(s), ns)
             _p = to_human_readable(str(p), ns)
             _o = to_human_readable(str(o), ns)
 
-            id = ""
-            for bnode in g.subjects(RDF.subject, s):
-                if (bnode, RDF.predicate, p) in g and (bnode, RDF.object, o) in g:
-                    id = g.value(bnode, TRIPLE_PROP.uuid)
-
             documents.append(f"{_s} {_p} {_o}")
             metadatas.append(
                 {"triple": json.dumps({"s": str(s), "p": str(p), "o": str(o)})}
             )
-            ids.append(f"{id}")
+            doc_ids.append(f"{id}")
+
+        return documents, metadatas, doc_ids
+
+    def save(
+        self,
+        g: Graph,
+        ns: dict[str, Namespace],
+        id: str = None,
+        ids: dict[tuple, str] = None,
+    ) -> None:
+        collection = self._get_collection(id, create=True)
+
+        if ids is None:
+            ids = index_triple_ids(g)
+
+        documents, metadatas, doc_ids = self._build_documents(g=g, ns=ns, ids=ids)
 
         if documents:
+            observe(
+                "memonto_vector_documents",
+                len(documents),
+                provider=self.name,
+                operation="save",
+            )
+
             try:
-                collection.add(documents=documents, metadatas=metadatas, ids=ids)
+                with measure(
+                    "memonto_vector_request", provider=self.name, operation="save"
+                ):
+                    collection.upsert(
+                        documents=documents,
+                        embeddings=self._embed_documents(documents),
+                        metadatas=metadatas,
+                        ids=doc_ids,
+                    )
             except Exception as e:
+                self._forget_collection(id)
                 logger.error(f"Chroma Save\n{e}\n")
 
-    def search(self, message: str, id: str = None, k: int = 3) -> dict[str, dict]:
+    def search(
+        self,
+        message: str,
+        id: str = None,
+        k: int = 3,
+        max_distance: float = None,
+        include_distances: bool = False,
+    ) -> dict[str, dict]:
+        return self.search_many(
+            messages=[message],
+            id=id,
+            k=k,
+            max_distance=max_distance,
+            include_distances=include_distances,
+        )[0]
+
+    def search_many(
+        self,
+        messages: list[str],
+        id: str = None,
+        k: int = 3,
+        max_distance: float = None,
+        include_distances: bool = False,
+    ) -> list[dict[str, dict]]:
+        max_distance = self.max_distance if max_distance is None else max_distance
+
         try:
-            collection = self.client.get_collection(id or "default")
-            matched = collection.query(
-                query_texts=[message],
-                n_results=k,
-            )
+            collection = self._get_collection(id)
+
+            with measure(
+                "memonto_vector_request", provider=self.name, operation="search"
+            ):
+                matched = collection.query(
+                    query_embeddings=self._embed_queries(messages),
+                    n_results=k,
+                    include=["metadatas", "distances"],
+                )
         except ValueError as e:
-            return {}
+            self._forget_collection(id)
+            return [{} for _ in messages]
         except Exception as e:
+            self._forget_collection(id)
             logger.error(f"Chroma Search\n{e}\n")
+            return [{} for _ in messages]
+
+        results = []
 
-        ids = matched.get("ids", [[]])[0]
-        meta = matched.get("metadatas", [[]])[0]
+        for i in range(len(messages)):
+            ids = (matched.get("ids") or [[]] * len(messages))[i]
+            meta = (matched.get("metadatas") or [[]] * len(messages))[i] or []
+            distances = (matched.get("distances") or [[]] * len(messages))[i] or []
+            result = {}
 
-        return {id: meta[i] if i < len(meta) else None for i, id in enumerate(ids)}
+            for j, id in enumerate(ids):
+                distance = distances[j] if j < len(distances) else None
+
+                # drop neighbours too far away before they are hydrated and summarized
+                if None not in (max_distance, distance) and distance > max_distance:
+                    continue
+
+                result[id] = dict((meta[j] if j < len(meta) else None) or {})
+
+                if include_distances and distance is not None:
+                    result[id]["distance"] = distance
+
+            results.append(result)
+
+        return results
 
     def delete(self, id: str) -> None:
+        self._forget_collection(id)
+
         try:
             self.client.delete_collection(id)
         except Exception as e:
@@ -107,7 +308,8 @@ class Chroma(VectorStoreModel):
 
     def delete_by_ids(self, graph_id: str, ids: list[str]) -> None:
         try:
-            collection = self.client.get_collection(graph_id or "default")
+            collection = self._get_collection(graph_id)
             collection.delete(ids=list(ids))
         except Exception as e:
+            self._forget_collection(graph_id)
             logger.error(f"Chroma Delete by IDs\n{e}\n")
@@ -0,0 +1,285 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from typing import Optional
+
+
+def default_cache_path() -> str:
+    """
+    Return the path of the on-disk cache inside the user's cache directory, so caches are never written to the working directory.
+
+    :return: The path of the SQLite cache file.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(root, "memonto", "cache.db")
+
+
+class CacheModel(BaseModel, ABC):
+    name: str = ...
+    max_size: int = 1024
+    ttl: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    _stats_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        pass
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached value for a key and count the lookup as a hit or a miss.
+
+        :param key: The cache key.
+
+        :return: The cached value or None if it is missing or expired.
+        """
+        value = self._get(key)
+
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a value in the cache, evicting the least recently used entries above max_size.
+
+        :param key: The cache key.
+        :param value: The value to store.
+
+        :return: None
+        """
+        self._set(key, value)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the hit and miss counters of the cache.
+
+        :return: A dictionary with the number of hits and misses.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+
+class MemoryCache(CacheModel):
+    name: str = "memory"
+    _entries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, created_at = entry
+
+            if self._is_expired(created_at):
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str, created_at: float = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, created_at or time.time())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheModel):
+    name: str = "sqlite"
+    path: str = Field(default_factory=default_cache_path)
+    max_size: int = 100_000
+    access_flush_size: int = 256
+    _conn: sqlite3.Connection = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _size: int = PrivateAttr(default=0)
+    _accessed: dict = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def init(self) -> "SQLiteCache":
+        directory = os.path.dirname(self.path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)"
+        )
+        self._conn.commit()
+        (self._size,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return self
+
+    def _flush_accessed(self) -> None:
+        # access times only order the eviction so they are written in batches rather than on every hit
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(t, key) for key, t in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def _get_entry(self, key: str) -> Optional[tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, created_at = row
+
+            if self._is_expired(created_at):
+                self._accessed.pop(key, None)
+                self._size -= self._conn.execute(
+                    "DELETE FROM cache WHERE key = ?", (key,)
+                ).rowcount
+                self._conn.commit()
+                return None
+
+            self._accessed[key] = time.time()
+
+            if len(self._accessed) >= self.access_flush_size:
+                self._flush_accessed()
+                self._conn.commit()
+
+            return value, created_at
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+
+        with self._lock:
+            self._flush_accessed()
+            self._accessed.pop(key, None)
+
+            updated = self._conn.execute(
+                "UPDATE cache SET value = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                (value, now, now, key),
+            ).rowcount
+
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO cache VALUES (?, ?, ?, ?)", (key, value, now, now)
+                )
+                self._size += 1
+
+            if self._size > self.max_size:
+                self._size -= self._conn.execute(
+                    """
+                    DELETE FROM cache WHERE key IN (
+                        SELECT key FROM cache ORDER BY accessed_at LIMIT ?
+                    )
+                    """,
+                    (self._size - self.max_size,),
+                ).rowcount
+
+            if self.ttl is not None:
+                self._size -= self._conn.execute(
+                    "DELETE FROM cache WHERE created_at < ?", (now - self.ttl,)
+                ).rowcount
+
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self._accessed.clear()
+            self._size = 0
+
+
+class TieredCache(CacheModel):
+    name: str = "tiered"
+    max_size: int = 100_000
+    memory: MemoryCache = None
+    disk: SQLiteCache = None
+    path: str = Field(default_factory=default_cache_path)
+    memory_size: int = 1024
+
+    @model_validator(mode="after")
+    def init(self) -> "TieredCache":
+        if self.memory is None:
+            self.memory = MemoryCache(max_size=self.memory_size, ttl=self.ttl)
+
+        if self.disk is None:
+            self.disk = SQLiteCache(
+                path=self.path, max_size=self.max_size, ttl=self.ttl
+            )
+
+        return self
+
+    def _get(self, key: str) -> Optional[str]:
+        value = self.memory._get(key)
+
+        if value is None:
+            entry = self.disk._get_entry(key)
+
+            if entry is None:
+                return None
+
+            # the promoted entry keeps its age so bouncing between tiers never extends the ttl
+            value, created_at = entry
+            self.memory._set(key, value, created_at=created_at)
+
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        self.memory._set(key, value)
+        self.disk._set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
@@ -0,0 +1,88 @@
+import asyncio
+import httpx
+import threading
+import weakref
+
+_clients: dict[tuple[str, int], httpx.Client] = {}
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, int], httpx.AsyncClient]
+] = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _limits(pool_size: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+    )
+
+
+def get_http_client(base_url: str, pool_size: int = 10) -> httpx.Client:
+    """
+    Return a long-lived keep-alive HTTP client shared by every caller that talks to the same base url.
+
+    :param base_url: The url the client is dedicated to, used as the sharing key.
+    :param pool_size: The maximum number of pooled connections kept for the url.
+
+    :return: A pooled httpx client.
+    """
+    key = (base_url, pool_size)
+    client = _clients.get(key)
+
+    if client is None or client.is_closed:
+        with _lock:
+            client = _clients.get(key)
+
+            if client is None or client.is_closed:
+                client = httpx.Client(limits=_limits(pool_size))
+                _clients[key] = client
+
+    return client
+
+
+def get_async_http_client(base_url: str, pool_size: int = 10) -> httpx.AsyncClient:
+    """
+    Return a keep-alive async HTTP client shared by every caller on the running event loop that talks to the same base url.
+    Async connections are bound to the loop that opened them so each loop gets its own pool.
+
+    :param base_url: The url the client is dedicated to, used as the sharing key.
+    :param pool_size: The maximum number of pooled connections kept for the url.
+
+    :return: A pooled httpx async client.
+    """
+    loop = asyncio.get_running_loop()
+    key = (base_url, pool_size)
+
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=_limits(pool_size))
+            clients[key] = client
+
+    return client
+
+
+def close_http_clients() -> None:
+    """
+    Close every shared HTTP client and drop them from the pool.
+    """
+    with _lock:
+        for client in _clients.values():
+            client.close()
+
+        _clients.clear()
+
+
+async def aclose_http_clients() -> None:
+    """
+    Close the shared async HTTP clients of the running event loop and drop them from the pool.
+    """
+    loop = asyncio.get_running_loop()
+
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+
+    for client in clients.values():
+        await client.aclose()
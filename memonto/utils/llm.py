@@ -1,10 +1,54 @@
+import tiktoken
+from functools import lru_cache
 from pathlib import Path
 from string import Template
 
 
+@lru_cache(maxsize=None)
 def load_prompt(prompt_name: str) -> Template:
     base_dir = Path(__file__).resolve().parent.parent
     file_path = base_dir / "prompts" / f"{prompt_name}.prompt"
 
     with open(file_path, "r") as file:
         return Template(file.read())
+
+
+# encodings that are built in-process instead of being downloaded by tiktoken
+ENCODINGS: dict[str, tiktoken.Encoding] = {}
+
+
+def register_encoding(encoding: tiktoken.Encoding) -> None:
+    ENCODINGS[encoding.name] = encoding
+    get_encoding.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_model: str) -> tiktoken.Encoding:
+    if encoding_model in ENCODINGS:
+        return ENCODINGS[encoding_model]
+
+    try:
+        return tiktoken.encoding_for_model(encoding_model)
+    except Exception:
+        return tiktoken.get_encoding(encoding_model)
+
+
+@lru_cache(maxsize=None)
+def count_prompt_tokens(prompt_name: str, encoding_model: str) -> int:
+    return len(get_encoding(encoding_model).encode(load_prompt(prompt_name).template))
+
+
+# only short values are cached so graph dumps are never kept alive by the cache
+TOKEN_CACHE_MAX_CHARS = 4096
+
+
+@lru_cache(maxsize=1024)
+def _count_short_tokens(value: str, encoding_model: str) -> int:
+    return len(get_encoding(encoding_model).encode(value))
+
+
+def count_tokens(value: str, encoding_model: str) -> int:
+    if len(value) <= TOKEN_CACHE_MAX_CHARS:
+        return _count_short_tokens(value, encoding_model)
+
+    return len(get_encoding(encoding_model).encode(value))
@@ -1,16 +1,43 @@
 import sys
 from loguru import logger
 
+_config = None
 
-def setup_logger(debug: bool) -> None:
+
+def setup_logger(
+    debug: bool,
+    log_file: str | None = None,
+    enqueue: bool = False,
+) -> None:
+    """
+    Configure the memonto log sinks.
+
+    :param debug: Whether to log debug messages to stdout and the log file.
+    :param log_file: Path of the log file sink. Pass None to disable file logging.
+    :param enqueue: Whether sinks write from a background thread instead of the calling thread.
+
+    :return: None
+    """
+    global _config
+
+    # many Memonto instances share one process so only reconfigure when the settings change
+    if _config == (debug, log_file, enqueue):
+        return
+
+    _config = (debug, log_file, enqueue)
     logger.remove()
+    level = "DEBUG" if debug else "INFO"
+
+    if log_file:
+        logger.add(log_file, level=level, enqueue=enqueue)
 
     if debug:
-        logger.add("memonto.log", level="DEBUG")
-        logger.add(sys.stdout, level="DEBUG")
+        logger.add(sys.stdout, level=level, enqueue=enqueue)
         logger.debug("Debug mode enabled.")
+    elif not log_file:
+        # without any sink warnings and errors would be dropped silently
+        logger.add(sys.stderr, level="WARNING", enqueue=enqueue)
     else:
-        logger.add("memonto.log", level="INFO")
         logger.info("Debug mode disabled.")
 
 
@@ -0,0 +1,165 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Protocol
+
+
+class MetricsExporter(Protocol):
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None: ...
+
+    def increment(self, name: str, value: float, labels: dict[str, str]) -> None: ...
+
+
+class MetricsRegistry:
+    """
+    In-process store of counters and summaries that renders them in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._counters = {}
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            count, total = series.get(key, (0, 0.0))
+            series[key] = (count + 1, total + value)
+
+    def increment(self, name: str, value: float, labels: dict[str, str]) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def get(self, name: str, **labels) -> tuple[int, float] | float | None:
+        """
+        Return the current value of a metric series.
+
+        :param name: The name of the metric.
+        :param labels: The labels of the series.
+
+        :return: The counter value, the (count, sum) of a summary or None if the series does not exist.
+        """
+        key = self._key(labels)
+
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(key)
+
+            return self._summaries.get(name, {}).get(key)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def render(self) -> str:
+        """
+        Render every recorded metric in the Prometheus text exposition format.
+
+        :return: The rendered metrics.
+        """
+        lines = []
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+            for name, series in sorted(self._summaries.items()):
+                lines.append(f"# TYPE {name} summary")
+
+                for key, (count, total) in sorted(series.items()):
+                    lines.append(f"{name}_count{_labels(key)} {count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(total)}")
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_exporter: MetricsExporter | None = None
+
+
+def set_exporter(exporter: MetricsExporter | None) -> None:
+    """
+    Send metrics to an exporter such as a MetricsRegistry. Metrics are not recorded while no exporter is set.
+
+    :param exporter: An object with observe and increment methods or None to disable metrics.
+
+    :return: None
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter() -> MetricsExporter | None:
+    return _exporter
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if _exporter is not None:
+        _exporter.observe(name, value, labels)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    if _exporter is not None:
+        _exporter.increment(name, value, labels)
+
+
+@contextmanager
+def measure(name: str, **labels) -> Iterator[None]:
+    """
+    Record the wall clock duration of a block in seconds as the {name}_seconds summary.
+
+    :param name: The name of the measured operation.
+    :param labels: The labels of the series.
+    """
+    if _exporter is None:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+
+def record_timings(operation: str, timings: dict[str, float]) -> None:
+    """
+    Record the stage durations of a retain or recall.
+
+    :param operation: The name of the operation the stages belong to.
+    :param timings: The duration in seconds of every stage.
+
+    :return: None
+    """
+    if _exporter is None:
+        return
+
+    for stage, duration in timings.items():
+        observe("memonto_stage_seconds", duration, operation=operation, stage=stage)
@@ -1,3 +1,4 @@
 from rdflib import Namespace
 
 TRIPLE_PROP = Namespace("triple:property:")
+TRIPLE_NODE = Namespace("triple:node:")
@@ -0,0 +1,111 @@
+import threading
+from rdflib import Graph
+from typing import Callable
+
+
+class Ontology(Graph):
+    """
+    An rdflib Graph that renders each serialization once and reuses it until triples or prefixes change.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._renders = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_graph(cls, g: Graph) -> "Ontology":
+        """
+        Wrap a graph without copying it. The ontology shares the graph's store and namespace bindings.
+
+        :param g: The graph that defines the ontology.
+
+        :return: The versioned ontology.
+        """
+        if isinstance(g, cls):
+            return g
+
+        return cls(
+            store=g.store,
+            identifier=g.identifier,
+            namespace_manager=g.namespace_manager,
+        )
+
+    def _touch(self) -> None:
+        self.version += 1
+
+    def add(self, triple):
+        super().add(triple)
+        self._touch()
+        return self
+
+    def addN(self, quads):
+        super().addN(quads)
+        self._touch()
+        return self
+
+    def remove(self, triple):
+        super().remove(triple)
+        self._touch()
+        return self
+
+    def bind(self, *args, **kwargs) -> None:
+        super().bind(*args, **kwargs)
+        self._touch()
+
+    def _render(self, name: str, render: Callable[[], str]) -> str:
+        # the length guards against writes that went straight to the shared store
+        state = (self.version, len(self))
+
+        with self._lock:
+            cached = self._renders.get(name)
+
+            if cached is not None and cached[0] == state:
+                return cached[1]
+
+        rendered = render()
+
+        with self._lock:
+            self._renders[name] = (state, rendered)
+
+        return rendered
+
+    def serialize(
+        self,
+        destination=None,
+        format: str = "turtle",
+        base: str = None,
+        encoding: str = None,
+        **args,
+    ):
+        if destination is not None or base is not None or encoding is not None or args:
+            return super().serialize(
+                destination=destination,
+                format=format,
+                base=base,
+                encoding=encoding,
+                **args,
+            )
+
+        return self._render(
+            format, lambda: super(Ontology, self).serialize(format=format)
+        )
+
+    def prefix_block(self) -> str:
+        """
+        Return the SPARQL PREFIX declarations of the namespaces used by the ontology.
+
+        :return: The PREFIX block.
+        """
+
+        def render() -> str:
+            prefixes = [
+                line
+                for line in self.serialize(format="turtle").splitlines()
+                if line.startswith("@prefix")
+            ]
+
+            return "\n".join(prefixes).replace("@prefix", "PREFIX").replace(" .", "")
+
+        return self._render("prefix_block", render)
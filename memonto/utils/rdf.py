@@ -5,18 +5,24 @@ import re
 import uuid
 from collections import defaultdict
 from rdflib import Graph, Literal, BNode, Namespace, URIRef
-from rdflib.namespace import RDF, RDFS, OWL
+from rdflib.namespace import RDF, RDFS, OWL, XSD
 from typing import Union
 
-from memonto.utils.namespaces import TRIPLE_PROP
+from memonto.utils.logger import logger
+from memonto.utils.namespaces import TRIPLE_NODE, TRIPLE_PROP
+
+TRIPLE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, str(TRIPLE_PROP.uuid))
+SCHEMA_NAMESPACES = {"rdf": RDF, "rdfs": RDFS, "owl": OWL, "xsd": XSD}
+PROPERTY_TYPES = (RDF.Property, OWL.ObjectProperty, OWL.DatatypeProperty)
+CLASS_TYPES = (RDFS.Class, OWL.Class)
 
 
 def is_rdf_schema(p: str) -> Graph:
     return p.startswith(RDFS) or p.startswith(OWL) or p.startswith(RDF)
 
 
-def is_bnode_uuid(s: str, g: Graph) -> bool:
-    return isinstance(s, BNode) and (s, TRIPLE_PROP.uuid, None) in g
+def is_triple_node(s: str, g: Graph) -> bool:
+    return isinstance(s, (BNode, URIRef)) and (s, TRIPLE_PROP.uuid, None) in g
 
 
 def to_human_readable(c: str, ns: dict[str, Namespace]) -> str:
@@ -31,22 +37,11 @@ def to_human_readable(c: str, ns: dict[str, Namespace]) -> str:
     return c
 
 
-def format_node(node: URIRef | Literal | BNode) -> str:
-    if isinstance(node, URIRef):
-        return f"<{str(node)}>"
-    elif isinstance(node, Literal):
-        return f'"{str(node)}"'
-    elif isinstance(node, BNode):
-        return f"_:{str(node)}"
-    else:
-        return f'"{str(node)}"'
-
-
 def serialize_graph_without_ids(g: Graph, format: str = "turtle") -> Graph:
     graph = Graph()
 
     for s, p, o in g:
-        if isinstance(s, BNode) and (s, TRIPLE_PROP.uuid, None) in g:
+        if is_triple_node(s, g):
             continue
 
         graph.add((s, p, o))
@@ -54,11 +49,21 @@ def serialize_graph_without_ids(g: Graph, format: str = "turtle") -> Graph:
     return graph.serialize(format=format)
 
 
-def hydrate_graph_with_ids(g: Graph) -> Graph:
-    for s, p, o in g:
-        id = str(uuid.uuid4())
+def generate_triple_id(triple: tuple, graph_id: str = None) -> str:
+    key = "\x1f".join([*(n.n3() for n in triple), graph_id or ""])
+    return str(uuid.uuid5(TRIPLE_ID_NAMESPACE, key))
+
+
+def generate_triple_ids(g: Graph, graph_id: str = None) -> dict[tuple, str]:
+    return {(s, p, o): generate_triple_id((s, p, o), graph_id) for s, p, o in g}
 
-        triple_node = BNode()
+
+def hydrate_graph_with_ids(g: Graph, ids: dict[tuple, str] = None) -> Graph:
+    if ids is None:
+        ids = generate_triple_ids(g)
+
+    for (s, p, o), id in ids.items():
+        triple_node = TRIPLE_NODE[id]
 
         g.add((triple_node, RDF.subject, s))
         g.add((triple_node, RDF.predicate, p))
@@ -69,6 +74,19 @@ def hydrate_graph_with_ids(g: Graph) -> Graph:
     return g
 
 
+def index_triple_ids(g: Graph) -> dict[tuple, str]:
+    ids = {}
+
+    for triple_node, id in g.subject_objects(TRIPLE_PROP.uuid):
+        s = g.value(triple_node, RDF.subject)
+        p = g.value(triple_node, RDF.predicate)
+        o = g.value(triple_node, RDF.object)
+
+        ids[(s, p, o)] = str(id)
+
+    return ids
+
+
 def find_updated_triples(original: dict, updated: dict) -> dict[str, dict]:
     return {
         id: updated[id]
@@ -77,19 +95,114 @@ def find_updated_triples(original: dict, updated: dict) -> dict[str, dict]:
     }
 
 
+def resolve_term(term: str, namespaces: dict[str, Namespace]) -> URIRef | None:
+    term = str(term).strip().replace(" ", "_")
+    namespaces = SCHEMA_NAMESPACES | namespaces
+    prefix, _, local = term.partition(":")
+
+    if local and prefix in namespaces:
+        return namespaces[prefix][local]
+
+    for ns in namespaces.values():
+        if term.startswith(str(ns)):
+            return URIRef(term)
+
+    return None
+
+
+def _is_property(p: URIRef, ontology: Graph) -> bool:
+    return (
+        any((p, RDF.type, t) in ontology for t in PROPERTY_TYPES)
+        or (p, RDFS.domain, None) in ontology
+        or (p, RDFS.range, None) in ontology
+    )
+
+
+def _is_class(o: URIRef, ontology: Graph) -> bool:
+    return o is not None and any((o, RDF.type, t) in ontology for t in CLASS_TYPES)
+
+
+def _is_datatype(range: URIRef) -> bool:
+    return range is not None and (range == RDFS.Literal or range.startswith(XSD))
+
+
+def validate_triples(
+    triples: list[dict],
+    ontology: Graph,
+    namespaces: dict[str, Namespace],
+) -> list[tuple]:
+    """
+    Convert extracted triples into rdflib terms and drop the ones that do not fit the ontology.
+
+    :param triples: The extracted triples with subject, predicate, object, object_type and an optional datatype.
+    :param ontology: The ontology the triples are validated against.
+    :param namespaces: The namespaces prefixed names are resolved with.
+
+    :return: The valid triples.
+    """
+    valid = []
+
+    for t in triples:
+        s = resolve_term(t.get("subject", ""), namespaces)
+        p = resolve_term(t.get("predicate", ""), namespaces)
+        value = t.get("object", "")
+
+        if s is None or p is None or value in ("", None):
+            logger.debug(f"Invalid Triple (unknown term)\n{t}\n")
+            continue
+
+        if p == RDF.type:
+            o = resolve_term(value, namespaces)
+
+            if o is None or not _is_class(o, ontology):
+                logger.debug(f"Invalid Triple (unknown class)\n{t}\n")
+                continue
+        elif not _is_property(p, ontology):
+            logger.debug(f"Invalid Triple (unknown property)\n{t}\n")
+            continue
+        else:
+            range = ontology.value(p, RDFS.range)
+
+            if t.get("object_type") == "uri" and not _is_datatype(range):
+                o = resolve_term(value, namespaces)
+            else:
+                datatype = resolve_term(t.get("datatype") or "", namespaces)
+
+                if datatype is None and _is_datatype(range) and range != RDFS.Literal:
+                    datatype = range
+
+                o = Literal(str(value).strip(), datatype=datatype)
+
+            if o is None or (isinstance(o, Literal) and _is_class(range, ontology)):
+                logger.debug(f"Invalid Triple (range mismatch)\n{t}\n")
+                continue
+
+        valid.append((s, p, o))
+
+    return valid
+
+
+def triple_key(t: dict) -> tuple[str, str, str]:
+    return str(t["s"]).strip(), str(t["p"]).strip(), str(t["o"]).strip()
+
+
 def find_updated_triples_ephemeral(o: list[dict], n: list[dict]) -> list[dict]:
-    def is_updated(nt: dict, o: list[dict]) -> bool:
-        ns, np, no = str(nt["s"]), str(nt["p"]), str(nt["o"])
+    original = {triple_key(ot) for ot in o}
+
+    return [nt for nt in n if triple_key(nt) not in original]
 
-        for ot in o:
-            os, op, oo = str(ot["s"]), str(ot["p"]), str(ot["o"])
 
-            if ns == os and np == op and no == oo:
-                return False
+def remove_triples(g: Graph, triples: list[dict]) -> Graph:
+    keys = {triple_key(t) for t in triples}
 
-        return True
+    if not keys:
+        return g
 
-    return [nt for nt in n if is_updated(nt, o)]
+    for s, p, o in list(g):
+        if triple_key({"s": s, "p": p, "o": o}) in keys:
+            g.remove((s, p, o))
+
+    return g
 
 
 def generate_image(g: Graph, ns: dict[str, Namespace], path: str = None) -> None:
@@ -104,9 +217,7 @@ def generate_image(g: Graph, ns: dict[str, Namespace], path: str = None) -> None
     bnode_labels = defaultdict(lambda: f"BNode{len(bnode_labels) + 1}")
 
     for s, p, o in g:
-        if isinstance(s, BNode) and (s, TRIPLE_PROP.uuid, None) in g:
-            continue
-        if isinstance(o, BNode) and (o, TRIPLE_PROP.uuid, None) in g:
+        if is_triple_node(s, g) or is_triple_node(o, g):
             continue
 
         s_label = (
@@ -0,0 +1,90 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Generator, NamedTuple
+
+Steps = Generator["Call | list[Call]", Any, Any]
+
+
+class Call(NamedTuple):
+    target: object
+    method: str
+    kwargs: dict
+
+
+def call(target: object, method: str, **kwargs) -> Call:
+    """
+    Describe a call to a blocking method of an LLM or a store. Async drivers call the a-prefixed variant of the method instead.
+
+    :param target: The LLM or store to call.
+    :param method: The name of the blocking method.
+    :param kwargs: The keyword arguments of the call.
+
+    :return: The call description to yield from a steps generator.
+    """
+    return Call(target=target, method=method, kwargs=kwargs)
+
+
+def _invoke(request: Call | list[Call], concurrency: int) -> Any:
+    if not isinstance(request, list):
+        return getattr(request.target, request.method)(**request.kwargs)
+
+    if concurrency > 1 and len(request) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda r: _invoke(r, 1), request))
+
+    return [_invoke(r, concurrency) for r in request]
+
+
+async def _ainvoke(request: Call | list[Call], semaphore: asyncio.Semaphore) -> Any:
+    if isinstance(request, list):
+        return list(await asyncio.gather(*(_ainvoke(r, semaphore) for r in request)))
+
+    async with semaphore:
+        return await getattr(request.target, f"a{request.method}")(**request.kwargs)
+
+
+def run_steps(steps: Steps, concurrency: int = 1) -> Any:
+    """
+    Drive a steps generator with blocking calls. The generator yields a call or a list of calls and is sent their results, errors are raised inside the generator so it can handle them.
+
+    :param steps: The steps generator shared by the sync and async code paths.
+    :param concurrency: The maximum number of calls of a list that run at the same time.
+
+    :return: The value the generator returns.
+    """
+    send, value = steps.send, None
+
+    while True:
+        try:
+            request = send(value)
+        except StopIteration as e:
+            return e.value
+
+        try:
+            value, send = _invoke(request, concurrency), steps.send
+        except Exception as e:
+            value, send = e, steps.throw
+
+
+async def arun_steps(steps: Steps, concurrency: int = 8) -> Any:
+    """
+    Drive a steps generator with the async variants of its calls without blocking the event loop.
+
+    :param steps: The steps generator shared by the sync and async code paths.
+    :param concurrency: The maximum number of calls of a list that run at the same time.
+
+    :return: The value the generator returns.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    send, value = steps.send, None
+
+    while True:
+        try:
+            request = send(value)
+        except StopIteration as e:
+            return e.value
+
+        try:
+            value, send = await _ainvoke(request, semaphore), steps.send
+        except Exception as e:
+            value, send = e, steps.throw
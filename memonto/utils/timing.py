@@ -0,0 +1,19 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def timed(timings: dict[str, float], stage: str) -> Iterator[None]:
+    """
+    Record the wall clock duration of a block in seconds under the stage name.
+
+    :param timings: The dictionary the duration is written to.
+    :param stage: The name of the timed stage.
+    """
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
@@ -0,0 +1,36 @@
+from memonto.bench import run_benchmarks
+from memonto.bench.benchmarks import BENCH, make_memonto
+from memonto.bench.fakes import HashEmbedding
+
+
+def test_hash_embedding_is_deterministic():
+    embed = HashEmbedding(dimensions=8)
+
+    assert embed(["a b", "b a"]) == embed(["b a", "a b"])
+    assert len(embed(["a"])[0]) == 8
+
+
+def test_memonto_runs_offline():
+    memonto = make_memonto(20)
+
+    timings = memonto.retain("entity1 has a new value")
+
+    assert "persist_memory" in timings
+    assert "message0" in memonto.triple_store.get_all(graph_id="bench")
+    assert memonto.recall("entity1") == "A summary of the memories."
+    assert memonto.retrieve(uri=BENCH.entity1)
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(
+        sizes=[10],
+        repeat=1,
+        names=["rdf.hydrate", "jena.get_context", "llm."],
+    )
+
+    assert {r["name"] for r in results} == {
+        "rdf.hydrate_graph_with_ids",
+        "jena.get_context",
+        "llm.fit_to_context_window",
+    }
+    assert all(r["best"] > 0 and r["ops_per_second"] for r in results)
@@ -6,6 +6,7 @@ from memonto.llms.openai import OpenAI
 from memonto.llms.anthropic import Anthropic
 from memonto.stores.triple.jena import ApacheJena
 from memonto.stores.vector.chroma import Chroma
+from memonto.utils.cache import MemoryCache
 
 
 @pytest.fixture
@@ -81,6 +82,24 @@ def test_configure_with_openai_config(openai_provider, openai_model, api_key):
     assert vs is None
 
 
+def test_configure_with_llm_cache(openai_provider, openai_model, api_key):
+    config = {
+        "model": {
+            "provider": openai_provider,
+            "config": {
+                "model": openai_model,
+                "api_key": api_key,
+                "cache": {"provider": "memory", "config": {"max_size": 10}},
+            },
+        }
+    }
+
+    _, _, llm = _configure(config)
+
+    assert isinstance(llm.cache, MemoryCache)
+    assert llm.cache.max_size == 10
+
+
 def test_configure_with_bad_openai_config(openai_provider, api_key):
     config = {
         "model": {
@@ -158,13 +177,13 @@ def test_configure_with_bad_apache_jena_config(triple_store_provider, jena_url):
         _configure(config)
 
 
-def test_configure_with_chroma_config(vector_store_provider, jena_url):
+def test_configure_with_chroma_config(vector_store_provider, jena_url, tmp_path):
     config = {
         "vector_store": {
             "provider": vector_store_provider,
             "config": {
                 "model": "local",
-                "path": ".local",
+                "path": str(tmp_path),
             },
         },
     }
@@ -1,8 +1,17 @@
+import asyncio
+import json
 import pytest
 from rdflib import Graph, Literal, URIRef
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
-from memonto.core.recall import _recall
+from memonto.core.recall import (
+    _arecall,
+    _arecall_many,
+    _arecall_stream,
+    _recall,
+    _recall_many,
+    _recall_stream,
+)
 from memonto.memonto import Memonto
 from memonto.stores.triple.jena import ApacheJena
 
@@ -133,3 +142,373 @@ def test_fetch_some_memory_ephemeral(mock_llm, data_graph):
     )
 
     assert mem == "some summary"
+
+
+@patch("memonto.stores.triple.jena.ApacheJena.aget_all")
+def test_afetch_all_memory(mock_aget_all, jena, mock_llm, mock_store, id, data_graph):
+    all_memory = "all memory"
+    mock_aget_all.return_value = all_memory
+    mock_llm.aprompt = AsyncMock(return_value="some summary")
+
+    mem = asyncio.run(
+        _arecall(
+            data=data_graph,
+            llm=mock_llm,
+            vector_store=mock_store,
+            triple_store=jena,
+            context=None,
+            id=id,
+            ephemeral=False,
+        )
+    )
+
+    assert mem == "some summary"
+    mock_llm.aprompt.assert_awaited_once_with(
+        prompt_name="summarize_memory",
+        context="",
+        memory=all_memory,
+    )
+
+
+def test_fetch_some_memory_stream(mock_llm, data_graph):
+    mock_llm.prompt_stream = MagicMock(return_value=iter(["some ", "summary"]))
+
+    chunks = _recall_stream(
+        data=data_graph,
+        llm=mock_llm,
+        vector_store=None,
+        triple_store=None,
+        context=None,
+        id=None,
+        ephemeral=True,
+    )
+
+    assert list(chunks) == ["some ", "summary"]
+    mock_llm.prompt_stream.assert_called_once_with(
+        prompt_name="summarize_memory",
+        context="",
+        memory=ANY,
+    )
+
+
+def test_afetch_some_memory_stream(mock_llm, data_graph):
+    async def aprompt_stream(**kwargs):
+        for chunk in ["some ", "summary"]:
+            yield chunk
+
+    mock_llm.aprompt_stream = aprompt_stream
+
+    async def collect():
+        return [
+            chunk
+            async for chunk in _arecall_stream(
+                data=data_graph,
+                llm=mock_llm,
+                vector_store=None,
+                triple_store=None,
+                context=None,
+                id=None,
+                ephemeral=True,
+            )
+        ]
+
+    assert asyncio.run(collect()) == ["some ", "summary"]
+
+
+@pytest.fixture
+def many_setup():
+    from memonto.stores.triple.embedded import Embedded
+    from memonto.utils.rdf import generate_triple_ids
+
+    EX = "http://example.org/"
+    g = Graph()
+    a = (URIRef(f"{EX}a"), URIRef(f"{EX}knows"), URIRef(f"{EX}b"))
+    y = (URIRef(f"{EX}y"), URIRef(f"{EX}knows"), URIRef(f"{EX}z"))
+    g.add(a)
+    g.add(y)
+    ids = generate_triple_ids(g, graph_id="test-id-123")
+
+    store = Embedded()
+    store.save(ontology=Graph(), data=g, id="test-id-123", ids=ids)
+
+    def meta(t):
+        return {"triple": json.dumps({"s": str(t[0]), "p": str(t[1]), "o": str(t[2])})}
+
+    vector_store = MagicMock()
+    vector_store.search_many = MagicMock(
+        return_value=[{ids[a]: meta(a)}, {ids[y]: meta(y)}]
+    )
+
+    return store, vector_store, a, y
+
+
+def test_recall_many_fetches_once(many_setup, mock_llm, id):
+    store, vector_store, a, y = many_setup
+
+    with patch.object(
+        type(store), "get_context", autospec=True, side_effect=type(store).get_context
+    ) as get_context:
+        result = _recall_many(
+            data=Graph(),
+            llm=mock_llm,
+            vector_store=vector_store,
+            triple_store=store,
+            contexts=["who does a know", "who does y know"],
+            id=id,
+            ephemeral=False,
+        )
+
+    memories = [c.kwargs["memory"] for c in mock_llm.prompt.call_args_list]
+    memories = {m: set(Graph().parse(data=m, format="turtle")) for m in memories}
+
+    assert result == ["some summary", "some summary"]
+    assert vector_store.search_many.call_count == 1
+    assert get_context.call_count == 1
+    assert sorted(map(len, memories.values())) == [1, 1]
+    assert {next(iter(t)) for t in memories.values()} == {a, y}
+
+
+def test_recall_many_scales_context_limit(many_setup, mock_llm, id):
+    store, vector_store, a, y = many_setup
+    store.max_context_triples = 1
+
+    _recall_many(
+        data=Graph(),
+        llm=mock_llm,
+        vector_store=vector_store,
+        triple_store=store,
+        contexts=["who does a know", "who does y know"],
+        id=id,
+        ephemeral=False,
+    )
+
+    memories = [c.kwargs["memory"] for c in mock_llm.prompt.call_args_list]
+
+    assert [len(Graph().parse(data=m, format="turtle")) for m in memories] == [1, 1]
+
+
+def test_recall_many_combined(many_setup, mock_llm, id):
+    store, vector_store, _, _ = many_setup
+    mock_llm.prompt = MagicMock(return_value='["summary a", "summary y"]')
+
+    result = _recall_many(
+        data=Graph(),
+        llm=mock_llm,
+        vector_store=vector_store,
+        triple_store=store,
+        contexts=["who does a know", "who does y know"],
+        id=id,
+        ephemeral=False,
+        combined=True,
+    )
+
+    assert result == ["summary a", "summary y"]
+    assert mock_llm.prompt.call_count == 1
+    assert mock_llm.prompt.call_args.kwargs["prompt_name"] == "summarize_memory_many"
+
+
+def test_arecall_many_falls_back_per_context(many_setup, id):
+    store, vector_store, _, _ = many_setup
+    vector_store.asearch_many = AsyncMock(return_value=vector_store.search_many())
+    llm = MagicMock()
+    llm.aprompt = AsyncMock(side_effect=["not json", "summary a", "summary y"])
+
+    result = asyncio.run(
+        _arecall_many(
+            data=Graph(),
+            llm=llm,
+            vector_store=vector_store,
+            triple_store=store,
+            contexts=["who does a know", "who does y know"],
+            id=id,
+            ephemeral=False,
+            combined=True,
+        )
+    )
+
+    assert result == ["summary a", "summary y"]
+
+
+@pytest.fixture
+def map_reduce_setup():
+    from memonto.bench.fakes import ScriptedLLM
+    from memonto.stores.triple.embedded import Embedded
+    from memonto.utils.cache import MemoryCache
+    from memonto.utils.rdf import generate_triple_ids
+
+    EX = "http://example.org/"
+    g = Graph()
+
+    for i in range(40):
+        for j in range(3):
+            g.add((URIRef(f"{EX}s{i}"), URIRef(f"{EX}p{j}"), Literal(f"value {i} {j}")))
+
+    store = Embedded()
+    store.save(
+        ontology=Graph(),
+        data=g,
+        id="test-id-123",
+        ids=generate_triple_ids(g, graph_id="test-id-123"),
+    )
+    llm = ScriptedLLM(context_windows={"scripted": 4000}, cache=MemoryCache())
+
+    return store, llm, g
+
+
+def _map_reduce_recall(store, llm):
+    from memonto.bench.fakes import ScriptedLLM
+
+    with patch.object(
+        ScriptedLLM, "prompt", autospec=True, side_effect=ScriptedLLM.prompt
+    ) as prompt, patch.object(
+        ScriptedLLM, "_generate", autospec=True, side_effect=ScriptedLLM._generate
+    ) as generate:
+        result = _recall(
+            data=Graph(),
+            llm=llm,
+            vector_store=MagicMock(),
+            triple_store=store,
+            context=None,
+            id="test-id-123",
+            ephemeral=False,
+            summarization="map_reduce",
+        )
+
+    generated = [c.kwargs["prompt"] for c in generate.call_args_list]
+
+    return result, [c.kwargs for c in prompt.call_args_list], generated
+
+
+def test_recall_map_reduce(map_reduce_setup):
+    store, llm, g = map_reduce_setup
+
+    result, calls, _ = _map_reduce_recall(store, llm)
+    chunks = [c["memory"] for c in calls if c["prompt_name"] == "summarize_memory"]
+    reduces = [c for c in calls if c["prompt_name"] == "summarize_memory_summaries"]
+    lines = [line for chunk in chunks for line in chunk.splitlines()]
+
+    assert result == "A summary of the memories."
+    assert len(chunks) > 1
+    assert len(reduces) == 1
+    assert all(len(chunk.encode("utf-8")) <= 1000 for chunk in chunks)
+    assert len(lines) == len(set(lines)) == len(g)
+
+
+def test_recall_map_reduce_reuses_chunk_summaries(map_reduce_setup):
+    store, llm, g = map_reduce_setup
+    _, calls, generated = _map_reduce_recall(store, llm)
+    chunks = [c for c in calls if c["prompt_name"] == "summarize_memory"]
+
+    _, _, cached = _map_reduce_recall(store, llm)
+
+    assert len(generated) == len(chunks) + 1
+    assert cached == []
+
+    EX = "http://example.org/"
+    t = (URIRef(f"{EX}s7"), URIRef(f"{EX}p9"), Literal("changed"))
+    store.save(ontology=Graph(), data=Graph().add(t), id="test-id-123")
+
+    _, _, edited = _map_reduce_recall(store, llm)
+    edited_chunks = [prompt for prompt in edited if EX in prompt]
+
+    assert 1 <= len(edited_chunks) <= 2 < len(chunks)
+    assert any(t[2].n3() in prompt for prompt in edited_chunks)
+
+
+def test_recall_map_reduce_reuses_chunk_summaries_without_llm_cache(
+    map_reduce_setup,
+):
+    store, llm, g = map_reduce_setup
+    llm.cache = None
+
+    _, calls, _ = _map_reduce_recall(store, llm)
+    _, cached, _ = _map_reduce_recall(store, llm)
+
+    assert any(c["prompt_name"] == "summarize_memory" for c in calls)
+    assert not any(c["prompt_name"] == "summarize_memory" for c in cached)
+
+
+def test_chunker_keeps_subject_spanning_pages_together():
+    from memonto.bench.fakes import BYTE_ENCODING
+    from memonto.core.recall import _MemoryChunker
+
+    EX = "http://example.org/"
+    pages = []
+
+    for s, count in (("a", 1), ("b", 2), ("b", 2), ("b", 2), ("c", 1)):
+        page = Graph()
+        for i in range(count):
+            page.add((URIRef(f"{EX}{s}"), URIRef(f"{EX}p{len(pages)}{i}"), Literal(i)))
+        pages.append(page.serialize(format="turtle"))
+
+    chunker = _MemoryChunker(chunk_tokens=2, encoding_model=BYTE_ENCODING.name)
+    chunker._is_boundary = lambda subject: True
+    chunks = [c for page in pages for c in chunker.feed(page)] + list(chunker.close())
+
+    assert [{line.split()[0] for line in c.splitlines()} for c in chunks] == [
+        {f"<{EX}a>"},
+        {f"<{EX}b>"},
+        {f"<{EX}c>"},
+    ]
+    assert len(chunks[1].splitlines()) == 6
+
+
+def test_recall_stream_map_reduce(map_reduce_setup):
+    store, llm, _ = map_reduce_setup
+
+    chunks = list(
+        _recall_stream(
+            data=Graph(),
+            llm=llm,
+            vector_store=MagicMock(),
+            triple_store=store,
+            context=None,
+            id="test-id-123",
+            ephemeral=False,
+            summarization="map_reduce",
+        )
+    )
+
+    assert "".join(chunks) == "A summary of the memories."
+
+
+def test_arecall_map_reduce(map_reduce_setup):
+    store, llm, _ = map_reduce_setup
+
+    result = asyncio.run(
+        _arecall(
+            data=Graph(),
+            llm=llm,
+            vector_store=MagicMock(),
+            triple_store=store,
+            context=None,
+            id="test-id-123",
+            ephemeral=False,
+            summarization="map_reduce",
+        )
+    )
+
+    assert result == "A summary of the memories."
+
+
+def test_recall_map_reduce_empty_memory(mock_llm, id):
+    from memonto.stores.triple.embedded import Embedded
+
+    mock_llm.cache = None
+    mock_llm.get_context_window = MagicMock(return_value=4000)
+
+    result = _recall(
+        data=Graph(),
+        llm=mock_llm,
+        vector_store=MagicMock(),
+        triple_store=Embedded(),
+        context=None,
+        id=id,
+        ephemeral=False,
+        summarization="map_reduce",
+    )
+
+    assert result == "some summary"
+    mock_llm.prompt.assert_called_once_with(
+        prompt_name="summarize_memory", context="", memory=""
+    )
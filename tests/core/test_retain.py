@@ -1,8 +1,10 @@
+import asyncio
 import pytest
-from rdflib import Graph, Namespace
-from unittest.mock import ANY, MagicMock, call
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+from unittest.mock import ANY, AsyncMock, MagicMock, call
 
-from memonto.core.retain import _retain
+from memonto.bench.fakes import BYTE_ENCODING
+from memonto.core.retain import _aretain, _aretain_many, _retain, _retain_many
 
 
 @pytest.fixture
@@ -158,5 +160,351 @@ def test_commit_memory_auto_expand(
         user_message=user_query,
     )
 
+    # the expansion runs alongside extraction so the prompts may come in either order
     assert mock_llm.prompt.call_count == 2
-    assert mock_llm.prompt.call_args_list == [eo_prompt, ctm_prompt]
+    assert eo_prompt in mock_llm.prompt.call_args_list
+    assert ctm_prompt in mock_llm.prompt.call_args_list
+
+
+def test_commit_memory_auto_update_shares_search(
+    graph,
+    namespace,
+    mock_llm,
+    user_query,
+    id,
+):
+    matched = {
+        "id-1": {"triple": '{"s": "s1", "p": "p1", "o": "o1"}'},
+        "id-2": {"triple": '{"s": "s2", "p": "p2", "o": "o2"}', "distance": 0.5},
+    }
+    mock_vector_store = MagicMock()
+    mock_vector_store.search = MagicMock(return_value=matched)
+    mock_triple_store = MagicMock()
+
+    def prompt(prompt_name, **kwargs):
+        if prompt_name == "update_memory":
+            return str({"id-1": {"triple": '{"s": "s1", "p": "p1", "o": "o9"}'}})
+
+        return "print('test')"
+
+    mock_llm.prompt = MagicMock(side_effect=prompt)
+
+    timings = _retain(
+        ontology=graph,
+        namespaces=namespace,
+        data=graph,
+        llm=mock_llm,
+        triple_store=mock_triple_store,
+        vector_store=mock_vector_store,
+        message=user_query,
+        id=id,
+        auto_expand=True,
+        auto_update=True,
+        ephemeral=False,
+    )
+
+    ctm_kwargs = [
+        c.kwargs
+        for c in mock_llm.prompt.call_args_list
+        if c.kwargs["prompt_name"] == "commit_to_memory"
+    ][0]
+
+    mock_vector_store.search.assert_called_once()
+    assert "id-1" not in ctm_kwargs["relevant_memory"]
+    assert "id-2" in ctm_kwargs["relevant_memory"]
+    assert "distance" not in ctm_kwargs["relevant_memory"]
+    assert set(timings) >= {
+        "total",
+        "expand_ontology",
+        "search_memory",
+        "update_memory",
+        "commit_to_memory",
+        "persist_memory",
+    }
+
+
+def test_acommit_memory(
+    graph,
+    namespace,
+    user_query,
+    id,
+):
+    mock_llm = MagicMock()
+    mock_llm.aprompt = AsyncMock(return_value="print('test')")
+    mock_triple_store = AsyncMock()
+    mock_vector_store = AsyncMock()
+    mock_vector_store.asearch = AsyncMock(return_value={})
+
+    asyncio.run(
+        _aretain(
+            ontology=graph,
+            namespaces=namespace,
+            data=graph,
+            llm=mock_llm,
+            triple_store=mock_triple_store,
+            vector_store=mock_vector_store,
+            message=user_query,
+            id=id,
+            auto_expand=False,
+            auto_update=False,
+            ephemeral=False,
+        )
+    )
+
+    ctm_prompt = call(
+        prompt_name="commit_to_memory",
+        temperature=0.2,
+        ontology=ANY,
+        user_message=user_query,
+        updated_memory="",
+        relevant_memory=ANY,
+    )
+
+    assert mock_llm.aprompt.await_args_list == [ctm_prompt]
+    mock_triple_store.asave.assert_awaited_once()
+    mock_vector_store.asave.assert_awaited_once()
+    mock_llm.prompt.assert_not_called()
+
+
+def test_commit_memory_many(
+    graph,
+    namespace,
+    mock_store,
+    id,
+):
+    def prompt(prompt_name, user_message, **kwargs):
+        if user_message == "bad message":
+            raise Exception("llm error")
+
+        return f"data.add((ns.{user_message}, ns.p, ns.o))"
+
+    mock_llm = MagicMock()
+    mock_llm.prompt = MagicMock(side_effect=prompt)
+    mock_triple_store = MagicMock()
+
+    failures = _retain_many(
+        ontology=graph,
+        namespaces=namespace,
+        data=graph,
+        llm=mock_llm,
+        triple_store=mock_triple_store,
+        vector_store=mock_store,
+        messages=["a", "bad message", "b"],
+        id=id,
+        auto_expand=False,
+        auto_update=False,
+        ephemeral=False,
+        concurrency=2,
+    )
+
+    assert list(failures.keys()) == [1]
+    assert mock_llm.prompt.call_count == 3
+    mock_triple_store.save.assert_called_once()
+    mock_store.save.assert_called_once()
+
+
+def test_acommit_memory_many(
+    graph,
+    namespace,
+    id,
+):
+    async def aprompt(prompt_name, user_message, **kwargs):
+        if user_message == "bad message":
+            raise Exception("llm error")
+
+        return f"data.add((ns.{user_message}, ns.p, ns.o))"
+
+    mock_llm = MagicMock()
+    mock_llm.aprompt = AsyncMock(side_effect=aprompt)
+    mock_triple_store = AsyncMock()
+    mock_vector_store = AsyncMock()
+    mock_vector_store.asearch = AsyncMock(return_value={})
+
+    failures = asyncio.run(
+        _aretain_many(
+            ontology=graph,
+            namespaces=namespace,
+            data=graph,
+            llm=mock_llm,
+            triple_store=mock_triple_store,
+            vector_store=mock_vector_store,
+            messages=["a", "bad message", "b"],
+            id=id,
+            auto_expand=False,
+            auto_update=False,
+            ephemeral=False,
+            concurrency=2,
+        )
+    )
+
+    assert list(failures.keys()) == [1]
+    assert mock_llm.aprompt.await_count == 3
+    mock_triple_store.asave.assert_awaited_once()
+    mock_vector_store.asave.assert_awaited_once()
+
+
+def test_commit_memory_many_chunks_expansion(
+    graph,
+    namespace,
+    mock_store,
+    id,
+):
+    def prompt(prompt_name, user_message, **kwargs):
+        if prompt_name == "expand_ontology":
+            return "pass"
+
+        return f"data.add((ns.{user_message}, ns.p, ns.o))"
+
+    mock_llm = MagicMock()
+    mock_llm.prompt = MagicMock(side_effect=prompt)
+    mock_llm.get_context_window.return_value = 8
+    mock_llm._get_encoding_model.return_value = BYTE_ENCODING.name
+
+    _retain_many(
+        ontology=graph,
+        namespaces=namespace,
+        data=graph,
+        llm=mock_llm,
+        triple_store=mock_store,
+        vector_store=mock_store,
+        messages=["a", "b", "c"],
+        id=id,
+        auto_expand=True,
+        auto_update=False,
+        ephemeral=False,
+    )
+
+    expansions = [
+        c.kwargs["user_message"]
+        for c in mock_llm.prompt.call_args_list
+        if c.kwargs["prompt_name"] == "expand_ontology"
+    ]
+
+    assert expansions == ["a\nb", "c"]
+
+
+def test_commit_memory_many_searches_once_per_message(graph, namespace, id):
+    mock_llm = MagicMock()
+    mock_llm.prompt = MagicMock(side_effect=lambda **kwargs: "pass")
+    mock_vector_store = MagicMock()
+    mock_vector_store.search = MagicMock(return_value={})
+
+    _retain_many(
+        ontology=graph,
+        namespaces=namespace,
+        data=graph,
+        llm=mock_llm,
+        triple_store=MagicMock(),
+        vector_store=mock_vector_store,
+        messages=["a", "b"],
+        id=id,
+        auto_expand=False,
+        auto_update=True,
+        ephemeral=False,
+    )
+
+    assert mock_vector_store.search.call_count == 2
+
+
+def test_commit_memory_many_survives_failed_expansion(graph, namespace, id):
+    def prompt(prompt_name, **kwargs):
+        if prompt_name == "expand_ontology":
+            raise Exception("llm error")
+
+        return "pass"
+
+    mock_llm = MagicMock()
+    mock_llm.prompt = MagicMock(side_effect=prompt)
+    mock_llm.get_context_window.return_value = 4000
+    mock_llm._get_encoding_model.return_value = BYTE_ENCODING.name
+    mock_triple_store = MagicMock()
+    mock_vector_store = MagicMock()
+
+    failures = _retain_many(
+        ontology=graph,
+        namespaces=namespace,
+        data=graph,
+        llm=mock_llm,
+        triple_store=mock_triple_store,
+        vector_store=mock_vector_store,
+        messages=["a", "b"],
+        id=id,
+        auto_expand=True,
+        auto_update=False,
+        ephemeral=False,
+    )
+
+    commits = [
+        c
+        for c in mock_llm.prompt.call_args_list
+        if c.kwargs["prompt_name"] == "commit_to_memory"
+    ]
+
+    assert failures == {}
+    assert len(commits) == 2
+    # the scripts extracted nothing so there is nothing to write
+    mock_triple_store.save.assert_not_called()
+    mock_vector_store.save.assert_not_called()
+
+
+def test_commit_memory_structured(
+    namespace,
+    mock_llm,
+    mock_store,
+    user_query,
+    id,
+):
+    ns = namespace["ns"]
+    ontology = Graph()
+    ontology.add((ns.Person, RDF.type, RDFS.Class))
+    ontology.add((ns.name, RDF.type, RDF.Property))
+    data = Graph()
+
+    mock_llm.prompt_tool = MagicMock(
+        return_value={
+            "triples": [
+                {
+                    "subject": "ns:otto",
+                    "predicate": "rdf:type",
+                    "object": "ns:Person",
+                    "object_type": "uri",
+                },
+                {
+                    "subject": "ns:otto",
+                    "predicate": "ns:name",
+                    "object": "Otto",
+                    "object_type": "literal",
+                },
+                {
+                    "subject": "ns:otto",
+                    "predicate": "ns:unknown",
+                    "object": "x",
+                    "object_type": "literal",
+                },
+            ]
+        }
+    )
+
+    _retain(
+        ontology=ontology,
+        namespaces=namespace,
+        data=data,
+        llm=mock_llm,
+        triple_store=mock_store,
+        vector_store=mock_store,
+        message=user_query,
+        id=id,
+        auto_expand=False,
+        auto_update=False,
+        ephemeral=True,
+        extraction="structured",
+    )
+
+    mock_llm.prompt.assert_not_called()
+    assert mock_llm.prompt_tool.call_args.kwargs["prompt_name"] == (
+        "commit_to_memory_structured"
+    )
+    assert set(data) == {
+        (ns.otto, RDF.type, ns.Person),
+        (ns.otto, ns.name, Literal("Otto")),
+    }
@@ -0,0 +1,181 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from memonto.llms.base_llm import LLMModel
+from memonto.utils.cache import MemoryCache
+from memonto.utils import metrics
+from memonto.utils.llm import count_tokens, load_prompt
+from memonto.utils.metrics import MetricsRegistry
+
+
+class ByteEncoding:
+    def encode(self, value: str) -> list[int]:
+        return list(value.encode("utf-8"))
+
+    def decode(self, tokens: list[int]) -> str:
+        return bytes(tokens).decode("utf-8", errors="ignore")
+
+
+class ScriptedLLM(LLMModel):
+    name: str = "scripted"
+    model: str = "scripted"
+    api_key: str = "test-sk-123"
+    context_windows: dict = {"scripted": 1_000}
+    temperature: float = 0.5
+
+    calls: int = 0
+
+    def _generate(self, prompt: str, temperature: float) -> str:
+        self.calls += 1
+        return prompt
+
+    async def _agenerate(self, prompt: str, temperature: float) -> str:
+        self.calls += 1
+        return prompt
+
+
+@pytest.fixture
+def llm():
+    return ScriptedLLM()
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding():
+    encoding = ByteEncoding()
+
+    with patch("memonto.utils.llm.get_encoding", return_value=encoding), patch(
+        "memonto.llms.base_llm.get_encoding", return_value=encoding
+    ):
+        yield encoding
+
+
+def test_load_prompt_is_cached():
+    assert load_prompt("summarize_memory") is load_prompt("summarize_memory")
+
+
+def test_fit_to_context_window_fast_path(llm):
+    prompt = llm._fit_to_context_window(
+        prompt_name="summarize_memory",
+        encoding_model="bytes",
+        context="some context",
+        memory="some memory",
+    )
+
+    assert prompt == load_prompt("summarize_memory").substitute(
+        context="some context",
+        memory="some memory",
+    )
+
+
+def test_fit_to_context_window_truncates_in_order(llm):
+    long_value = "memory " * 2_000
+
+    prompt = llm._fit_to_context_window(
+        prompt_name="summarize_memory",
+        encoding_model="bytes",
+        memory=long_value,
+        context="some context",
+    )
+
+    assert "some context" not in prompt
+    assert count_tokens(prompt, "bytes") <= 800
+
+
+def test_fit_to_context_window_encodes_once(llm, byte_encoding):
+    long_value = "memory " * 2_000
+
+    with patch.object(
+        ByteEncoding, "encode", autospec=True, side_effect=ByteEncoding.encode
+    ) as encode:
+        llm._fit_to_context_window(
+            prompt_name="summarize_memory",
+            encoding_model="bytes",
+            memory=long_value,
+            context="some context",
+        )
+
+    assert [c.args[1] for c in encode.call_args_list] == [long_value]
+
+
+def test_count_tokens_caches_short_values_only():
+    from memonto.utils.llm import _count_short_tokens
+
+    _count_short_tokens.cache_clear()
+    count_tokens("short", "bytes")
+    count_tokens("long " * 2_000, "bytes")
+
+    assert _count_short_tokens.cache_info().currsize == 1
+
+
+def test_prompt_response_cache():
+    llm = ScriptedLLM(cache=MemoryCache())
+
+    with patch.object(llm, "_get_encoding_model", return_value="bytes"):
+        first = llm.prompt(prompt_name="summarize_memory", context="c", memory="m")
+        second = llm.prompt(prompt_name="summarize_memory", context="c", memory="m")
+        third = asyncio.run(
+            llm.aprompt(prompt_name="summarize_memory", context="c", memory="m")
+        )
+        llm.prompt(
+            prompt_name="summarize_memory",
+            temperature=0.1,
+            context="c",
+            memory="m",
+        )
+
+    assert first == second == third
+    assert llm.calls == 2
+    assert llm.cache.stats() == {"hits": 2, "misses": 2}
+
+
+def test_prompt_stream_fills_cache():
+    llm = ScriptedLLM(cache=MemoryCache())
+
+    with patch.object(llm, "_get_encoding_model", return_value="bytes"):
+        streamed = "".join(
+            llm.prompt_stream(prompt_name="summarize_memory", context="c", memory="m")
+        )
+        prompted = llm.prompt(prompt_name="summarize_memory", context="c", memory="m")
+
+    assert streamed == prompted
+    assert llm.calls == 1
+
+
+def test_prompt_tool_falls_back_to_json():
+    class JsonLLM(ScriptedLLM):
+        def _generate(self, prompt: str, temperature: float) -> str:
+            self.calls += 1
+            return '{"triples": []}' if "JSON schema" in prompt else prompt
+
+    llm = JsonLLM(cache=MemoryCache())
+    tool = {"name": "t", "description": "d", "parameters": {"type": "object"}}
+
+    with patch.object(llm, "_get_encoding_model", return_value="bytes"):
+        first = llm.prompt_tool(
+            prompt_name="summarize_memory", tool=tool, context="c", memory="m"
+        )
+        second = llm.prompt_tool(
+            prompt_name="summarize_memory", tool=tool, context="c", memory="m"
+        )
+
+    assert first == second == {"triples": []}
+    assert llm.calls == 1
+
+
+def test_prompt_records_metrics(llm):
+    registry = MetricsRegistry()
+    llm.cache = MemoryCache()
+    metrics.set_exporter(registry)
+
+    try:
+        llm.prompt(prompt_name="summarize_memory", context="c", memory="m")
+        llm.prompt(prompt_name="summarize_memory", context="c", memory="m")
+    finally:
+        metrics.set_exporter(None)
+
+    labels = {"provider": "scripted", "prompt": "summarize_memory"}
+
+    assert registry.get("memonto_llm_request_seconds", **labels)[0] == 1
+    assert registry.get("memonto_llm_prompt_chars", **labels)[1] > 0
+    assert registry.get("memonto_llm_cache_hits_total", **labels) == 1
@@ -0,0 +1,153 @@
+import pytest
+from rdflib import Graph, Literal, Namespace
+from unittest.mock import patch
+
+from memonto.bench.fakes import HashEmbedding
+from memonto.stores.vector.chroma import Chroma
+from memonto.utils.rdf import generate_triple_ids
+
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture
+def chroma(tmp_path):
+    return Chroma(mode="local", path=str(tmp_path), embedding_function=HashEmbedding())
+
+
+@pytest.fixture
+def data():
+    g = Graph()
+    g.add((EX.bismarck, EX.isFrom, EX.prussia))
+    g.add((EX.bismarck, EX.name, Literal("Otto von Bismarck")))
+    return g, generate_triple_ids(g, graph_id="test-id-123")
+
+
+def test_collection_handles_are_cached(chroma, data):
+    g, ids = data
+
+    with patch.object(
+        chroma.client,
+        "get_or_create_collection",
+        wraps=chroma.client.get_or_create_collection,
+    ) as get_or_create, patch.object(
+        chroma.client, "get_collection", wraps=chroma.client.get_collection
+    ) as get:
+        chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+        first = chroma.search(message="bismarck", id="test-id-123")
+        second = chroma.search(message="bismarck", id="test-id-123")
+
+    assert first == second
+    assert set(first) == set(ids.values())
+    assert get_or_create.call_count == 1
+    assert get.call_count == 0
+
+
+def test_delete_invalidates_collection(chroma, data):
+    g, ids = data
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+
+    chroma.delete("test-id-123")
+
+    assert chroma.search(message="bismarck", id="test-id-123") == {}
+
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+
+    assert set(chroma.search(message="bismarck", id="test-id-123")) == set(ids.values())
+
+
+class CountingEmbedding(HashEmbedding):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches = []
+
+    def __call__(self, input: list[str]) -> list[list[float]]:
+        self.batches.append(len(input))
+        return super().__call__(input)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_documents_are_embedded_in_batches(tmp_path, workers):
+    embed = CountingEmbedding()
+    chroma = Chroma(
+        mode="local",
+        path=str(tmp_path),
+        embedding_function=embed,
+        embedding_batch_size=2,
+        embedding_workers=workers,
+    )
+    g = Graph()
+
+    for i in range(5):
+        g.add((EX[f"e{i}"], EX.name, Literal(f"name {i}")))
+
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=generate_triple_ids(g))
+
+    assert sorted(embed.batches) == [1, 2, 2]
+    assert chroma._embed_documents(["a", "b", "c"]) == HashEmbedding()(["a", "b", "c"])
+
+
+def test_query_embeddings_are_cached(tmp_path, data):
+    g, ids = data
+    embed = CountingEmbedding()
+    chroma = Chroma(mode="local", path=str(tmp_path), embedding_function=embed)
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+    embed.batches.clear()
+
+    chroma.search(message="bismarck", id="test-id-123")
+    chroma.search(message="bismarck", id="test-id-123")
+    chroma.search(message="prussia", id="test-id-123")
+
+    assert embed.batches == [1, 1]
+
+
+def test_hnsw_settings_and_distances(tmp_path, data):
+    g, ids = data
+    chroma = Chroma(
+        mode="local",
+        path=str(tmp_path),
+        embedding_function=HashEmbedding(),
+        hnsw={"space": "cosine", "ef_construction": 200, "ef_search": 50, "M": 32},
+    )
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+
+    metadata = chroma.client.get_collection("test-id-123").metadata
+    matched = chroma.search(message="bismarck is from prussia", id="test-id-123")
+
+    assert metadata["hnsw:space"] == "cosine"
+    assert metadata["hnsw:M"] == 32
+    assert all(set(m) == {"triple"} for m in matched.values())
+
+    matched = chroma.search(
+        message="bismarck is from prussia",
+        id="test-id-123",
+        include_distances=True,
+    )
+    distances = [m["distance"] for m in matched.values()]
+
+    assert all(set(m) == {"triple", "distance"} for m in matched.values())
+    assert distances == sorted(distances)
+
+
+def test_max_distance_drops_far_neighbours(chroma, data):
+    g, ids = data
+    chroma.save(g=g, ns={"ex": EX}, id="test-id-123", ids=ids)
+
+    matched = chroma.search(message="bismarck", id="test-id-123")
+    closest = chroma.client.get_collection("test-id-123").query(
+        query_embeddings=chroma._embed_queries(["bismarck"]),
+        n_results=1,
+        include=["distances"],
+    )["distances"][0][0]
+
+    assert (
+        len(chroma.search(message="bismarck", id="test-id-123", max_distance=-1)) == 0
+    )
+    assert (
+        list(chroma.search(message="bismarck", id="test-id-123", max_distance=closest))
+        == list(matched)[:1]
+    )
+
+
+def test_invalid_hnsw_settings(tmp_path):
+    with pytest.raises(ValueError):
+        Chroma(mode="local", path=str(tmp_path), hnsw={"ef": 10})
@@ -0,0 +1,225 @@
+import pytest
+from rdflib import Graph, Literal, Namespace, RDF
+
+from memonto.stores.triple.embedded import Embedded
+from memonto.utils.namespaces import TRIPLE_NODE, TRIPLE_PROP
+from memonto.utils.rdf import hydrate_graph_with_ids
+
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture(
+    params=[
+        ("memory", "reification"),
+        ("memory", "side-table"),
+        ("oxigraph", "reification"),
+        ("oxigraph", "side-table"),
+    ],
+    ids=lambda p: "-".join(p),
+)
+def embedded(request, tmp_path):
+    backend, identity = request.param
+
+    if backend == "memory":
+        store = Embedded(identity=identity)
+    else:
+        pytest.importorskip("oxrdflib")
+        store = Embedded(path=str(tmp_path / "store"), identity=identity)
+
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def ontology():
+    g = Graph()
+    g.add((EX.Person, RDF.type, EX.Class))
+    return g
+
+
+@pytest.fixture
+def data():
+    g = Graph()
+
+    for s, p, o in [
+        (EX.a, EX.knows, EX.b),
+        (EX.b, EX.knows, EX.c),
+        (EX.c, EX.knows, EX.d),
+        (EX.d, EX.name, Literal("d")),
+        (EX.y, EX.knows, EX.z),
+    ]:
+        g.add((s, p, o))
+
+    ids = {t: f"id-{i}" for i, t in enumerate(sorted(g))}
+    return g, ids
+
+
+def _context_graph(result: str) -> set:
+    g = Graph()
+    g.parse(data=result, format="turtle")
+    return set(g)
+
+
+def _facts(g: Graph) -> set:
+    triple_nodes = set(g.subjects(TRIPLE_PROP.uuid, None))
+    return {t for t in g if t[0] not in triple_nodes}
+
+
+def test_save_and_load(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    o, d = embedded.load(namespaces={"ex": EX}, id="test-id-123")
+
+    assert set(o) == set(ontology)
+    assert _facts(d) == set(g)
+    assert len(g) == 5
+    assert len(embedded.load(namespaces={}, id="other-id")[1]) == 0
+
+
+def test_identity_storage(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    _, d = embedded.load(namespaces={}, id="test-id-123")
+
+    if embedded.identity == "reification":
+        assert len(d) == 5 * len(g)
+    else:
+        assert len(d) == len(g)
+
+
+def test_save_is_idempotent(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+    _, once = embedded.load(namespaces={}, id="test-id-123")
+
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+    _, twice = embedded.load(namespaces={}, id="test-id-123")
+
+    assert len(twice) == len(once)
+
+
+def test_get_all_skips_triple_ids(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    assert _context_graph(embedded.get_all(graph_id="test-id-123")) == set(ids)
+    assert embedded.get_all(graph_id="other-id") == ""
+
+
+def test_get_all_pages(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    pages = [
+        _context_graph(page)
+        for page in embedded.get_all_pages(graph_id="test-id-123", page_size=2)
+    ]
+
+    assert list(map(len, pages)) == [2, 2, 1]
+    assert set().union(*pages) == set(g)
+    assert list(embedded.get_all_pages(graph_id="other-id")) == []
+
+
+def test_get_context(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+    matched = {ids[(EX.a, EX.knows, EX.b)]: {}}
+
+    depth_one = embedded.get_context(matched=matched, graph_id="test-id-123")
+    depth_three = embedded.get_context(matched=matched, graph_id="test-id-123", depth=3)
+
+    assert _context_graph(depth_one) == {
+        (EX.a, EX.knows, EX.b),
+        (EX.b, EX.knows, EX.c),
+    }
+    assert _context_graph(depth_three) == set(ids) - {(EX.y, EX.knows, EX.z)}
+    assert embedded.get_context(matched={}, graph_id="test-id-123") == ""
+
+
+def test_delete_by_ids(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    embedded.delete_by_ids(
+        ids=[ids[(EX.y, EX.knows, EX.z)]],
+        graph_id="test-id-123",
+    )
+
+    _, d = embedded.load(namespaces={}, id="test-id-123")
+
+    assert _facts(d) == set(g) - {(EX.y, EX.knows, EX.z)}
+    assert ids[(EX.y, EX.knows, EX.z)] not in {
+        str(id) for id in d.objects(None, TRIPLE_PROP.uuid)
+    }
+
+
+def test_delete_all(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    embedded.delete_all(graph_id="test-id-123")
+    o, d = embedded.load(namespaces={}, id="test-id-123")
+
+    assert len(o) == 0
+    assert len(d) == 0
+    assert embedded.get_context(matched={"id-0": {}}, graph_id="test-id-123") == ""
+
+
+def test_get_and_query(embedded, ontology, data):
+    g, ids = data
+    embedded.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+
+    result = embedded.get(ontology=ontology, id="test-id-123", uri=EX.d)
+
+    assert {
+        r["s"]["value"]
+        for r in result
+        if r["s"]["type"] == "uri" and not r["s"]["value"].startswith(TRIPLE_NODE)
+    } == {
+        str(EX.c),
+        str(EX.d),
+    }
+    assert len(embedded.query(query="SELECT ?s WHERE { GRAPH ?g { ?s ?p ?o } }"))
+
+
+def test_migrate_identity(ontology, data):
+    g, ids = data
+    store = Embedded()
+    store.save(
+        ontology=ontology,
+        data=hydrate_graph_with_ids(g + Graph(), ids=ids),
+        id="test-id-123",
+    )
+
+    side_table = Embedded(dataset=store.dataset, identity="side-table")
+    side_table.migrate_identity(graph_id="test-id-123")
+    _, d = side_table.load(namespaces={}, id="test-id-123")
+
+    assert set(d) == set(g)
+    assert _context_graph(
+        side_table.get_context(
+            matched={ids[(EX.y, EX.knows, EX.z)]: {}}, graph_id="test-id-123"
+        )
+    ) == {(EX.y, EX.knows, EX.z)}
+
+
+def test_persists_on_disk(tmp_path, ontology, data):
+    pytest.importorskip("oxrdflib")
+    g, ids = data
+    path = str(tmp_path / "store")
+
+    store = Embedded(path=path, identity="side-table")
+    store.save(ontology=ontology, data=g, id="test-id-123", ids=ids)
+    store.close()
+
+    store = Embedded(path=path, identity="side-table")
+    _, d = store.load(namespaces={}, id="test-id-123")
+    result = store.get_context(
+        matched={ids[(EX.y, EX.knows, EX.z)]: {}}, graph_id="test-id-123"
+    )
+    store.close()
+
+    assert set(d) == set(g)
+    assert _context_graph(result) == {(EX.y, EX.knows, EX.z)}
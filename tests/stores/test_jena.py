@@ -0,0 +1,415 @@
+import asyncio
+import gzip
+import httpx
+import pytest
+from rdflib import BNode, Dataset, Graph, Literal, Namespace, RDF, URIRef
+from urllib.parse import parse_qs
+
+from memonto.stores.triple.jena import ApacheJena
+from memonto.utils.namespaces import TRIPLE_PROP
+from memonto.utils.ontology import Ontology
+
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture
+def jena_url():
+    return "http://localhost:8080/test-dataset"
+
+
+@pytest.fixture
+def sent_requests():
+    return []
+
+
+@pytest.fixture
+def jena(jena_url, sent_requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "application/sparql-results+json"},
+            json={"results": {"bindings": [{"s": {"value": "s1"}}]}},
+        )
+
+    store = ApacheJena(connection_url=jena_url)
+    store.client = httpx.Client(transport=httpx.MockTransport(handler))
+    store.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return store
+
+
+def test_shared_client_per_connection_url(jena_url):
+    a = ApacheJena(connection_url=jena_url)
+    b = ApacheJena(connection_url=jena_url)
+    c = ApacheJena(connection_url="http://localhost:8080/other-dataset")
+
+    assert a.client is b.client
+    assert a.client is not c.client
+
+
+def test_query_uses_get_params(jena, jena_url, sent_requests):
+    result = jena.query(query="SELECT ?s WHERE { ?s ?p ?o }")
+
+    assert result == [{"s": {"value": "s1"}}]
+    assert sent_requests[0].method == "GET"
+    assert sent_requests[0].url.params["query"] == "SELECT ?s WHERE { ?s ?p ?o }"
+    assert sent_requests[0].headers["Accept"] == "application/sparql-results+json"
+    assert sent_requests[0].headers["Accept-Encoding"] == "identity"
+
+
+def test_update_is_form_encoded(jena, sent_requests):
+    jena.delete_all(graph_id="test-id-123")
+
+    body = parse_qs(sent_requests[0].content.decode("utf-8"))
+
+    assert sent_requests[0].method == "POST"
+    assert sent_requests[0].url.path.endswith("/update")
+    assert "DROP GRAPH <data-test-id-123>" in body["update"][0]
+
+
+def test_update_with_compression(jena, sent_requests):
+    jena.compression = True
+    jena.delete_all(graph_id="test-id-123")
+
+    body = parse_qs(gzip.decompress(sent_requests[0].content).decode("utf-8"))
+
+    assert sent_requests[0].headers["Content-Encoding"] == "gzip"
+    assert sent_requests[0].headers["Accept-Encoding"] == "gzip"
+    assert "DROP GRAPH <ontology-test-id-123>" in body["update"][0]
+
+
+def test_aquery_uses_async_client(jena_url):
+    sent_requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        return httpx.Response(200, headers={"Content-Type": "text/turtle"}, text="")
+
+    async def run():
+        store = ApacheJena(connection_url=jena_url)
+        store.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return await store.aget_all(graph_id="test-id-123")
+
+    assert asyncio.run(run()) == ""
+    assert "GRAPH <data-test-id-123>" in sent_requests[0].url.params["query"]
+
+
+@pytest.fixture
+def sparql_jena(jena_url):
+    ds = Dataset()
+    g = ds.graph(URIRef("data-test-id-123"))
+
+    for i, (s, p, o) in enumerate(
+        [
+            (EX.a, EX.knows, EX.b),
+            (EX.b, EX.knows, EX.c),
+            (EX.c, EX.knows, EX.d),
+            (EX.d, EX.name, Literal("d")),
+            (EX.y, EX.knows, EX.z),
+        ]
+    ):
+        triple_node = BNode()
+        g.add((s, p, o))
+        g.add((triple_node, RDF.subject, s))
+        g.add((triple_node, RDF.predicate, p))
+        g.add((triple_node, RDF.object, o))
+        g.add((triple_node, TRIPLE_PROP.uuid, Literal(f"id-{i}")))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        result = ds.query(request.url.params["query"])
+        content_type = request.headers["Accept"]
+
+        if content_type != "application/n-triples":
+            content_type = "text/turtle"
+
+        return httpx.Response(
+            200,
+            headers={"Content-Type": content_type},
+            content=result.serialize(
+                format="nt" if content_type == "application/n-triples" else "turtle"
+            ),
+        )
+
+    store = ApacheJena(connection_url=jena_url)
+    store.client = httpx.Client(transport=httpx.MockTransport(handler))
+    store.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return store
+
+
+def _context_graph(result: str) -> set:
+    g = Graph()
+    g.parse(data=result, format="turtle")
+    return set(g)
+
+
+def test_get_context_depth_one(sparql_jena):
+    result = sparql_jena.get_context(matched={"id-0": {}}, graph_id="test-id-123")
+
+    assert _context_graph(result) == {
+        (EX.a, EX.knows, EX.b),
+        (EX.b, EX.knows, EX.c),
+    }
+
+
+def test_get_context_accumulates_depth(sparql_jena):
+    result = sparql_jena.get_context(
+        matched={"id-0": {}},
+        graph_id="test-id-123",
+        depth=3,
+    )
+
+    assert _context_graph(result) == {
+        (EX.a, EX.knows, EX.b),
+        (EX.b, EX.knows, EX.c),
+        (EX.c, EX.knows, EX.d),
+        (EX.d, EX.name, Literal("d")),
+    }
+
+
+def test_get_context_limit(sparql_jena):
+    result = sparql_jena.get_context(
+        matched={"id-0": {}},
+        graph_id="test-id-123",
+        depth=3,
+        limit=2,
+    )
+
+    assert len(_context_graph(result)) == 2
+
+
+def test_get_context_no_matches(sparql_jena):
+    assert sparql_jena.get_context(matched={}, graph_id="test-id-123") == ""
+
+
+def test_get_all_pages(sparql_jena):
+    pages = list(sparql_jena.get_all_pages(graph_id="test-id-123", page_size=2))
+    triples = [_context_graph(page) for page in pages]
+
+    assert list(map(len, triples)) == [2, 2, 1]
+    assert all(len(page.splitlines()) == len(t) for page, t in zip(pages, triples))
+    assert set().union(*triples) == _context_graph(
+        sparql_jena.get_all(graph_id="test-id-123")
+    )
+
+
+def test_aget_all_pages(sparql_jena):
+    async def collect():
+        return [
+            page
+            async for page in sparql_jena.aget_all_pages(
+                graph_id="test-id-123", page_size=5
+            )
+        ]
+
+    assert [len(_context_graph(page)) for page in asyncio.run(collect())] == [5]
+
+
+def test_save_with_reification_ids(jena, sent_requests):
+    g = Graph()
+    g.add((EX.a, EX.knows, EX.b))
+
+    jena.save(
+        ontology=Graph(),
+        data=g,
+        id="test-id-123",
+        ids={(EX.a, EX.knows, EX.b): "id-0"},
+    )
+
+    body = parse_qs(sent_requests[0].content.decode("utf-8"))["update"][0]
+
+    assert f'<{TRIPLE_PROP.uuid}> "id-0"' in body
+    assert "<<" not in body
+
+
+def test_rdf_star_identity(jena_url, sent_requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        return httpx.Response(200, headers={"Content-Type": "text/turtle"}, text="")
+
+    store = ApacheJena(connection_url=jena_url, identity="rdf-star")
+    store.client = httpx.Client(transport=httpx.MockTransport(handler))
+    g = Graph()
+    g.add((EX.a, EX.knows, EX.b))
+
+    store.save(
+        ontology=Graph(),
+        data=g,
+        id="test-id-123",
+        ids={(EX.a, EX.knows, EX.b): "id-0"},
+    )
+    store.get_all(graph_id="test-id-123")
+    store.migrate_identity(graph_id="test-id-123")
+
+    save = parse_qs(sent_requests[0].content.decode("utf-8"))["update"][0]
+    get_all = sent_requests[1].url.params["query"]
+    migrate = parse_qs(sent_requests[2].content.decode("utf-8"))["update"][0]
+
+    assert "GRAPH <ids-test-id-123>" in save
+    assert f"<< {EX.a.n3()} {EX.knows.n3()} {EX.b.n3()} >>" in save
+    assert "rdf:subject" not in save
+    assert "FILTER" not in get_all
+    assert "INSERT { GRAPH <ids-test-id-123>" in migrate
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
+def test_rdf_star_context_query(jena_url):
+    store = ApacheJena(connection_url=jena_url, identity="rdf-star")
+
+    query = store._get_context_query(
+        matched={"id-0": {}}, graph_id="test-id-123", depth=1, limit=100
+    )
+
+    assert _normalize(query) == _normalize(
+        f"""
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+        CONSTRUCT {{ ?s ?p ?o . }}
+        WHERE {{
+            {{
+                SELECT DISTINCT ?s ?p ?o WHERE {{
+                    {{
+                        SELECT DISTINCT ?node WHERE {{
+                            VALUES ?uuid {{ "id-0" }}
+                            GRAPH <ids-test-id-123> {{
+                                {{ << ?seed ?sp ?so >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+                                UNION
+                                {{ << ?ss ?sp ?seed >> <{TRIPLE_PROP.uuid}> ?uuid . }}
+                            }}
+                            BIND(?seed AS ?node)
+                        }}
+                    }}
+                    GRAPH <data-test-id-123> {{
+                        {{ ?node ?p ?o . BIND(?node AS ?s) }}
+                        UNION
+                        {{ ?s ?p ?node . BIND(?node AS ?o) }}
+                    }}
+                }}
+                LIMIT 100
+            }}
+        }}
+        """
+    )
+
+
+@pytest.mark.parametrize(
+    "identity,delete,insert,bind",
+    [
+        ("rdf-star", "data", "ids", ""),
+        (
+            "reification",
+            "ids",
+            "data",
+            "BIND(IRI(CONCAT(STR(<triple:node:>), STR(?uuid))) AS ?triple_node)",
+        ),
+    ],
+)
+def test_migrate_identity_query(jena_url, identity, delete, insert, bind):
+    store = ApacheJena(connection_url=jena_url, identity=identity)
+    reified = f"""?triple_node <{TRIPLE_PROP.uuid}> ?uuid ;
+        rdf:subject ?s ;
+        rdf:predicate ?p ;
+        rdf:object ?o ."""
+    quoted = f"<< ?s ?p ?o >> <{TRIPLE_PROP.uuid}> ?uuid ."
+    patterns = {"data": reified, "ids": quoted}
+
+    query = store._migrate_identity_query(graph_id="test-id-123")
+
+    assert _normalize(query) == _normalize(
+        f"""
+        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+        DELETE {{ GRAPH <{delete}-test-id-123> {{ {patterns[delete]} }} }}
+        INSERT {{ GRAPH <{insert}-test-id-123> {{ {patterns[insert]} }} }}
+        WHERE {{ GRAPH <{delete}-test-id-123> {{ {patterns[delete]} }} {bind} }}
+        """
+    )
+
+
+def test_invalid_identity(jena_url):
+    with pytest.raises(ValueError):
+        ApacheJena(connection_url=jena_url, identity="side-table")
+
+
+def test_save_sends_only_new_ontology_triples(jena, sent_requests):
+    ontology = Ontology.from_graph(Graph())
+    ontology.add((EX.Person, RDF.type, EX.Class))
+    g = Graph()
+    g.add((EX.a, EX.knows, EX.b))
+
+    jena.save(ontology=ontology, data=g, id="test-id-123")
+    jena.save(ontology=ontology, data=g, id="test-id-123")
+    ontology.add((EX.Place, RDF.type, EX.Class))
+    jena.save(ontology=ontology, data=g, id="test-id-123")
+
+    first, second, third = [
+        parse_qs(r.content.decode("utf-8"))["update"][0] for r in sent_requests
+    ]
+
+    assert "GRAPH <ontology-test-id-123>" in first
+    assert "GRAPH <ontology-test-id-123>" not in second
+    assert "GRAPH <data-test-id-123>" in second
+    assert EX.Place.n3() in third
+    assert EX.Person.n3() not in third
+
+
+def test_delete_all_resets_ontology_sync(jena, sent_requests):
+    ontology = Graph()
+    ontology.add((EX.Person, RDF.type, EX.Class))
+
+    jena.save(ontology=ontology, data=Graph(), id="test-id-123")
+    jena.delete_all(graph_id="test-id-123")
+    jena.save(ontology=ontology, data=Graph(), id="test-id-123")
+
+    assert len(sent_requests) == 3
+    assert (
+        "GRAPH <ontology-test-id-123>"
+        in parse_qs(sent_requests[2].content.decode("utf-8"))["update"][0]
+    )
+
+
+def test_failed_save_resends_ontology(jena_url, sent_requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_requests.append(request)
+        return httpx.Response(500 if len(sent_requests) == 1 else 200, text="")
+
+    store = ApacheJena(connection_url=jena_url)
+    store.client = httpx.Client(transport=httpx.MockTransport(handler))
+    ontology = Graph()
+    ontology.add((EX.Person, RDF.type, EX.Class))
+
+    store.save(ontology=ontology, data=Graph(), id="test-id-123")
+    store.save(ontology=ontology, data=Graph(), id="test-id-123")
+
+    assert len(sent_requests) == 2
+    assert (
+        "GRAPH <ontology-test-id-123>"
+        in parse_qs(sent_requests[1].content.decode("utf-8"))["update"][0]
+    )
+
+
+def test_synced_ontologies_are_bounded(jena):
+    jena.synced_cache_size = 2
+    ontology = Graph()
+    ontology.add((EX.Person, RDF.type, EX.Class))
+
+    for id in ("a", "b", "c"):
+        jena.save(ontology=ontology, data=Graph(), id=id)
+
+    assert list(jena._synced) == ["ontology-b", "ontology-c"]
+
+
+def test_release_forgets_synced_ontology(jena, sent_requests):
+    ontology = Graph()
+    ontology.add((EX.Person, RDF.type, EX.Class))
+
+    jena.save(ontology=ontology, data=Graph(), id="test-id-123")
+    jena.release(id="test-id-123")
+    jena.save(ontology=ontology, data=Graph(), id="test-id-123")
+
+    assert (
+        "GRAPH <ontology-test-id-123>"
+        in parse_qs(sent_requests[1].content.decode("utf-8"))["update"][0]
+    )
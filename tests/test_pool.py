@@ -0,0 +1,124 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from rdflib import Graph, Namespace, RDF, RDFS
+
+from memonto import MemontoPool
+from memonto.stores.triple.embedded import Embedded
+from memonto.stores.triple.jena import ApacheJena
+
+HIST = Namespace("history:")
+
+
+@pytest.fixture
+def ontology():
+    g = Graph()
+    g.add((HIST.Person, RDF.type, RDFS.Class))
+    return g
+
+
+@pytest.fixture
+def pool(ontology):
+    pool = MemontoPool(
+        ontology=ontology,
+        namespaces={"hist": HIST},
+        config={
+            "triple_store": {"provider": "embedded", "config": {}},
+            "model": {
+                "provider": "openai",
+                "config": {"model": "gpt-4o", "api_key": "test-sk-123"},
+            },
+        },
+        max_tenants=2,
+    )
+    yield pool
+    pool.close()
+
+
+def test_tenants_share_clients(pool):
+    a = pool.get("user-a")
+    b = pool["user-b"]
+
+    assert a.id == "user-a"
+    assert b.id == "user-b"
+    assert pool.get("user-a") is a
+    assert a.llm is b.llm is pool.llm
+    assert a.triple_store is b.triple_store is pool.triple_store
+    assert a.ontology is b.ontology
+
+
+def test_least_recently_used_tenant_is_dropped(pool):
+    a = pool.get("user-a")
+    pool.get("user-b")
+    pool.get("user-a")
+    pool.get("user-c")
+
+    assert len(pool) == 2
+    assert pool.get("user-a") is a
+    assert pool.get("user-b").id == "user-b"
+
+
+def test_auto_expand_copies_ontology(ontology):
+    pool = MemontoPool(
+        ontology=ontology,
+        namespaces={"hist": HIST},
+        options={"auto_expand": True},
+    )
+
+    a = pool.get("user-a")
+    a.ontology.add((HIST.Place, RDF.type, RDFS.Class))
+
+    assert (HIST.Place, RDF.type, RDFS.Class) not in pool.get("user-b").ontology
+    assert a.auto_expand
+
+
+def test_dropped_tenants_release_store_state(pool):
+    with patch.object(
+        Embedded, "release", autospec=True, side_effect=Embedded.release
+    ) as release:
+        pool.get("user-a")
+        pool.get("user-b")
+        pool.get("user-c")
+        pool.evict("user-b")
+        pool.evict("user-b")
+
+    assert [c.kwargs["id"] for c in release.call_args_list] == ["user-a", "user-b"]
+
+
+def test_auto_expanded_ontology_survives_eviction(ontology):
+    pool = MemontoPool(
+        ontology=ontology,
+        namespaces={"hist": HIST},
+        config={"triple_store": {"provider": "embedded", "config": {}}},
+        options={"auto_expand": True},
+        max_tenants=1,
+    )
+
+    a = pool.get("user-a")
+    a.ontology.add((HIST.Place, RDF.type, RDFS.Class))
+    pool.triple_store.save(ontology=a.ontology, data=Graph(), id="user-a")
+
+    pool.get("user-b")
+    a = pool.get("user-a")
+
+    assert (HIST.Place, RDF.type, RDFS.Class) in a.ontology
+    assert (HIST.Place, RDF.type, RDFS.Class) not in pool.get("user-b").ontology
+    pool.close()
+
+
+def test_failed_ontology_load_falls_back_to_base_ontology(ontology):
+    store = ApacheJena(connection_url="http://localhost:8080/test-dataset")
+    store.client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(500))
+    )
+    pool = MemontoPool(
+        ontology=ontology,
+        namespaces={"hist": HIST},
+        triple_store=store,
+        options={"auto_expand": True},
+    )
+
+    a = pool.get("user-a")
+
+    assert set(a.ontology) == set(ontology)
+    assert a.ontology is not pool.ontology
@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import patch
+
+from memonto.utils.cache import MemoryCache, SQLiteCache, TieredCache
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(max_size=2)
+
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert cache.stats() == {"hits": 3, "misses": 1}
+
+
+def test_memory_cache_ttl():
+    cache = MemoryCache(ttl=10)
+
+    with patch("memonto.utils.cache.time.time", return_value=100):
+        cache.set("a", "1")
+
+    with patch("memonto.utils.cache.time.time", return_value=105):
+        assert cache.get("a") == "1"
+
+    with patch("memonto.utils.cache.time.time", return_value=111):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_persists(db_path):
+    SQLiteCache(path=db_path).set("a", "1")
+
+    assert SQLiteCache(path=db_path).get("a") == "1"
+
+
+def test_sqlite_cache_size_eviction(db_path):
+    cache = SQLiteCache(path=db_path, max_size=2)
+
+    with patch("memonto.utils.cache.time.time", side_effect=[1, 2, 3, 4]):
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_tiered_cache_promotes_disk_hits(db_path):
+    TieredCache(path=db_path).set("a", "1")
+    cache = TieredCache(path=db_path)
+
+    assert cache.get("a") == "1"
+    assert cache.memory.get("a") == "1"
+
+
+def test_tiered_cache_promotion_keeps_ttl(db_path):
+    with patch("memonto.utils.cache.time.time", return_value=100):
+        TieredCache(path=db_path, ttl=10).set("a", "1")
+
+    cache = TieredCache(path=db_path, ttl=10)
+
+    with patch("memonto.utils.cache.time.time", return_value=105):
+        assert cache.get("a") == "1"
+
+    with patch("memonto.utils.cache.time.time", return_value=111):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_defaults_to_user_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    cache = SQLiteCache()
+    cache.set("a", "1")
+
+    assert cache.path == str(tmp_path / "cache" / "memonto" / "cache.db")
+    assert list(tmp_path.iterdir()) == [tmp_path / "cache"]
+
+
+def test_sqlite_cache_hits_do_not_write(db_path):
+    cache = SQLiteCache(path=db_path, access_flush_size=3)
+
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+
+    changes = cache._conn.total_changes
+
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    assert cache._conn.total_changes == changes
+
+    cache.get("c")
+    assert cache._conn.total_changes == changes + 3
+
+
+def test_sqlite_cache_tracks_size(db_path):
+    cache = SQLiteCache(path=db_path, max_size=3)
+
+    for key in ["a", "b", "a", "c", "d"]:
+        cache.set(key, key)
+
+    assert cache._size == 3
+    assert SQLiteCache(path=db_path)._size == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+
+
+def test_cache_stats_are_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = MemoryCache()
+    cache.set("a", "1")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.get, ["a", "b"] * 500))
+
+    assert cache.stats() == {"hits": 500, "misses": 500}
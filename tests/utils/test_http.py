@@ -0,0 +1,16 @@
+import asyncio
+
+from memonto.utils.http import aclose_http_clients, get_async_http_client
+
+
+def test_aclose_http_clients():
+    async def run():
+        client = get_async_http_client("http://localhost:8080/test-dataset")
+        await aclose_http_clients()
+
+        return client, get_async_http_client("http://localhost:8080/test-dataset")
+
+    closed, reopened = asyncio.run(run())
+
+    assert closed.is_closed
+    assert reopened is not closed
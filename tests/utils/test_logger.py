@@ -0,0 +1,34 @@
+from memonto.utils.logger import logger, setup_logger
+
+
+def test_lazy_payload_skipped_without_debug(tmp_path):
+    calls = []
+    setup_logger(debug=False, log_file=str(tmp_path / "memonto.log"))
+
+    logger.opt(lazy=True).debug("Data Graph\n{}\n", lambda: calls.append(1))
+
+    assert calls == []
+
+
+def test_log_file_sink(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_file = tmp_path / "custom.log"
+
+    setup_logger(debug=False, log_file=None)
+    assert not (tmp_path / "memonto.log").exists()
+
+    setup_logger(debug=False, log_file=str(log_file), enqueue=True)
+    logger.info("hello")
+    logger.complete()
+    logger.remove()
+
+    assert "hello" in log_file.read_text()
+
+
+def test_no_log_file_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    setup_logger(debug=False)
+    logger.warning("hello")
+
+    assert list(tmp_path.iterdir()) == []
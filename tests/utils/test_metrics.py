@@ -0,0 +1,53 @@
+import pytest
+
+from memonto.utils import metrics
+from memonto.utils.metrics import MetricsRegistry, measure, record_timings
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    metrics.set_exporter(registry)
+    yield registry
+    metrics.set_exporter(None)
+
+
+def test_disabled_metrics_are_not_recorded():
+    registry = MetricsRegistry()
+
+    with measure("memonto_test"):
+        pass
+
+    metrics.increment("memonto_test_total")
+
+    assert metrics.get_exporter() is None
+    assert registry.render() == ""
+
+
+def test_measure_and_increment(registry):
+    with measure("memonto_test", operation="query"):
+        pass
+
+    metrics.increment("memonto_test_total", 2, operation="query")
+    metrics.increment("memonto_test_total", operation="query")
+
+    count, total = registry.get("memonto_test_seconds", operation="query")
+
+    assert count == 1
+    assert total >= 0
+    assert registry.get("memonto_test_total", operation="query") == 3
+
+
+def test_render_prometheus_text(registry):
+    record_timings("retain", {"total": 1.5, "persist_memory": 0.5})
+    metrics.increment("memonto_llm_tokens_total", 10, kind="prompt", model='a"b')
+
+    assert registry.render() == (
+        "# TYPE memonto_llm_tokens_total counter\n"
+        'memonto_llm_tokens_total{kind="prompt",model="a\\"b"} 10\n'
+        "# TYPE memonto_stage_seconds summary\n"
+        'memonto_stage_seconds_count{operation="retain",stage="persist_memory"} 1\n'
+        'memonto_stage_seconds_sum{operation="retain",stage="persist_memory"} 0.5\n'
+        'memonto_stage_seconds_count{operation="retain",stage="total"} 1\n'
+        'memonto_stage_seconds_sum{operation="retain",stage="total"} 1.5\n'
+    )
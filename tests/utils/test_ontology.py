@@ -0,0 +1,65 @@
+from rdflib import Graph, Namespace, RDF, RDFS
+
+from memonto.utils.ontology import Ontology
+
+HIST = Namespace("history:")
+
+
+def _ontology() -> Ontology:
+    g = Graph()
+    g.bind("hist", HIST)
+    g.add((HIST.Person, RDF.type, RDFS.Class))
+
+    return Ontology.from_graph(g)
+
+
+def test_from_graph_shares_store():
+    g = Graph()
+    ontology = Ontology.from_graph(g)
+    g.add((HIST.Person, RDF.type, RDFS.Class))
+
+    assert (HIST.Person, RDF.type, RDFS.Class) in ontology
+    assert Ontology.from_graph(ontology) is ontology
+
+
+def test_serialize_is_cached_until_modified():
+    ontology = _ontology()
+    turtle = ontology.serialize(format="turtle")
+
+    assert ontology.serialize(format="turtle") is turtle
+    assert ontology.serialize(format="nt") is ontology.serialize(format="nt")
+
+    ontology.add((HIST.Place, RDF.type, RDFS.Class))
+
+    assert ontology.serialize(format="turtle") is not turtle
+    assert "Place" in ontology.serialize(format="turtle")
+
+
+def test_serialize_detects_writes_to_the_shared_store():
+    g = Graph()
+    ontology = Ontology.from_graph(g)
+    turtle = ontology.serialize(format="turtle")
+
+    g.add((HIST.Person, RDF.type, RDFS.Class))
+
+    assert ontology.serialize(format="turtle") != turtle
+
+
+def test_prefix_block():
+    ontology = _ontology()
+    block = ontology.prefix_block()
+
+    assert "PREFIX hist: <history:>" in block
+    assert "@prefix" not in block
+    assert ontology.prefix_block() is block
+
+    ontology.bind("ex", Namespace("http://example.org/"))
+    ontology.add((HIST.Place, RDF.type, RDFS.Class))
+
+    assert ontology.prefix_block() is not block
+
+
+def test_copies_stay_versioned():
+    ontology = _ontology()
+
+    assert isinstance(ontology + Graph(), Ontology)
@@ -1,11 +1,16 @@
 import pytest
-from rdflib import Graph, URIRef, Literal, BNode
+from rdflib import Graph, URIRef, Literal, BNode, Namespace, RDF, RDFS, XSD
 
 from memonto.utils.namespaces import TRIPLE_PROP
 from memonto.utils.rdf import (
     find_updated_triples_ephemeral,
+    generate_triple_id,
+    generate_triple_ids,
     hydrate_graph_with_ids,
+    index_triple_ids,
+    remove_triples,
     serialize_graph_without_ids,
+    validate_triples,
 )
 
 
@@ -62,6 +67,26 @@ def test_hydrate_graph_with_ids(graph):
     assert all(isinstance(t[2], Literal) for t in uuid_triples)
 
 
+def test_index_triple_ids(graph):
+    ids = generate_triple_ids(graph)
+    g = hydrate_graph_with_ids(graph, ids=ids)
+
+    assert index_triple_ids(g) == ids
+
+
+def test_generate_triple_ids_is_deterministic(graph):
+    ids = generate_triple_ids(graph, graph_id="test-id-123")
+    (s, p, o), id = next(iter(ids.items()))
+
+    assert generate_triple_ids(graph, graph_id="test-id-123") == ids
+    assert generate_triple_ids(graph, graph_id="other-id")[(s, p, o)] != id
+    assert len(set(ids.values())) == len(graph)
+
+    assert generate_triple_id((s, p, Literal(" Bob ")), "test-id-123") != (
+        generate_triple_id((s, p, Literal("Bob")), "test-id-123")
+    )
+
+
 def test_find_updated_triples_ephemeral():
     original = [
         {"s": "1", "p": "2", "o": "3"},
@@ -93,3 +118,107 @@ def test_find_updated_triples_ephemeral_no_updates():
     ]
 
     assert find_updated_triples_ephemeral(original, updated) == []
+
+
+def test_remove_triples(graph):
+    g = remove_triples(
+        graph,
+        [
+            {
+                "s": "http://example.org/s1",
+                "p": "http://example.org/p1",
+                "o": "http://example.org/o1",
+            }
+        ],
+    )
+
+    assert len(g) == 1
+    assert (
+        URIRef("http://example.org/s2"),
+        URIRef("http://example.org/p2"),
+        URIRef("http://example.org/o2"),
+    ) in g
+
+
+def test_remove_triples_with_whitespace():
+    g = Graph()
+    g.add(
+        (
+            URIRef("http://example.org/s1"),
+            URIRef("http://example.org/p1"),
+            Literal(" padded "),
+        )
+    )
+
+    g = remove_triples(
+        g,
+        [{"s": "http://example.org/s1", "p": "http://example.org/p1", "o": "padded"}],
+    )
+
+    assert len(g) == 0
+
+
+def test_validate_triples():
+    HIST = Namespace("history:")
+    ontology = Graph()
+    ontology.add((HIST.Person, RDF.type, RDFS.Class))
+    ontology.add((HIST.Place, RDF.type, RDFS.Class))
+    ontology.add((HIST.isFrom, RDF.type, RDF.Property))
+    ontology.add((HIST.isFrom, RDFS.range, HIST.Place))
+    ontology.add((HIST.birthDate, RDF.type, RDF.Property))
+    ontology.add((HIST.birthDate, RDFS.range, XSD.date))
+
+    triples = [
+        {
+            "subject": "hist:Otto von Bismarck",
+            "predicate": "rdf:type",
+            "object": "hist:Person",
+            "object_type": "uri",
+        },
+        {
+            "subject": "hist:Otto_von_Bismarck",
+            "predicate": "hist:isFrom",
+            "object": "history:Prussia",
+            "object_type": "uri",
+        },
+        {
+            "subject": "hist:Otto_von_Bismarck",
+            "predicate": "hist:birthDate",
+            "object": "1815-04-01",
+            "object_type": "literal",
+        },
+        {
+            "subject": "hist:Otto_von_Bismarck",
+            "predicate": "rdf:type",
+            "object": "hist:Diplomat",
+            "object_type": "uri",
+        },
+        {
+            "subject": "hist:Otto_von_Bismarck",
+            "predicate": "hist:knows",
+            "object": "hist:Wilhelm",
+            "object_type": "uri",
+        },
+        {
+            "subject": "hist:Otto_von_Bismarck",
+            "predicate": "hist:isFrom",
+            "object": "Prussia",
+            "object_type": "literal",
+        },
+        {
+            "subject": "foo:Otto",
+            "predicate": "hist:isFrom",
+            "object": "hist:Prussia",
+            "object_type": "uri",
+        },
+    ]
+
+    assert validate_triples(triples, ontology=ontology, namespaces={"hist": HIST}) == [
+        (HIST.Otto_von_Bismarck, RDF.type, HIST.Person),
+        (HIST.Otto_von_Bismarck, HIST.isFrom, HIST.Prussia),
+        (
+            HIST.Otto_von_Bismarck,
+            HIST.birthDate,
+            Literal("1815-04-01", datatype=XSD.date),
+        ),
+    ]
@@ -0,0 +1,40 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from memonto.utils.steps import arun_steps, call, run_steps
+
+
+def _steps(store):
+    first = yield call(store, "get", key="a")
+
+    try:
+        yield call(store, "get", key="missing")
+    except KeyError:
+        pass
+
+    rest = yield [call(store, "get", key="b"), call(store, "get", key="c")]
+    return [first] + rest
+
+
+def _get(key: str) -> str:
+    if key == "missing":
+        raise KeyError(key)
+
+    return key.upper()
+
+
+def test_run_steps():
+    store = MagicMock()
+    store.get = MagicMock(side_effect=_get)
+
+    assert run_steps(_steps(store)) == ["A", "B", "C"]
+    assert run_steps(_steps(store), concurrency=2) == ["A", "B", "C"]
+
+
+def test_arun_steps_uses_async_methods():
+    store = MagicMock()
+    store.aget = AsyncMock(side_effect=_get)
+
+    assert asyncio.run(arun_steps(_steps(store))) == ["A", "B", "C"]
+    assert store.aget.await_count == 4
+    store.get.assert_not_called()